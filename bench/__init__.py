@@ -0,0 +1,3 @@
+# The benchmarks use the modules of the bot and the fakes of the tests, so they never use the network
+# Run them from the root of the repository with: python -m bench.<name of the benchmark> (like python -m bench.coinLookup)
+import tests
@@ -0,0 +1,55 @@
+# Benchmark of the price alerts with 100,000 alerts over 1,000 coins
+# The sorted thresholds of the engine are compared with checking every alert after every refresh
+import random
+import time
+
+from bench.timing import measure, report
+from cryptoCoin.AlertEngine import AlertEngine, AlertType
+
+# Checks every alert against the price of its coin, returns the ones that were crossed
+def linearEvaluate(alerts, getPrice):
+	triggered = []
+
+	for alert in alerts:
+		coin, alertType, price = alert[:3]
+		currentPrice = getPrice(coin)
+
+		if((alertType == AlertType.ABOVE and currentPrice >= price) or (alertType == AlertType.BELOW and currentPrice <= price)):
+			triggered.append(alert)
+
+	return triggered
+
+def makeEngine(alerts):
+	engine = AlertEngine()
+
+	for coin, alertType, price, person in alerts:
+		engine.addAlert(coin, alertType, price, person)
+
+	return engine
+
+def main(alertsCount=100000, coins=1000):
+	randomGenerator = random.Random(3)
+	alerts = [("c" + str(randomGenerator.randint(0, coins - 1)), randomGenerator.choice([AlertType.ABOVE, AlertType.BELOW]), randomGenerator.uniform(1, 100), "p") for position in range(alertsCount)]
+	prices = dict(("c" + str(coin), randomGenerator.uniform(49, 51)) for coin in range(coins))
+	quietPrices = dict(("c" + str(coin), 50.0) for coin in range(coins))
+
+	print str(alertsCount) + " alerts over " + str(coins) + " coins"
+	startTime = time.time()
+	engine = makeEngine(alerts)
+	report("add all the alerts", time.time() - startTime)
+
+	# The first refresh after adding the alerts triggers about half of them, the next ones only the crossed ones
+	startTime = time.time()
+	triggered = engine.evaluate(quietPrices.get)
+	report("engine, first refresh (" + str(len(triggered)) + " triggered)", time.time() - startTime)
+	report("engine, refresh with small moves", measure(lambda: engine.evaluate(prices.get), 1, 3))
+	report("engine, refresh without moves", measure(lambda: engine.evaluate(quietPrices.get), 10))
+
+	# The same alerts the engine has left, checked one by one
+	remainingAlerts = engine.getAlerts("p").values()
+	report("every alert checked, refresh (" + str(len(remainingAlerts)) + " alerts)", measure(lambda: linearEvaluate(remainingAlerts, prices.get), 1, 3))
+
+	return
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,56 @@
+# Benchmark of the order book analytics with numpy, with 50 books of 10,000 levels per side
+# The vectorized slippage is compared with going through the levels of the books given by the exchanger in a python loop
+import random
+import time
+
+import numpy
+
+from bench.timing import measure, report
+from cryptoExchanger.OrderBookAnalytics import BookAnalytics, getBatchSlippage, getBatchSpreads
+
+# Returns a book with the format of BittrexExchanger.getBothOrderBook, with levels every 0.01 around the mid price
+def makeBook(levels, midPrice, randomGenerator):
+	return {"buy": [{"Rate": midPrice - (level + 1) * 0.01, "Quantity": randomGenerator.uniform(0.1, 5)} for level in range(levels)],
+		"sell": [{"Rate": midPrice + (level + 1) * 0.01, "Quantity": randomGenerator.uniform(0.1, 5)} for level in range(levels)]}
+
+# The slippage of a quantity going through the sorted levels one by one, NaN if the book doesn't have enough quantity
+def loopSlippage(book, sideName, quantity):
+	levels = sorted(book[sideName], key=lambda level: -level["Rate"] if sideName == "buy" else level["Rate"])
+	bestPrice = levels[0]["Rate"]
+	cost = 0.0
+	remaining = quantity
+
+	for level in levels:
+		taken = min(remaining, level["Quantity"])
+		cost += taken * level["Rate"]
+		remaining -= taken
+
+		if(remaining <= 1e-12):
+			vwap = cost / quantity
+			return (bestPrice - vwap) / bestPrice if sideName == "buy" else (vwap - bestPrice) / bestPrice
+
+	return float("nan")
+
+def main(booksCount=50, levels=10000):
+	randomGenerator = random.Random(2)
+	books = [makeBook(levels, 100 + position, randomGenerator) for position in range(booksCount)]
+
+	print str(booksCount) + " books with " + str(levels) + " levels per side"
+	startTime = time.time()
+	analytics = [BookAnalytics(book) for book in books]
+	report("convert the books to arrays", time.time() - startTime)
+
+	report("python loop, slippage of 500 in every book", measure(lambda: [loopSlippage(book, "buy", 500) for book in books], 1, 3))
+	report("numpy, slippage of 500 in every book", measure(lambda: getBatchSlippage(analytics, "buy", 500), 10))
+	report("numpy, spread of every book", measure(lambda: getBatchSpreads(analytics), 10))
+
+	quantities = numpy.linspace(1, 30000, 1000)
+	# The loop is measured with 10 of the points and scaled to 1000, going through all of them takes too long
+	report("python loop, slippage curve of 1000 points", measure(lambda: [loopSlippage(books[0], "sell", quantity) for quantity in quantities[::100]], 1, 3) * 100)
+	report("numpy, slippage curve of 1000 points", measure(lambda: analytics[0].getSlippage("sell", quantities), 10))
+	report("numpy, imbalance within 1% of the mid price", measure(lambda: analytics[0].getImbalance(0.01), 100))
+
+	return
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,54 @@
+# Benchmark of the catalogs of active markets and currencies, compared with the de-duplication in lists the exchanger used to do
+# It uses 300 markets and 3,000 currencies (the size of bittrex) and 10,000 markets to show how both grow
+from bench.timing import measure, report
+from cryptoExchanger.CurrencyCatalog import CurrencyCatalog
+from cryptoExchanger.MarketCatalog import MarketCatalog
+
+# Returns a list of markets with the format bittrex uses
+def makeMarkets(count):
+	return [{"MarketName": "BTC-C" + str(position), "BaseCurrency": "BTC", "MarketCurrency": "C" + str(position), "IsActive": position % 10 != 0} for position in range(count)]
+
+def makeCurrencies(count):
+	return [{"Currency": "C" + str(position), "IsActive": position % 10 != 0} for position in range(count)]
+
+# The way the exchanger used to get the names of the active markets, searching in the list before adding every one
+def listMarkets(markets):
+	result = []
+
+	for market in markets:
+		if(market["MarketName"] not in result and market["IsActive"]):
+			result.append(market["MarketName"])
+
+	return result
+
+def listCurrencies(currencies):
+	result = []
+
+	for currency in currencies:
+		if(currency["Currency"] not in result and currency["IsActive"]):
+			result.append(currency["Currency"])
+
+	return result
+
+def main():
+	for marketsCount, currenciesCount in [(300, 3000), (10000, 10000)]:
+		markets = makeMarkets(marketsCount)
+		currencies = makeCurrencies(currenciesCount)
+		# One market less and one more than the markets of the catalog
+		changedMarkets = markets[1:] + makeMarkets(marketsCount + 1)[-1:]
+		marketCatalog = MarketCatalog(markets)
+		currencyCatalog = CurrencyCatalog(currencies)
+
+		print str(marketsCount) + " markets and " + str(currenciesCount) + " currencies"
+		report("list, active markets", measure(lambda: listMarkets(markets), 1, 3))
+		report("catalog, build with the markets", measure(lambda: MarketCatalog(markets), 1, 3))
+		report("catalog, 2 updates changing 2 markets each", measure(lambda: (marketCatalog.update(changedMarkets), marketCatalog.update(markets)), 1, 3))
+		report("catalog, is a market active", measure(lambda: marketCatalog.isActive("BTC-C5"), 10000))
+		report("list, active currencies", measure(lambda: listCurrencies(currencies), 1, 3))
+		report("catalog, build with the currencies", measure(lambda: CurrencyCatalog(currencies), 1, 3))
+		report("catalog, is a currency active", measure(lambda: currencyCatalog.isActive("C5"), 10000))
+
+	return
+
+if __name__ == "__main__":
+	main()
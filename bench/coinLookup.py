@@ -0,0 +1,30 @@
+# Benchmark of the lookup of a coin by its symbol, name or id (CryptoBot.getInfo) with 5,000 coins
+# The index of the ticker store is compared with the linear scan over the tickers the bot used to do
+from bench.timing import measure, report
+from tests.fakes import FakeMarket, makeTickers
+from CryptoBot import CryptoBot
+
+# The lookup the bot used to do: a scan of the raw tickers comparing the symbol, the name and the id of every one
+def linearLookup(tickers, coin):
+	coinTicker = None
+	coin = coin.upper()
+
+	for ticker in tickers:
+		if(ticker['symbol'].upper() == coin or ticker['name'].upper() == coin or ticker['id'].upper() == coin):
+			coinTicker = ticker
+
+	return coinTicker
+
+def main(coins=5000):
+	cryptoBot = CryptoBot("123:ABC", "1", market=FakeMarket(coins))
+	tickers = makeTickers(coins)
+
+	print "Lookup of a coin between " + str(coins) + " coins"
+	for name, coin in [("first coin by symbol", "btc"), ("last coin by symbol", "c" + str(coins - 1)), ("coin by id", "coin-" + str(coins // 2)), ("missing coin", "nope")]:
+		report("linear scan, " + name, measure(lambda: linearLookup(tickers, coin), 100))
+		report("getInfo, " + name, measure(lambda: cryptoBot.getInfo(coin), 10000))
+
+	return
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,69 @@
+# Benchmark of the latency of getTicker over 1,000 calls to a local bittrex api that keeps the connections alive
+# The pooled transport the exchangers share is compared with the dispatch of the bittrex library, that opens a connection per call
+import BaseHTTPServer
+import json
+import SocketServer
+import threading
+import time
+
+from bittrex import bittrex
+from bench.timing import report
+from cryptoExchanger.HttpTransport import HttpTransport
+
+class _TickerHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+	protocol_version = "HTTP/1.1"
+	wbufsize = -1
+
+	def do_GET(self):
+		body = json.dumps({"success": True, "message": "", "result": {"Bid": 0.0101, "Ask": 0.0102, "Last": 0.0101}})
+		self.send_response(200)
+		self.send_header("Content-Type", "application/json")
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def log_message(self, *args):
+		return
+
+class _TickerServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+	daemon_threads = True
+
+# Returns the total, the median and the 99th percentile of the latency of the getTicker calls
+def measureTicker(client, calls):
+	latencies = []
+
+	for call in range(calls):
+		startTime = time.time()
+		ticker = client.get_ticker("BTC-LTC")
+		latencies.append(time.time() - startTime)
+
+		if(not ticker["success"]):
+			raise IOError(ticker["message"])
+
+	latencies.sort()
+	return sum(latencies), latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+
+def main(calls=1000):
+	server = _TickerServer(("127.0.0.1", 0), _TickerHandler)
+	serverThread = threading.Thread(target=server.serve_forever)
+	serverThread.daemon = True
+	serverThread.start()
+	bittrex.BASE_URL_V1_1 = "http://127.0.0.1:" + str(server.server_address[1]) + "/api/v1.1{path}?"
+
+	transport = HttpTransport()
+	clients = [("connection per call", bittrex.Bittrex("key", "secret", calls_per_second=1000000)),
+		("pooled transport", bittrex.Bittrex("key", "secret", calls_per_second=1000000, dispatch=transport.dispatch))]
+
+	print "getTicker latency over " + str(calls) + " calls to a local api"
+	for name, client in clients:
+		total, median, slowest = measureTicker(client, calls)
+		report(name + ", total", total)
+		report(name + ", median", median)
+		report(name + ", 99th percentile", slowest)
+
+	transport.close()
+	server.shutdown()
+	return
+
+if __name__ == "__main__":
+	main()
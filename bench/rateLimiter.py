@@ -0,0 +1,57 @@
+# Benchmark of the rate limiter: the cost of a check, the memory it keeps with a lot of users,
+# and the time the bot spends on the commands of 1,000 users that send two commands each while another one sends 1,000 commands
+import random
+import time
+
+from bench.timing import measure, report
+from tests.fakes import FakeMarket, makeUpdate, useFakeBot
+from chatBot.RateLimiter import RateLimiter
+from CryptoBot import CryptoBot
+
+# Returns the seconds a bot takes to process the updates, the amount of messages the spammer got
+# and the amount of commands of the other users that were not answered
+def runUpdates(rateLimiter, updates, normalCommands):
+	cryptoBot = CryptoBot("123:ABC", "1", market=FakeMarket(1500), rateLimiter=rateLimiter)
+	fakeBot = useFakeBot(cryptoBot)
+	cryptoBot.processUpdate(makeUpdate(0, 1, "/startBot"))
+	del fakeBot.sent[:]
+
+	startTime = time.time()
+	for update in updates:
+		cryptoBot.processUpdate(update)
+	elapsed = time.time() - startTime
+
+	spammerMessages = len([sent for sent in fakeBot.sent if sent[1] == 666])
+	normalAnswers = len([sent for sent in fakeBot.sent if sent[1] != 666 and "slow down" not in sent[2]])
+
+	return elapsed, spammerMessages, normalCommands - normalAnswers
+
+def main(users=1000, spammerCommands=1000):
+	rateLimiter = RateLimiter()
+	userIds = iter(xrange(10000000))
+	report("check of a new user", measure(lambda: rateLimiter.check(str(next(userIds)), 1), 10000))
+	report("check of the same user", measure(lambda: rateLimiter.check("1", 2, now=0), 10000))
+
+	rateLimiter = RateLimiter(maxBuckets=1000)
+	now = time.time()
+	for user in range(100000):
+		rateLimiter.check(str(user), user, now=now)
+	print "Buckets kept after 100,000 users with maxBuckets=1000: " + str(rateLimiter.getStats())
+
+	# Every user sends two commands, and the spammer sends commands with 5 coins (the most a command can cost) in between
+	randomGenerator = random.Random(1)
+	commands = [(user, "/price btc") for user in range(1000, 1000 + users)] + [(user, "/coinInfo btc") for user in range(1000, 1000 + users)]
+	randomGenerator.shuffle(commands)
+	commands += [(666, "/coinInfo btc c1 c2 c3 c4")] * spammerCommands
+	randomGenerator.shuffle(commands)
+	updates = [makeUpdate(updateId, user, text) for updateId, (user, text) in enumerate(commands, 1)]
+
+	print str(len(updates)) + " commands, " + str(spammerCommands) + " of them from a single user"
+	for name, rateLimiter in [("limiter", RateLimiter()), ("no limiter", None)]:
+		elapsed, spammerMessages, limitedCommands = runUpdates(rateLimiter, updates, 2 * users)
+		report(name + ": " + str(spammerMessages) + " to the spammer, " + str(limitedCommands) + " others limited", elapsed)
+
+	return
+
+if __name__ == "__main__":
+	main()
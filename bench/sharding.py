@@ -0,0 +1,168 @@
+# Benchmark of a ShardedCryptoBot, the updates processed per second with a single worker and with several of them,
+# and the memory every worker needs for its copy of the market information loaded from the snapshot file
+# The workers send their messages to a local telegram api, and the limit of messages of the whole bot is taken out
+import BaseHTTPServer
+import gc
+import json
+import multiprocessing
+import os
+import Queue
+import shutil
+import SocketServer
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import telegram.ext.updater
+from telegram import Update
+from bench.timing import report
+from tests.fakes import FakeMarket
+from cryptoCoin import SnapshotFile
+from cryptoCoin.MarketCache import MarketCache
+from ShardedCryptoBot import ShardedCryptoBot
+
+# The currencies the CryptoBot supports, the snapshots of the workers have the tickers in all of them
+_currencies = ["USD", "AUD", "BRL", "CAD", "CHF", "CNY", "EUR", "GBP", "HKD", "IDR", "INR", "JPY", "KRW", "MXN", "RUB"]
+
+# _answeredChats are the chats of the sendMessage calls
+_answeredChats = Queue.Queue()
+
+class _TelegramHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+	protocol_version = "HTTP/1.1"
+	wbufsize = -1
+	timeout = 1
+
+	def do_POST(self):
+		body = self.rfile.read(int(self.headers.getheader("Content-Length", 0)))
+		method = self.path.rsplit("/", 1)[-1]
+
+		if(method == "getMe"):
+			result = {"id": 1, "first_name": "bot", "is_bot": True, "username": "testbot"}
+		elif(method == "sendMessage"):
+			chatId = json.loads(body)["chat_id"]
+			_answeredChats.put(chatId)
+			result = {"message_id": 1, "date": 0, "chat": {"id": chatId, "type": "private"}}
+		else:
+			result = []
+
+		body = json.dumps({"ok": True, "result": result})
+		self.send_response(200)
+		self.send_header("Content-Type", "application/json")
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	do_GET = do_POST
+
+	def log_message(self, *args):
+		return
+
+class _TelegramServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+	daemon_threads = True
+
+def makeUpdate(updateId, chatId, text, bot):
+	return Update.de_json({"update_id": updateId, "message": {"message_id": updateId, "date": 0, "chat": {"id": chatId, "type": "private"},
+		"from": {"id": chatId, "first_name": "user", "is_bot": False}, "text": text,
+		"entities": [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]}}, bot)
+
+# Waits until all the chats given got an answer
+def waitAnswers(chats, timeout=60):
+	chats = set(chats)
+
+	while(chats):
+		chats.discard(_answeredChats.get(timeout=timeout))
+
+	return
+
+# Returns the seconds a ShardedCryptoBot with the workers given takes to answer a command of every chat
+def measureThroughput(workers, chats):
+	directory = tempfile.mkdtemp()
+
+	try:
+		shardedBot = ShardedCryptoBot("123:ABC", "1", os.path.join(directory, "snapshot"), workers=workers, market=FakeMarket(1500),
+			registryDirectory=directory, messageRate=1000000)
+		dispatcher = shardedBot._ShardedBot__botUpdater.dispatcher
+
+		# Every worker answers once before the measure, so all of them have loaded the snapshot file
+		dispatcher.process_update(makeUpdate(1, 1, "/startBot", dispatcher.bot))
+		for worker in range(workers):
+			dispatcher.process_update(makeUpdate(2 + worker, 10 + worker, "/coinInfo BTC", dispatcher.bot))
+		waitAnswers([1] + range(10, 10 + workers))
+
+		startTime = time.time()
+		for chat in range(100, 100 + chats):
+			dispatcher.process_update(makeUpdate(chat, chat, "/coinInfo C" + str(chat % 50) + " C" + str(chat % 30), dispatcher.bot))
+		waitAnswers(range(100, 100 + chats))
+		elapsed = time.time() - startTime
+
+		shardedBot.stop()
+	finally:
+		shutil.rmtree(directory)
+
+	return elapsed
+
+# Returns the resident memory of this process in KB
+def getResidentMemory():
+	return int(open("/proc/self/statm").read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024.0
+
+# Prints the size of the snapshot file and how much the memory of this process grows when it loads it, like every worker does
+def measureSnapshot(path):
+	gc.collect()
+	memoryBefore = getResidentMemory()
+	snapshots = SnapshotFile.readSnapshots(path)
+	gc.collect()
+
+	print "%d %d" % (os.path.getsize(path) / 1024, getResidentMemory() - memoryBefore)
+	return
+
+# Returns the size of the snapshot file of a market with the coins given, and the memory a worker needs to load it, in KB
+# The snapshot is loaded in a new process, so the memory this one has already freed doesn't hide the growth
+def measureWorkerMemory(coins):
+	directory = tempfile.mkdtemp()
+
+	try:
+		path = os.path.join(directory, "snapshot")
+		marketCache = MarketCache(FakeMarket(coins), "USD", _currencies, saveDelay=0)
+		marketCache.refreshCurrencies(_currencies)
+		marketCache.saveSnapshot(path)
+
+		benchDirectory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+		output = subprocess.check_output([sys.executable, "-m", "bench.sharding", path], cwd=benchDirectory)
+	finally:
+		shutil.rmtree(directory)
+
+	return [int(value) for value in output.split()]
+
+def main(workers=3, chats=300):
+	server = _TelegramServer(("127.0.0.1", 0), _TelegramHandler)
+	serverThread = threading.Thread(target=server.serve_forever)
+	serverThread.daemon = True
+	serverThread.start()
+
+	# The updaters of the workers are made in their processes, so the bot class they use is changed to talk to the local api
+	baseUrl = "http://127.0.0.1:" + str(server.server_address[1]) + "/bot"
+	telegramBot = telegram.ext.updater.Bot
+	telegram.ext.updater.Bot = lambda token, *args, **kwargs: telegramBot(token, baseUrl)
+
+	print str(chats) + " commands in " + str(chats) + " chats, " + str(multiprocessing.cpu_count()) + " cores"
+	for workerCount in sorted(set([1, workers])):
+		elapsed = measureThroughput(workerCount, chats)
+		report(str(workerCount) + " workers, " + str(int(chats / elapsed)) + " updates per second", elapsed)
+
+	telegram.ext.updater.Bot = telegramBot
+	time.sleep(2)
+	server.shutdown()
+
+	for coins in [1500, 3000]:
+		fileSize, memory = measureWorkerMemory(coins)
+		print "Snapshot of %d coins in %d currencies: %d KB file, %d KB more memory per worker" % (coins, len(_currencies), fileSize, memory)
+
+	return
+
+if __name__ == "__main__":
+	if(len(sys.argv) > 1):
+		measureSnapshot(sys.argv[1])
+	else:
+		main()
@@ -0,0 +1,32 @@
+# Benchmark of the startup of a CryptoBot in every warm up mode, with a market that takes 50ms to answer every request
+# It also shows how many requests were done before the bot was ready and how long the first command of another currency waits
+import time
+
+from bench.timing import report
+from tests.fakes import FakeMarket, waitFor
+from CryptoBot import CryptoBot, CoinField, WarmupMode
+
+def main(delay=0.05):
+	print "Startup with a market that takes " + str(int(delay * 1000)) + "ms per request"
+
+	for warmup in [WarmupMode.EAGER, WarmupMode.LAZY, WarmupMode.BACKGROUND]:
+		market = FakeMarket(1500, delay)
+		cryptoBot = CryptoBot("123:ABC", "1", market=market, warmup=warmup)
+		calls = market.countCalls()
+
+		report(str(warmup) + ", startup (" + str(calls) + " requests)", cryptoBot.getStartupTime())
+
+		# The background warm up is given the time to finish, like a bot that has been running for a while
+		if(warmup == WarmupMode.BACKGROUND):
+			waitFor(lambda: None not in cryptoBot.getMarketStaleness().values(), 10)
+
+		startTime = time.time()
+		cryptoBot.getStringInfo(["btc"], "JPY", CoinField.PRICE_FIAT)
+		report(str(warmup) + ", first command in JPY", time.time() - startTime)
+
+		cryptoBot.stopBackgroundRefresh()
+
+	return
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,41 @@
+# Benchmark of the text of the /coinInfo and /price commands (CryptoBot.getStringInfo) for 20 coins
+# The single lookup of every coin is compared with calling the accessor of every field, like the bot used to do
+from bench.timing import measure, report
+from tests.fakes import FakeMarket
+from CryptoBot import CryptoBot, CoinField
+
+# The way the bot used to build the text: every accessor looks the coin up again
+def accessorsInfo(cryptoBot, coins, currency):
+	infoString = ""
+
+	for coin in coins:
+		info = cryptoBot.getInfo(coin, currency)
+
+		if(info == None):
+			continue
+
+		infoString += "Name of coin: " + info['name'] + " [" + info['symbol'] + "]\n"
+		infoString += "Rank: " + cryptoBot.getRank(coin) + "\n\n"
+		infoString += "Price in " + currency + ": " + cryptoBot.getPriceInFiat(coin, currency) + "\n"
+		infoString += "Price in BTC: " + cryptoBot.getPriceInCoin(coin) + "\n\n"
+		infoString += "Market Cap in " + currency + ": " + cryptoBot.getMarketCap(coin, currency) + "\n"
+		infoString += "24h Volume in " + currency + ": " + cryptoBot.getVolume(coin, currency) + "\n\n"
+		infoString += "Change 1h: " + cryptoBot.getChangeLastHour(coin) + "\n"
+		infoString += "Change 24h: " + cryptoBot.getChangeLastDay(coin) + "\n"
+		infoString += "Change 7d: " + cryptoBot.getChangeLastSevenDays(coin) + "\n\n"
+
+	return infoString
+
+def main(coinsCount=20, marketCoins=1500):
+	cryptoBot = CryptoBot("123:ABC", "1", market=FakeMarket(marketCoins))
+	coins = ["btc"] + ["c" + str(position) for position in range(1, marketCoins, marketCoins // coinsCount)][:coinsCount - 1]
+
+	print "Text of " + str(len(coins)) + " coins between " + str(marketCoins) + " coins"
+	report("accessor per field, all the fields", measure(lambda: accessorsInfo(cryptoBot, coins, "USD"), 200))
+	report("getStringInfo, all the fields", measure(lambda: cryptoBot.getStringInfo(coins, "USD"), 200))
+	report("getStringInfo, only the price", measure(lambda: cryptoBot.getStringInfo(coins, "USD", CoinField.PRICE_FIAT), 200))
+
+	return
+
+if __name__ == "__main__":
+	main()
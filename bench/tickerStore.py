@@ -0,0 +1,75 @@
+# Benchmark of the columnar ticker store with 2,000 coins, compared with the list of raw tickers (dicts of strings) the bot used to keep
+# Raw tickers have to convert the strings of every coin to sort them, the store keeps the numbers in typed columns
+# The memory is measured for the 15 currencies of the bot, both with a store downloaded for every currency
+# and with the stores converted from the USD one
+import gc
+import heapq
+import itertools
+import json
+import sys
+import types
+
+from bench.timing import measure, report
+from tests.fakes import makeTickers
+from cryptoCoin.TickerStore import TickerStore
+
+# The currencies the CryptoBot supports
+_currencies = ["USD", "AUD", "BRL", "CAD", "CHF", "CNY", "EUR", "GBP", "HKD", "IDR", "INR", "JPY", "KRW", "MXN", "RUB"]
+
+# Returns the number of a field of a raw ticker, the missing values go last
+def rawValue(ticker, field):
+	value = ticker.get(field)
+	return float(value) if value != None else float("-inf")
+
+# Returns the tickers of a currency the way coinmarketcap gives them, decoded from json so every value is its own string
+def downloadTickers(coins, currency):
+	return json.loads(json.dumps(makeTickers(coins, None if currency == "USD" else currency)))
+
+# Returns the bytes used by the objects given and everything they reference, counting every object only once
+# The classes, modules and functions are left out, since they are there no matter how the tickers are kept
+def getDeepSize(objects):
+	seen = set()
+	pending = list(objects)
+	total = 0
+
+	while(pending):
+		obj = pending.pop()
+
+		if(id(obj) in seen or isinstance(obj, (type, types.ClassType, types.ModuleType, types.FunctionType))):
+			continue
+
+		seen.add(id(obj))
+		total += sys.getsizeof(obj)
+		pending.extend(gc.get_referents(obj))
+
+	return total
+
+def main(coins=2000):
+	tickers = makeTickers(coins)
+	store = TickerStore(tickers)
+
+	print "Ticker store with " + str(coins) + " coins"
+	report("build the store", measure(lambda: TickerStore(tickers), 5))
+	report("raw tickers, top 10 by market cap", measure(lambda: heapq.nlargest(10, tickers, key=lambda ticker: rawValue(ticker, "market_cap_usd")), 50))
+	report("store, top 10 by market cap", measure(lambda: store.topBy("market_cap_usd", 10), 500))
+	report("raw tickers, sort by price", measure(lambda: sorted(tickers, key=lambda ticker: rawValue(ticker, "price_usd")), 50))
+	report("store, sort by price", measure(lambda: store.sortBy("price_usd"), 200))
+	# Every conversion uses a new rate, otherwise the store returns the one it already has
+	rates = itertools.count(1)
+	report("store, convert to another currency", measure(lambda: store.convert("USD", "EUR", next(rates)), 20))
+	report("store, convert again with the same rate", measure(lambda: store.convert("USD", "EUR", 0.85), 1000))
+
+	rawTickers = dict((currency, downloadTickers(coins, currency)) for currency in _currencies)
+	stores = [TickerStore(rawTickers[currency]) for currency in _currencies]
+	usdStore = TickerStore(rawTickers["USD"])
+	convertedStores = [usdStore] + [usdStore.convert("USD", currency, 2.0) for currency in _currencies[1:]]
+
+	print "Memory of the tickers of " + str(len(_currencies)) + " currencies"
+	print "%-50s %10.0f KB" % ("raw tickers", getDeepSize(rawTickers.values()) / 1024.0)
+	print "%-50s %10.0f KB" % ("a store downloaded for every currency", getDeepSize(stores) / 1024.0)
+	print "%-50s %10.0f KB" % ("the USD store and its conversions", getDeepSize(convertedStores) / 1024.0)
+
+	return
+
+if __name__ == "__main__":
+	main()
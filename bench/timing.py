@@ -0,0 +1,19 @@
+# Timeit is used to get the best time out of several rounds, so the noise of the machine doesn't count
+import timeit
+
+# This file has the functions shared by the benchmarks to measure and print the times
+
+# Returns the seconds a call to the function takes, the best of repeat rounds of number calls each
+def measure(function, number=1, repeat=5):
+	return min(timeit.repeat(function, number=number, repeat=repeat)) / number
+
+# Prints the time of a case, in the unit that fits it best
+def report(name, seconds):
+	if(seconds >= 1):
+		print "%-50s %10.3f s" % (name, seconds)
+	elif(seconds >= 0.001):
+		print "%-50s %10.3f ms" % (name, seconds * 1000)
+	else:
+		print "%-50s %10.3f us" % (name, seconds * 1000000)
+
+	return
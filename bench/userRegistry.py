@@ -0,0 +1,32 @@
+# Benchmark of the check the bot does on every command to know if the user is banned, with 100,000 banned users
+# The set of the registry is compared with the list the bot used to keep, and saving the registry file is measured too
+import os
+import shutil
+import tempfile
+
+from bench.timing import measure, report
+from chatBot.UserRegistry import UserRegistry
+
+def main(usersCount=100000):
+	users = [str(user) for user in range(100, 100 + usersCount)]
+	directory = tempfile.mkdtemp()
+
+	try:
+		registry = UserRegistry(users, os.path.join(directory, "banned.json"))
+		# Adding a user saves the file, so there is a file to load later
+		registry.add(["1"])
+
+		print str(usersCount) + " banned users"
+		report("list, user that is not banned", measure(lambda: "42" in users, 100))
+		report("list, last user banned", measure(lambda: users[-1] in users, 100))
+		report("registry, user that is not banned", measure(lambda: "42" in registry, 100000))
+		report("registry, last user banned", measure(lambda: users[-1] in registry, 100000))
+		report("registry, ban and unban a user (2 saves)", measure(lambda: (registry.add(["42"]), registry.remove(["42"])), 5, 3))
+		report("registry, load the file", measure(lambda: UserRegistry([], os.path.join(directory, "banned.json")), 5, 3))
+	finally:
+		shutil.rmtree(directory)
+
+	return
+
+if __name__ == "__main__":
+	main()
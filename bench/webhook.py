@@ -0,0 +1,110 @@
+# Benchmark of the latency of a command, from the moment telegram has it until the answer is sent,
+# receiving the updates through a webhook or polling a local telegram api for them
+import BaseHTTPServer
+import json
+import Queue
+import SocketServer
+import threading
+import time
+import urllib2
+
+from telegram import User
+from bench.timing import report
+from tests.fakes import FakeMarket
+from CryptoBot import CryptoBot
+
+# _pendingUpdates are the updates waiting for a getUpdates, _sentMessages the chats of the sendMessage calls
+_pendingUpdates = Queue.Queue()
+_sentMessages = Queue.Queue()
+
+# The connections the bot keeps alive are closed after a second without requests, so none is left open when the benchmark ends
+class _TelegramHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+	protocol_version = "HTTP/1.1"
+	wbufsize = -1
+	timeout = 1
+
+	def do_POST(self):
+		body = self.rfile.read(int(self.headers.getheader("Content-Length", 0)))
+		method = self.path.rsplit("/", 1)[-1]
+
+		if(method == "getUpdates"):
+			timeout = float(json.loads(body or "{}").get("timeout", 0))
+			try:
+				result = [_pendingUpdates.get(timeout=timeout or 0.01)]
+			except Queue.Empty:
+				result = []
+		elif(method == "sendMessage"):
+			_sentMessages.put(json.loads(body)["chat_id"])
+			result = {"message_id": 1, "date": 0, "chat": {"id": 1, "type": "private"}}
+		else:
+			result = True
+
+		body = json.dumps({"ok": True, "result": result})
+		self.send_response(200)
+		self.send_header("Content-Type", "application/json")
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	do_GET = do_POST
+
+	def log_message(self, *args):
+		return
+
+class _TelegramServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+	daemon_threads = True
+
+def makeUpdateData(updateId):
+	return {"update_id": updateId, "message": {"message_id": updateId, "date": 0, "chat": {"id": updateId, "type": "private"},
+		"from": {"id": updateId, "first_name": "user", "is_bot": False}, "text": "/myUserId", "entities": [{"type": "bot_command", "offset": 0, "length": 9}]}}
+
+# Returns the average and the median of the seconds between sending every command and getting its answer
+# Every command goes to a new chat, so the answers are not delayed by the limit of messages per chat,
+# and the messages to the chats of the previous commands are skipped
+def measureCommands(send, firstId, commands):
+	latencies = []
+
+	for updateId in range(firstId, firstId + commands):
+		startTime = time.time()
+		send(makeUpdateData(updateId))
+		while(_sentMessages.get(timeout=10) != updateId):
+			pass
+		latencies.append(time.time() - startTime)
+
+	latencies.sort()
+	return sum(latencies) / len(latencies), latencies[len(latencies) // 2]
+
+def main(commands=50):
+	server = _TelegramServer(("127.0.0.1", 0), _TelegramHandler)
+	serverThread = threading.Thread(target=server.serve_forever)
+	serverThread.daemon = True
+	serverThread.start()
+
+	cryptoBot = CryptoBot("123:ABC", "1", market=FakeMarket())
+	telegramBot = cryptoBot._getBot()
+	telegramBot.base_url = "http://127.0.0.1:" + str(server.server_address[1]) + "/bot123:ABC"
+	telegramBot.bot = User(1, "bot", True, username="testbot")
+
+	print "Latency of " + str(commands) + " commands through a local telegram api"
+	cryptoBot.startPolling()
+	time.sleep(0.5)
+	average, median = measureCommands(_pendingUpdates.put, 1, commands)
+	cryptoBot.stopPolling()
+	report("polling, average", average)
+	report("polling, median", median)
+
+	cryptoBot.startWebhook(port=0, urlPath="/hook")
+	webhookUrl = "http://127.0.0.1:" + str(cryptoBot._getWebhookServer().getAddress()[1]) + "/hook"
+	post = lambda data: urllib2.urlopen(urllib2.Request(webhookUrl, json.dumps(data), {"Content-Type": "application/json"})).read()
+	average, median = measureCommands(post, commands + 1, commands)
+	cryptoBot.stopWebhook()
+	report("webhook, average", average)
+	report("webhook, median", median)
+
+	# The last messages may still be waiting for the limit of their chats
+	time.sleep(2)
+	server.shutdown()
+	return
+
+if __name__ == "__main__":
+	main()
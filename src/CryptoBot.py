@@ -1,6 +1,8 @@
-# Datetime import is needed since we are going to use the time to avoid 
-# doing a lot of request in a small amout of time
-import datetime;
+# Time and threading are used to measure the startup and to warm up the currencies in the background
+import time
+import threading
+# Datetime is used to show the start of the candles
+import datetime
 
 # Enum es used for the FiatCurrencies enumaration used that is still being implemented
 from enum import Enum
@@ -8,6 +10,19 @@ from enum import Enum
 from coinmarketcap import Market
 # Chat bot is the father class we are using to implement out own cryptoBot
 from chatBot.ChatBot import ChatBot, BotState
+# The market cache keeps the coinmarketcap information and the refresher keeps it updated in the background
+from cryptoCoin.MarketCache import MarketCache
+from cryptoCoin.MarketRefresher import MarketRefresher
+from cryptoCoin.SnapshotWatcher import SnapshotWatcher
+# The alert engine keeps the price alerts of the users and checks them after every refresh
+from cryptoCoin.AlertEngine import AlertEngine, AlertType, isValidPrice
+# The aggregator queries all the exchangers at the same time
+from cryptoExchanger.ExchangerAggregator import ExchangerAggregator
+# The arbitrage scanner looks for price differences between the markets of the exchangers
+from cryptoExchanger.ArbitrageScanner import ArbitrageScanner, isValidMarket
+from cryptoExchanger.ScannerRefresher import ScannerRefresher
+# The candle poller builds the OHLCV candles of the markets from the market history of an exchanger
+from cryptoExchanger.CandlePoller import CandlePoller
 
 # This may not be needed, just added in case we may use an enum instead of string
 # This is just a prototype idea of redisigning the use of the fiat currency
@@ -42,6 +57,26 @@ class CoinField(Enum):
 	CHANGE_24H = 'percent_24h'
 	CHANGE_7D = 'percent_7d'
 
+# Class to choose how the market information of the currencies is loaded when the bot starts
+# EAGER loads every supported currency before the bot starts answering commands
+# LAZY loads only the default currency, the other ones are loaded the first time someone uses them
+# BACKGROUND loads the default currency and the other ones in parallel in the background
+class WarmupMode(Enum):
+	EAGER = 0
+	LAZY = 1
+	BACKGROUND = 2
+
+# Class to choose how the commands get the information they need
+# BLOCKING commands wait for coinmarketcap and the exchangers when the information is missing or expired
+# NONBLOCKING commands never wait: they only read what the background refreshers already got, and the missing
+# information is downloaded in the background, so the dispatcher thread is always free for the next update
+# READER commands never download the coinmarketcap information, they read the snapshot file another process keeps updated
+# (it is used by the workers of a ShardedCryptoBot, so all of them share a single download)
+class RuntimeMode(Enum):
+	BLOCKING = 0
+	NONBLOCKING = 1
+	READER = 2
+
 # This class will be in charge of expanding the Chatbot class with new features
 # This class will implement the coinmarketcap api to expand the functionality
 class CryptoBot(ChatBot):
@@ -49,48 +84,88 @@ class CryptoBot(ChatBot):
 	# __defaultCoin is used to know which will be the coin used to report the value of other coins
 	# __defaultCurrency is used to know which of the fiat currency is going to be used for reporting
 	# __supportedCurrencies will be the list of currencies that coinmarketcap supports in their api
-	# __savedStats is where we are going to store all the information about the main stats in the market
-	# __savedTickers is where we are going to store all the information related to the coins based on their currency
 	# __currencyPerson is where we will store if someone changes their currency and which are they going to use
-	# __lastUpdatedStats is the timestamp of the last update in the stats
-	# __lastUpdatedTickers is the timestamp of the last update in the tickers
-	# __updateInterval is the value in seconds of the minimum amount of time needed to update the stats and tickers again
 	__defaultCoin = "BTC"
 	__defaultCurrency = "USD"
 	__supportedCurrencies = ["USD", "AUD", "BRL", "CAD", "CHF", "CNY", "EUR", "GBP", "HKD", "IDR", "INR", "JPY", "KRW", "MXN", "RUB"]
-	__savedStats = {}
-	__savedTickers = {}
 	__currencyPerson = {}
-	__lastUpdatedStats = {}
-	__lastUpdatedTickers = {}
-	__updateInterval = None
 
-	# __coinMarketCap is the object created by the coinMarketCap api that will get us all the information from them
-	__coinMarketCap = None
+	# __fullInfoLayout is the order of the fields (and the separator after each one) used when all the info of a coin is requested
+	__fullInfoLayout = [(CoinField.RANK, "\n\n"), (CoinField.PRICE_FIAT, "\n"), (CoinField.PRICE_COIN, "\n\n"),
+		(CoinField.MARKET_CAP, "\n"), (CoinField.VOLUME, "\n\n"),
+		(CoinField.CHANGE_1H, "\n"), (CoinField.CHANGE_24H, "\n"), (CoinField.CHANGE_7D, "\n\n")]
+
+	# __marketCache is the one in charge of getting and keeping the stats and tickers from coinmarketcap for every currency
+	# __marketRefresher is the thread that updates the market cache in the background, if the background refresh is enabled
+	# __snapshotWatcher is the thread that loads the snapshot file in the market cache when it changes, in the READER mode
+	__marketCache = None
+	__marketRefresher = None
+	__snapshotWatcher = None
 	# __exchangerList is the list of exchanger objects that we will use for the functionalities related to the exchangers
+	# __exchangerAggregator is the one in charge of querying all the exchangers at the same time
+	# __arbitrageScanner is the one in charge of finding arbitrage opportunities between the exchangers
 	__exchangerList = None
+	__exchangerAggregator = None
+	__arbitrageScanner = None
+	# __scannerRefresher is the thread that updates the arbitrage scanner in the background, if it is enabled
+	__scannerRefresher = None
+	# __candlePollers is where we store the thread that builds the candles of the markets of every exchanger, by its name
+	# __candlePollersLock is the lock used to make sure only one poller is started per exchanger
+	__candlePollers = None
+	__candlePollersLock = None
+	# __startupTime is the amount of seconds it took to setup the bot
+	__startupTime = None
+	# __alertEngine is the one in charge of keeping the price alerts and checking them every time the prices are refreshed
+	__alertEngine = None
 
 	# Setup of all variables
-	def __init__(self, token, superadminid, adminsid=[], exchangers=[], updateInterval=300, debuglevel=0):
-		super(CryptoBot, self).__init__(token, superadminid, adminsid, debuglevel)
+	def __init__(self, token, superadminid, adminsid=[], exchangers=[], updateInterval=300, backgroundRefresh=False, market=None, warmup=WarmupMode.EAGER, deriveFiat=False, snapshotPath=None, runtime=RuntimeMode.BLOCKING, registryDirectory=None, rateLimiter=None, debuglevel=0):
+		startTime = time.time()
+
+		super(CryptoBot, self).__init__(token, superadminid, adminsid, debuglevel, registryDirectory, rateLimiter)
 		self._debugLevel = debuglevel
 		if (self._debugLevel > 0): print "Debug Level: " + str(debuglevel)
 
-		self.__exchangerList = exchangers
-		self.__updateInterval = updateInterval	
+		self.__exchangerList = []
+		self.__exchangerAggregator = ExchangerAggregator(debuglevel=debuglevel)
+		self.__arbitrageScanner = ArbitrageScanner(debuglevel=debuglevel)
+		self.__candlePollers = {}
+		self.__candlePollersLock = threading.Lock()
+		for exchanger in exchangers:
+			self.addExchanger(exchanger)
+
 		if (self._debugLevel >= 1): print "Update Interval: " + str(updateInterval)
 
-		self.__coinmarketcap = Market()
+		if(market == None):
+			market = Market()
+
+		self.__marketCache = MarketCache(market, self.__defaultCurrency, self.__supportedCurrencies, updateInterval, deriveFiat=deriveFiat, debuglevel=debuglevel)
+		self.__alertEngine = AlertEngine(debuglevel)
+		self.__marketCache.addListener(self.__checkAlerts)
+
+		if (self._debugLevel >= 1): print "Warmup Mode: " + str(warmup)
+		if (self._debugLevel >= 1): print "Supported Currencies: " + str(self.__supportedCurrencies)
 
-		for currency in self.__supportedCurrencies:
-			if (self._debugLevel >= 1): print "Supported Currency: " + currency
-			self.__lastUpdatedStats[currency] = datetime.datetime.min
-			self.__lastUpdatedTickers[currency] = datetime.datetime.min
-			self.__getStats(currency)
-			self.__getTickers(currency)
+		if (self._debugLevel >= 1): print "Runtime Mode: " + str(runtime)
+
+		# In the READER mode there is no warm up, the snapshots are loaded from the file as soon as it exists
+		if(runtime == RuntimeMode.READER):
+			self.__marketCache.setReadOnly(True)
+			self.__snapshotWatcher = SnapshotWatcher(self.__marketCache, snapshotPath, debuglevel=debuglevel)
+			self.__snapshotWatcher.check()
+			self.__snapshotWatcher.start()
+		else:
+			self.__warmUpMarket(warmup, snapshotPath)
+
+		if(backgroundRefresh or runtime == RuntimeMode.NONBLOCKING):
+			self.startBackgroundRefresh()
+
+		if(runtime == RuntimeMode.NONBLOCKING):
+			self.__marketCache.setBlockingReads(False)
+			self.startScannerRefresh()
 
 		if (self._debugLevel >= 1): print "Adding Handlers"
-		self._addCommandHandler('currency', self.__setCurrency, pass_args=True)
+		self._addCommandHandler('currency', self.__setCurrency, pass_args=True, shared=True)
 		self._addCommandHandler('fiatPrice', self.__getPriceFiat, pass_args=True)
 		self._addCommandHandler('price', self.__getPriceCoin, pass_args=True)
 		self._addCommandHandler('rank', self.__getRank, pass_args=True)
@@ -100,29 +175,229 @@ class CryptoBot(ChatBot):
 		self._addCommandHandler('change24h', self.__getChangeLastDay, pass_args=True)
 		self._addCommandHandler('change7d', self.__getChangeLastSevenDays, pass_args=True)
 		self._addCommandHandler('coinInfo', self.__getInfoCoin, pass_args=True)
+		self._addCommandHandler('alertAbove', self.__setAlertAbove, pass_args=True)
+		self._addCommandHandler('alertBelow', self.__setAlertBelow, pass_args=True)
+		self._addCommandHandler('removeAlert', self.__removeAlert, pass_args=True)
+		self._addCommandHandler('listAlerts', self.__listAlerts)
+		self._addCommandHandler('bestPrice', self.__getBestPrice, pass_args=True)
+		self._addCommandHandler('arbitrage', self.__getArbitrage)
+		self._addCommandHandler('candles', self.__getCandles, pass_args=True)
 
 		self._removeHandler(self._unknownHandler)
 		self._addHandler(self._unknownHandler)
 
+		self.__startupTime = time.time() - startTime
+		if (self._debugLevel >= 1): print "Startup Time: " + str(self.__startupTime) + " seconds"
+
 		return
 
 	# Functions related to bot functionalities with especific exchangers
 
 	# It will add a new exchanger object to the list of exchangers we already have
+	# Returns False if we already had an exchanger with the same name
 	def addExchanger(self, exchanger):
-		raise NotImplementedError("You need to implement addExchanger before using it")
+		if(not self.__exchangerAggregator.addExchanger(exchanger)):
+			return False
+
+		self.__exchangerList.append(exchanger)
+		if (self._debugLevel >= 1): print "Exchanger added: " + exchanger.getName()
+		return True
 
-	# It will remove an exchanger object from the list of exchangers we have
+	# It will remove an exchanger object from the list of exchangers we have, and its prices from the arbitrage scanner
+	# Returns False if we didn't have it
 	def removeExchanger(self, exchanger):
-		raise NotImplementedError("You need to implement removeExchanger before using it")
+		if(not self.__exchangerAggregator.removeExchanger(exchanger)):
+			return False
+
+		self.__arbitrageScanner.removeExchanger(exchanger.getName())
+
+		with self.__candlePollersLock:
+			candlePoller = self.__candlePollers.pop(exchanger.getName(), None)
+
+		if(candlePoller != None):
+			candlePoller.stop()
+
+		self.__exchangerList = [oldExchanger for oldExchanger in self.__exchangerList if oldExchanger.getName() != exchanger.getName()]
+		if (self._debugLevel >= 1): print "Exchanger removed: " + exchanger.getName()
+		return True
+
+	def getExchangers(self):
+		return list(self.__exchangerList)
+
+	# Returns the best bid and ask of a market between all the exchangers (see ExchangerAggregator.getBestPrices)
+	# While the scanner is refreshed in the background they are taken from it instead of asking the exchangers
+	# Returns None if the market is not a base and a quote currency separated by a dash (like BTC-LTC)
+	def getBestPrices(self, market):
+		if(not isValidMarket(market)):
+			return None
+
+		if(self.__isScannerRefreshing()):
+			return self.__arbitrageScanner.getBestPrices(market)
+
+		return self.__exchangerAggregator.getBestPrices(market)
+
+	# Returns the arbitrage opportunities (see ArbitrageScanner.getOpportunities)
+	# The scanner is updated with the summaries of the exchangers first, unless it is refreshed in the background
+	def getArbitrageOpportunities(self):
+		if(self.__isScannerRefreshing()):
+			return self.__arbitrageScanner.getOpportunities()
+
+		return self.__arbitrageScanner.refresh(self.__exchangerAggregator)
+
+	# Function to start refreshing the arbitrage scanner with the summaries of the exchangers in the background
+	def startScannerRefresh(self, refreshInterval=10):
+		if(self.__isScannerRefreshing()):
+			return False
+
+		if (self._debugLevel >= 1): print "Starting Scanner Refresh"
+		self.__scannerRefresher = ScannerRefresher(self.__arbitrageScanner, self.__exchangerAggregator, refreshInterval, self._debugLevel)
+		self.__scannerRefresher.start()
+		return True
+
+	# Function to stop refreshing the arbitrage scanner in the background
+	# Returns False if it was not running, the refresher is forgotten anyway (like when its thread died)
+	def stopScannerRefresh(self):
+		if(not self.__isScannerRefreshing()):
+			self.__scannerRefresher = None
+			return False
+
+		if (self._debugLevel >= 1): print "Stopping Scanner Refresh"
+		self.__scannerRefresher.stop()
+		self.__scannerRefresher = None
+		return True
+
+	def __isScannerRefreshing(self):
+		return self.__scannerRefresher != None and self.__scannerRefresher.isRunning()
+
+	# Returns the last OHLCV candles of an interval ("1m", "5m" or "1h") of a market in an exchanger (see CandleBuilder.getCandles)
+	# If no exchanger is given the first one is used
+	# The first time a market is asked its market history is downloaded right away, and then it keeps being polled in the background
+	# Returns None if the market or the interval are not valid, we don't have the exchanger or it has no history for the market
+	def getCandles(self, market, interval="1h", count=None, exchangerName=None):
+		if(not isValidMarket(market)):
+			return None
+
+		candlePoller = self.__getCandlePoller(exchangerName)
+
+		if(candlePoller == None):
+			return None
+
+		if(candlePoller.getBuilder(market) == None):
+			candlePoller.addMarket(market)
+
+			if(candlePoller.pollMarket(market) == None):
+				candlePoller.removeMarket(market)
+				return None
+
+		if(interval not in candlePoller.getBuilder(market).getIntervals()):
+			return None
+
+		return candlePoller.getCandles(market, interval, count)
+
+	# Function to stop building the candles of every exchanger
+	def stopCandlePolling(self):
+		with self.__candlePollersLock:
+			candlePollers = self.__candlePollers.values()
+			self.__candlePollers = {}
+
+		for candlePoller in candlePollers:
+			candlePoller.stop()
+
+		return
+
+	# Returns the candle poller of an exchanger, starting it if it was not running, None if we don't have the exchanger
+	def __getCandlePoller(self, exchangerName):
+		exchangers = [exchanger for exchanger in self.__exchangerList if exchangerName == None or exchanger.getName() == exchangerName]
+
+		if(len(exchangers) == 0):
+			return None
+
+		exchanger = exchangers[0]
+
+		with self.__candlePollersLock:
+			candlePoller = self.__candlePollers.get(exchanger.getName())
+
+			if(candlePoller == None or not candlePoller.isRunning()):
+				if (self._debugLevel >= 1): print "Starting Candle Poller of " + exchanger.getName()
+				candlePoller = CandlePoller(exchanger, debuglevel=self._debugLevel)
+				candlePoller.start()
+				self.__candlePollers[exchanger.getName()] = candlePoller
+
+			return candlePoller
 
 	# Function to change the interval between updates
 	def setUpdateInterval(self, interval):
-		self.__updateInterval = interval
+		self.__marketCache.setUpdateInterval(interval)
 
 	# Function to get the interval between updates
 	def getUpdateInterval(self):
-		return self.__updateInterval
+		return self.__marketCache.getUpdateInterval()
+
+	# Function to start refreshing the market information in the background
+	# While it is running the commands will always use the last information we got, without waiting for coinmarketcap
+	def startBackgroundRefresh(self, margin=30, checkInterval=5):
+		if(self.__marketRefresher != None and self.__marketRefresher.isRunning()):
+			return False
+
+		if (self._debugLevel >= 1): print "Starting Background Refresh"
+		self.__marketCache.setLazyRefresh(False)
+		self.__marketRefresher = MarketRefresher(self.__marketCache, margin, checkInterval, self._debugLevel)
+		self.__marketRefresher.start()
+		return True
+
+	# Function to stop refreshing the market information in the background
+	# After it stops the information will be refreshed again when someone asks for it
+	def stopBackgroundRefresh(self):
+		if(self.__marketRefresher == None or not self.__marketRefresher.isRunning()):
+			return False
+
+		if (self._debugLevel >= 1): print "Stopping Background Refresh"
+		self.__marketRefresher.stop()
+		self.__marketRefresher = None
+		self.__marketCache.setLazyRefresh(True)
+		return True
+
+	# Returns how many seconds old is the information we have for every currency
+	def getMarketStaleness(self):
+		return self.__marketCache.getStaleness()
+
+	# Returns the amount of seconds it took to setup the bot
+	def getStartupTime(self):
+		return self.__startupTime
+
+	# Loads the information of the currencies as the warmup mode says, using the last snapshot saved if there is one
+	def __warmUpMarket(self, warmup, snapshotPath):
+		# The currencies that we can load from the last snapshot saved don't need to be downloaded again
+		loadedCurrencies = []
+		if(snapshotPath != None):
+			loadedCurrencies = self.__marketCache.loadSnapshot(snapshotPath)
+
+		if(warmup == WarmupMode.EAGER):
+			for currency in self.__supportedCurrencies:
+				if(currency not in loadedCurrencies):
+					self.__marketCache.refresh(currency)
+		elif(self.__defaultCurrency not in loadedCurrencies):
+			self.__marketCache.refresh(self.__defaultCurrency)
+
+		# The snapshot is saved once after the warm up, and then after every refresh
+		if(snapshotPath != None):
+			self.__marketCache.setSnapshotPath(snapshotPath)
+			self.__marketCache.saveSnapshot()
+
+		if(warmup == WarmupMode.BACKGROUND):
+			otherCurrencies = [currency for currency in self.__supportedCurrencies if currency != self.__defaultCurrency and currency not in loadedCurrencies]
+			self.__warmUp(otherCurrencies)
+
+		return
+
+	# Loads the information of the currencies in the background, downloading several of them at the same time
+	def __warmUp(self, currencies):
+		if (self._debugLevel >= 2): print "Warming up: " + str(currencies)
+		warmUpThread = threading.Thread(target=self.__marketCache.refreshCurrencies, args=(currencies,), name="WarmUp")
+		warmUpThread.daemon = True
+		warmUpThread.start()
+
+		return
 
 	# Function to set an specific user currency
 	def setUserCurrency(self, userid, currency):
@@ -134,24 +409,70 @@ class CryptoBot(ChatBot):
 
 	# Related to bot functiuonalities with any info in the coins
 
+	# The prices of the alerts are always in the default currency
+	# They are checked every time the tickers of the default currency are refreshed
+
 	# Function that will create an alarm in case of a coin prices goes above the price we set
+	# Returns the id of the alert, or None if the coin doesn't exist
 	def setAlertPriceAbove(self, coin, price, person):
-		raise NotImplementedError("You need to implement setAlertPriceAbove before using it")
+		return self.__setAlert(coin, AlertType.ABOVE, price, person)
 
 	# Function that will create an alarm in case of a coin prices goes below the price we set
+	# Returns the id of the alert, or None if the coin doesn't exist
 	def setAlertPriceBelow(self, coin, price, person):
-		raise NotImplementedError("You need to implement setAlertPriceBelow before using it")
+		return self.__setAlert(coin, AlertType.BELOW, price, person)
 
-	# Function that will remove an alarm
+	# Function that will remove an alarm, returns False if the alarm doesn't exist or it is from someone else
 	def removeAlert(self, alertid, person):
-		raise NotImplementedError("You need to implement removeAlert before using it")
+		return self.__alertEngine.removeAlert(alertid, person)
+
+	# Function to get the alerts of a person, as a dict from the alert id to a tuple with the coin, type and price
+	def getAlerts(self, person):
+		return self.__alertEngine.getAlerts(person)
+
+	def __setAlert(self, coin, alertType, price, person):
+		coinTicker = self.getInfo(coin, self.__defaultCurrency)
+
+		if(coinTicker == None):
+			return None
+
+		return self.__alertEngine.addAlert(coinTicker['id'], alertType, float(price), person)
+
+	# Listener of the market cache that checks the alerts when the tickers of the default currency are refreshed
+	# The person of the alert is the user id, which is also the id of its private chat with the bot
+	def __checkAlerts(self, kind, currency):
+		if(kind != "tickers" or currency != self.__defaultCurrency):
+			return
+
+		tickers = self.__marketCache.getTickers(currency)
+		priceField = "price_" + currency.lower()
+
+		for alertId, coin, alertType, price, person in self.__alertEngine.evaluate(lambda coin: self.__getCoinValue(tickers, coin, priceField)):
+			returningMessage = "Alert " + str(alertId) + ": " + coin + " is now " + alertType.value + " " + str(price) + " " + currency
+			returningMessage += " (" + tickers.getTicker(coin)[priceField] + ")"
+
+			try:
+				self._sendMessage(self._getBot(), person, returningMessage)
+			except Exception as error:
+				if (self._debugLevel >= 1): print "Error sending alert " + str(alertId) + ": " + str(error)
+
+		return
+
+	def __getCoinValue(self, tickers, coin, field):
+		coinTicker = tickers.getTicker(coin)
+
+		if(coinTicker == None):
+			return None
+
+		return coinTicker.getValue(field)
 	
 	# Information related to coins
+	# Every coin is looked up only once and just the requested fields are read from its ticker
 	def getStringInfo(self, coins, currency=None, field=None):
 		if(currency == None):
 			currency = self.__defaultCurrency
 
-		infoString = ""
+		infoLines = []
 
 		if (self._debugLevel >= 1): print "Getting String Info"
 		if (self._debugLevel >= 2): print "Field: " + str(field)
@@ -159,60 +480,65 @@ class CryptoBot(ChatBot):
 
 		for coin in coins:
 			info = self.getInfo(coin, currency)
-			priceInFiat = self.getPriceInFiat(coin, currency)
-			priceInCoin = self.getPriceInCoin(coin)
-			marketCap = self.getMarketCap(coin, currency)
-			volume = self.getVolume(coin, currency)
-			change1h = self.getChangeLastHour(coin)
-			change24h = self.getChangeLastDay(coin)
-			change7d = self.getChangeLastSevenDays(coin)
 
 			if (self._debugLevel >= 2): print "Info: " + str(info)
 
-			if(info != None):
-				infoString += "Name of coin: " + info['name'] + " [" + info['symbol'] + "]\n"
-
-				if(field == None):
-					infoString += "Rank: " + info['rank'] + "\n\n"
-					infoString += "Price in " + currency + ": " + priceInFiat + "\n"
-					infoString += "Price in " + self.__defaultCoin + ": " + priceInCoin + "\n\n"
-					infoString += "Market Cap in " + currency + ": " + marketCap + "\n"
-					infoString += "24h Volume in " + currency + ": " + volume + "\n\n"
-					infoString += "Change 1h: " + change1h + "\n"
-					infoString += "Change 24h: " + change24h + "\n"
-					infoString += "Change 7d: " + change7d + "\n\n"
-				elif (field == CoinField.PRICE_FIAT):
-					infoString += "Price in " + currency + ": " + priceInFiat + "\n\n"
-				elif (field == CoinField.PRICE_COIN):
-					infoString += "Price in " + self.__defaultCoin + ": " + priceInCoin + "\n\n"
-				elif (field == CoinField.MARKET_CAP):
-					infoString += "Market Cap in " + currency + ": " + marketCap + "\n\n"
-				elif (field == CoinField.VOLUME):
-					infoString += "24h Volume in " + currency + ": " + volume + "\n\n"
-				elif (field == CoinField.CHANGE_1H):
-					infoString += "Change 1h: " + change1h + "\n\n"
-				elif (field == CoinField.CHANGE_24H):
-					infoString += "Change 24h: " + change24h + "\n\n"
-				elif (field == CoinField.CHANGE_7D):
-					infoString += "Change 7d: " + change7d + "\n\n"
-				elif (field == CoinField.RANK):
-					infoString += "Rank: " + info['rank'] + "\n\n"
-		
+			if(info == None):
+				continue
+
+			infoLines.append("Name of coin: " + info['name'] + " [" + info['symbol'] + "]\n")
+
+			if(field == None):
+				for infoField, separator in self.__fullInfoLayout:
+					infoLines.append(self.__getFieldString(info, infoField, currency) + separator)
+			else:
+				fieldString = self.__getFieldString(info, field, currency)
+				if(fieldString != None):
+					infoLines.append(fieldString + "\n\n")
+
+		if(len(infoLines) == 0 and self.__isLoading(currency)):
+			return self.__getLoadingMessage(currency)
+
+		infoString = "".join(infoLines)
+
 		if (self._debugLevel >= 2): print "String Info: \n" + infoString
 		return infoString
 
+	# Returns the line that describes a single field of an already resolved ticker
+	# Fields without a line of their own (like the name or the symbol) return None
+	def __getFieldString(self, coinTicker, field, currency):
+		if (field == CoinField.RANK):
+			return "Rank: " + coinTicker["rank"]
+		elif (field == CoinField.PRICE_FIAT):
+			return "Price in " + currency + ": " + coinTicker["price_" + currency.lower()]
+		elif (field == CoinField.PRICE_COIN):
+			return "Price in " + self.__defaultCoin + ": " + coinTicker["price_" + self.__defaultCoin.lower()]
+		elif (field == CoinField.MARKET_CAP):
+			return "Market Cap in " + currency + ": " + coinTicker["market_cap_" + currency.lower()]
+		elif (field == CoinField.VOLUME):
+			return "24h Volume in " + currency + ": " + coinTicker["24h_volume_" + currency.lower()]
+		elif (field == CoinField.CHANGE_1H):
+			return "Change 1h: " + coinTicker["percent_change_1h"]
+		elif (field == CoinField.CHANGE_24H):
+			return "Change 24h: " + coinTicker["percent_change_24h"]
+		elif (field == CoinField.CHANGE_7D):
+			return "Change 7d: " + coinTicker["percent_change_7d"]
+
+		return None
+
+	# Returns if we still don't have the information of a currency (it is being downloaded in the background)
+	def __isLoading(self, currency):
+		return self.__marketCache.getTickersAge(currency) == None
+
+	def __getLoadingMessage(self, currency):
+		return "I'm still getting the information in " + currency + ", try again in a few seconds"
+
 	# This function will get all the info related to a coin
 	def getInfo(self, coin, currency=None):
 		if(currency == None):
 			currency = self.__defaultCurrency
 
-		coinTicker = None
-		tickers = self.__getTickers(currency)
-		
-		coin = coin.upper()
-		for ticker in tickers:
-			if(ticker['symbol'].upper() == coin or ticker['name'].upper() == coin or ticker['id'].upper() == coin):
-				coinTicker = ticker
+		coinTicker = self.__marketCache.getTicker(coin, currency)
 
 		if (self._debugLevel >= 3): print "Info: " + str(coinTicker)
 		return coinTicker
@@ -327,36 +653,6 @@ class CryptoBot(ChatBot):
 		if (self._debugLevel >= 2): print "Change 7d: " + coinTicker[keyChange]
 		return coinTicker[keyChange]
 
-	# Coinmarketcap function wrapper that will helps us to avoid doing a lot of request to get the stats
-	def __getStats(self, currency):
-		currentTime = datetime.datetime.now()
-		lapsedTime = (currentTime - self.__lastUpdatedStats[currency]).total_seconds()
-
-		if(lapsedTime > self.__updateInterval):
-			if (self._debugLevel >= 1): print "Updating Stats for: " + currency
-			self.__lastUpdatedStats[currency] = currentTime
-			if(currency != self.__defaultCurrency and currency in self.__supportedCurrencies):
-				self.__savedStats[currency] = self.__coinmarketcap.stats(convert=currency)
-			else:
-				self.__savedStats[currency] = self.__coinmarketcap.stats()
-
-		return self.__savedStats[currency]
-
-	# Coinmarketcap function wrapper that will helps us to avoid doing a lot of request to get the tickers
-	def __getTickers(self, currency):
-		currentTime = datetime.datetime.now()
-		lapsedTime = (currentTime - self.__lastUpdatedTickers[currency]).total_seconds()
-
-		if(lapsedTime > self.__updateInterval):
-			if (self._debugLevel >= 1): print "Updating Ticker for: " + currency
-			self.__lastUpdatedTickers[currency] = currentTime
-			if(currency != self.__defaultCurrency):
-				self.__savedTickers[currency] = self.__coinmarketcap.ticker(convert=currency)
-			else:
-				self.__savedTickers[currency] = self.__coinmarketcap.ticker()
-
-		return self.__savedTickers[currency]
-			
 	# Callback functions that the bot will call after receiving a command
 	def __setCurrency(self, bot, update, args):
 		chatId = update.message.chat_id
@@ -373,7 +669,7 @@ class CryptoBot(ChatBot):
 
 		if (self._debugLevel >= 1): print "Currency for user " + userId + " set to: " + currency
 
-		bot.send_message(chat_id=chatId, text=returningMessage)
+		self._sendMessage(bot, chatId, returningMessage)
 
 		return
 
@@ -388,7 +684,7 @@ class CryptoBot(ChatBot):
 
 		returningMessage = self.getStringInfo(args, currency, field)
 
-		bot.send_message(chat_id=chatId, text=returningMessage)
+		self._sendMessage(bot, chatId, returningMessage)
 
 		return
 
@@ -403,7 +699,7 @@ class CryptoBot(ChatBot):
 
 		returningMessage = self.getStringInfo(args, currency, field)
 
-		bot.send_message(chat_id=chatId, text=returningMessage)
+		self._sendMessage(bot, chatId, returningMessage)
 
 		return
 
@@ -418,7 +714,7 @@ class CryptoBot(ChatBot):
 
 		returningMessage = self.getStringInfo(args, currency, field)
 
-		bot.send_message(chat_id=chatId, text=returningMessage)
+		self._sendMessage(bot, chatId, returningMessage)
 
 		return
 
@@ -433,7 +729,7 @@ class CryptoBot(ChatBot):
 
 		returningMessage = self.getStringInfo(args, currency, field)
 
-		bot.send_message(chat_id=chatId, text=returningMessage)
+		self._sendMessage(bot, chatId, returningMessage)
 
 		return
 
@@ -448,7 +744,7 @@ class CryptoBot(ChatBot):
 
 		returningMessage = self.getStringInfo(args, currency, field)
 
-		bot.send_message(chat_id=chatId, text=returningMessage)
+		self._sendMessage(bot, chatId, returningMessage)
 
 		return
 
@@ -463,7 +759,7 @@ class CryptoBot(ChatBot):
 
 		returningMessage = self.getStringInfo(args, currency, field)
 
-		bot.send_message(chat_id=chatId, text=returningMessage)
+		self._sendMessage(bot, chatId, returningMessage)
 
 		return
 
@@ -478,7 +774,7 @@ class CryptoBot(ChatBot):
 
 		returningMessage = self.getStringInfo(args, currency, field)
 
-		bot.send_message(chat_id=chatId, text=returningMessage)
+		self._sendMessage(bot, chatId, returningMessage)
 
 		return
 
@@ -493,7 +789,7 @@ class CryptoBot(ChatBot):
 
 		returningMessage = self.getStringInfo(args, currency, field)
 
-		bot.send_message(chat_id=chatId, text=returningMessage)
+		self._sendMessage(bot, chatId, returningMessage)
 
 		return
 
@@ -507,6 +803,180 @@ class CryptoBot(ChatBot):
 
 		returningMessage = self.getStringInfo(args, currency)
 
-		bot.send_message(chat_id=chatId, text=returningMessage)
+		self._sendMessage(bot, chatId, returningMessage)
 
 		return 
+
+	def __setAlertAbove(self, bot, update, args):
+		chatId = update.message.chat_id
+		userId = str(update.message.from_user.id)
+
+		if (self._debugLevel >= 1): print "Set Alert Above command"
+		if (self._debugLevel >= 2): print "Args: " + str(args)
+
+		returningMessage = self.__createAlert(args, AlertType.ABOVE, userId)
+
+		self._sendMessage(bot, chatId, returningMessage)
+
+		return
+
+	def __setAlertBelow(self, bot, update, args):
+		chatId = update.message.chat_id
+		userId = str(update.message.from_user.id)
+
+		if (self._debugLevel >= 1): print "Set Alert Below command"
+		if (self._debugLevel >= 2): print "Args: " + str(args)
+
+		returningMessage = self.__createAlert(args, AlertType.BELOW, userId)
+
+		self._sendMessage(bot, chatId, returningMessage)
+
+		return
+
+	def __removeAlert(self, bot, update, args):
+		chatId = update.message.chat_id
+		userId = str(update.message.from_user.id)
+		returningMessage = ""
+
+		if (self._debugLevel >= 1): print "Remove Alert command"
+		if (self._debugLevel >= 2): print "Args: " + str(args)
+
+		for alertId in args:
+			if(alertId.isdigit() and self.removeAlert(int(alertId), userId)):
+				returningMessage += "Alert " + alertId + " removed\n"
+			else:
+				returningMessage += "You don't have the alert " + alertId + "\n"
+
+		if(returningMessage == ""):
+			returningMessage = "Tell me the ids of the alerts you want to remove"
+
+		self._sendMessage(bot, chatId, returningMessage)
+
+		return
+
+	def __listAlerts(self, bot, update):
+		chatId = update.message.chat_id
+		userId = str(update.message.from_user.id)
+		alerts = self.getAlerts(userId)
+		returningMessage = "You don't have any alerts"
+
+		if (self._debugLevel >= 1): print "List Alerts command"
+
+		if(len(alerts) > 0):
+			returningMessage = "Your alerts:\n"
+
+			for alertId in sorted(alerts):
+				coin, alertType, price = alerts[alertId]
+				returningMessage += str(alertId) + ": " + coin + " " + alertType.value + " " + str(price) + " " + self.__defaultCurrency + "\n"
+
+		self._sendMessage(bot, chatId, returningMessage)
+
+		return
+
+	def __getBestPrice(self, bot, update, args):
+		chatId = update.message.chat_id
+		returningMessage = ""
+
+		if (self._debugLevel >= 1): print "Best Price command"
+		if (self._debugLevel >= 2): print "Args: " + str(args)
+
+		for market in args:
+			bestPrices = self.getBestPrices(market.upper())
+
+			if(bestPrices == None):
+				returningMessage += market + " is not a market, tell me the markets like: BTC-LTC\n"
+				continue
+
+			if(bestPrices["bid"] == None and bestPrices["ask"] == None):
+				returningMessage += "No exchanger has the market " + market.upper() + "\n"
+				continue
+
+			returningMessage += market.upper() + ":\n"
+			if(bestPrices["bid"] != None):
+				returningMessage += "Best bid: " + str(bestPrices["bid"][0]) + " (" + bestPrices["bid"][1] + ")\n"
+			if(bestPrices["ask"] != None):
+				returningMessage += "Best ask: " + str(bestPrices["ask"][0]) + " (" + bestPrices["ask"][1] + ")\n"
+
+		if(returningMessage == ""):
+			returningMessage = "Tell me the markets, like: BTC-LTC"
+
+		self._sendMessage(bot, chatId, returningMessage)
+
+		return
+
+	def __getArbitrage(self, bot, update):
+		chatId = update.message.chat_id
+		opportunities = self.getArbitrageOpportunities()
+		returningMessage = "There are no arbitrage opportunities right now"
+
+		if (self._debugLevel >= 1): print "Arbitrage command"
+
+		if(len(opportunities) > 0):
+			returningMessage = ""
+
+			for opportunity in opportunities[:10]:
+				if(opportunity["type"] == "cross"):
+					returningMessage += opportunity["pair"] + ": buy in " + opportunity["buy"][0] + " at " + str(opportunity["buy"][1]) + " and sell in " + opportunity["sell"][0] + " at " + str(opportunity["sell"][1])
+				else:
+					returningMessage += opportunity["exchanger"] + ": " + " -> ".join(opportunity["path"])
+
+				returningMessage += " (" + str(round(opportunity["profit"] * 100, 2)) + "%)\n"
+
+		self._sendMessage(bot, chatId, returningMessage)
+
+		return
+
+	def __getCandles(self, bot, update, args):
+		chatId = update.message.chat_id
+
+		if (self._debugLevel >= 1): print "Candles command"
+		if (self._debugLevel >= 2): print "Args: " + str(args)
+
+		if(len(args) not in [1, 2]):
+			self._sendMessage(bot, chatId, "Tell me the market and the interval (1m, 5m or 1h), like: BTC-LTC 1h")
+			return
+
+		market = args[0].upper()
+		interval = args[1].lower() if len(args) == 2 else "1h"
+		candles = self.getCandles(market, interval, 5)
+
+		if(candles == None):
+			returningMessage = "I can't get the candles of " + market + " " + interval + ", tell me the market and the interval (1m, 5m or 1h), like: BTC-LTC 1h"
+		elif(len(candles) == 0):
+			returningMessage = "There are no trades of " + market + " yet"
+		else:
+			returningMessage = market + " " + interval + " (open, high, low, close, volume):\n"
+
+			for candle in candles:
+				start = datetime.datetime.utcfromtimestamp(candle["start"]).strftime("%Y-%m-%d %H:%M")
+				returningMessage += start + ": " + ", ".join(str(candle[field]) for field in ["open", "high", "low", "close", "volume"]) + "\n"
+
+		self._sendMessage(bot, chatId, returningMessage)
+
+		return
+
+	# Creates the alert asked in a command and returns the message for the user
+	def __createAlert(self, args, alertType, userId):
+		if(len(args) != 2):
+			return "Tell me the coin and the price in " + self.__defaultCurrency + ", like: BTC 10000"
+
+		coin, price = args
+
+		try:
+			validPrice = float(price)
+		except ValueError:
+			validPrice = None
+
+		if(not isValidPrice(validPrice)):
+			return price + " is not a valid price"
+
+		price = validPrice
+		alertId = self.__setAlert(coin, alertType, price, userId)
+
+		if(alertId == None and self.__isLoading(self.__defaultCurrency)):
+			return self.__getLoadingMessage(self.__defaultCurrency)
+
+		if(alertId == None):
+			return "I don't know the coin " + coin
+
+		return "Alert " + str(alertId) + " created: " + coin + " " + alertType.value + " " + str(price) + " " + self.__defaultCurrency
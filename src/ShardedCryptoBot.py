@@ -0,0 +1,63 @@
+# The sharded bot spreads the chats between several worker processes
+from chatBot.ShardedBot import ShardedBot
+# Every worker runs its own cryptoBot, and the front keeps one more to download the market information
+from CryptoBot import CryptoBot, RuntimeMode, WarmupMode
+
+# This class will be in charge of running a cryptoBot in several processes, so it can use all the cores of the machine
+# -The front process receives the updates and sends every chat to one of the workers (see ShardedBot)
+# -Every worker runs a cryptoBot in the READER mode, that never asks coinmarketcap for anything
+# -The front also keeps a cryptoBot (that never receives updates) refreshing the market information in the background
+#  and saving it in the snapshot file, which every worker loads again as soon as it changes
+# So there is a single download of the market information no matter how many workers there are
+# Every worker keeps its own copy of the market information in memory (about 17MB for 1500 coins in 15 currencies),
+# sharing the tickers through mmap would avoid those copies but the ticker store would have to be read from raw bytes
+class ShardedCryptoBot(ShardedBot):
+	# __marketBot is the cryptoBot of the front, in charge of keeping the snapshot file updated
+	# The rest of variables are the ones used to make the cryptoBot of every worker (see CryptoBot),
+	# every worker gets its own copy of the rate limiter, since it only limits the chats of that worker
+	__marketBot = None
+	__accessToken = None
+	__superAdmin = None
+	__admins = None
+	__exchangers = None
+	__updateInterval = None
+	__market = None
+	__deriveFiat = None
+	__snapshotPath = None
+	__registryDirectory = None
+	__rateLimiter = None
+
+	def __init__(self, token, superadminid, snapshotPath, adminsid=[], exchangers=[], workers=None, updateInterval=300, market=None, deriveFiat=False, registryDirectory=None, messageRate=30, rateLimiter=None, debuglevel=0):
+		self.__accessToken = token
+		self.__superAdmin = superadminid
+		self.__admins = adminsid
+		self.__exchangers = exchangers
+		self.__updateInterval = updateInterval
+		self.__market = market
+		self.__deriveFiat = deriveFiat
+		self.__snapshotPath = snapshotPath
+		self.__registryDirectory = registryDirectory
+		self.__rateLimiter = rateLimiter
+
+		# The workers are started before the market bot, so they don't get a copy of its threads
+		super(ShardedCryptoBot, self).__init__(token, self.__createWorkerBot, workers, messageRate=messageRate, debuglevel=debuglevel)
+
+		self.__marketBot = CryptoBot(token, superadminid, adminsid, [], updateInterval, True, market, WarmupMode.EAGER, deriveFiat, snapshotPath, debuglevel=debuglevel)
+		self.setSharedCommands(self.__marketBot.getSharedCommands())
+
+		return
+
+	# Returns the cryptoBot of the front, the one that keeps the market information updated
+	def getMarketBot(self):
+		return self.__marketBot
+
+	# Stops the workers and the refresh of the market information
+	def stop(self):
+		super(ShardedCryptoBot, self).stop()
+		self.__marketBot.stopBackgroundRefresh()
+		return
+
+	# Makes the cryptoBot of a worker, this runs in the process of the worker
+	def __createWorkerBot(self):
+		return CryptoBot(self.__accessToken, self.__superAdmin, self.__admins, self.__exchangers, self.__updateInterval, market=self.__market,
+			deriveFiat=self.__deriveFiat, snapshotPath=self.__snapshotPath, runtime=RuntimeMode.READER, registryDirectory=self.__registryDirectory, rateLimiter=self.__rateLimiter, debuglevel=self._debugLevel)
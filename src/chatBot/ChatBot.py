@@ -16,6 +16,12 @@ from telegram.ext import MessageHandler, Filters, Handler
 from telegram.ext.dispatcher import DispatcherHandlerStop
 from enum import Enum
 from collections import defaultdict
+import os
+import threading
+from telegram import Update
+from MessageSender import MessageSender
+from UserRegistry import UserRegistry
+from WebhookServer import WebhookServer
 
 class BotState(Enum):
 	DEACTIVATED = 0
@@ -28,12 +34,20 @@ class ChatBot(object):
 	# The __accessToken is the identifier needed for the bot to connect
 	# The __botSuperAdmin is the administrator that shouldn't be removed by any circunstances
 	# The __botAdmins are the other administrators that can execute the bot commands
+	# The __botBanned are the users that can't use the bot
+	# Both of them are UserRegistry objects, saved in the registry directory if there is one
 	# The __isPolling is a flag that will let us know if the bot is polling for messages
 	# The __botUpdater is the one in charge of update the chatbot and contains the dispatcher
 	# The __botDispatcher is the one in charge of call the correct handlers used by the messages
 	# The __listCommands is the list where we can know all the commands the bot has
 	# The __deactivatedHandler will be the one in charge of not letting people use the bot when it is not running
 	# The _unknownHandler will be the one in charge of answering when the received command does not match any of the available commands
+	# The __messageSender is the one in charge of sending the answers of the bot while it is polling
+	# The __rateLimiter is the one in charge of limiting how many commands every user and chat can send, None if there is no limit
+	# The __limitedHandler will be the one in charge of not letting the users send more commands than the limit
+	# The __webhookServer is the one receiving the updates when the bot uses a webhook instead of polling
+	# The __sharedCommands are the commands that change something every worker of a ShardedBot needs to know (like the admins)
+	# The __silentUpdate keeps, per thread, if the update being processed should be answered or not
 	# The _debuglevel is the flag used to enable the printing messages for debugging
 
 	__isPolling = None
@@ -43,16 +57,22 @@ class ChatBot(object):
 	__botDispatcher = None
 	__botSuperAdmin = None
 
-	__listCommands = {}
-	__botAdmins = []
-	__botBanned = []
+	__listCommands = None
+	__botAdmins = None
+	__botBanned = None
 	
 	__deactivatedHandler = None
+	__messageSender = None
+	__rateLimiter = None
+	__limitedHandler = None
+	__webhookServer = None
+	__sharedCommands = None
+	__silentUpdate = None
 
 	_unknownHandler = None
 	_debugLevel = None
 
-	def __init__(self, token, superadminid, adminsid=[], debuglevel=0):
+	def __init__(self, token, superadminid, adminsid=[], debuglevel=0, registryDirectory=None, rateLimiter=None):
 		# Defining the basic variables needed to work
 		# The __currentState will be based on the BotState Enum implementation
 		# The __accessToken is the identifier needed for the bot to connect
@@ -69,13 +89,22 @@ class ChatBot(object):
 		if (self._debugLevel >= 1): print "Token: " + token + "\n"
 		self.__botSuperAdmin = superadminid
 		if (self._debugLevel >= 1): print "SuperAdmin: " + superadminid + "\n"
-		self.__botAdmins.append (superadminid)
 
+		# The admins and banned users are saved in the registry directory, so they are kept between restarts
+		adminsPath = None
+		bannedPath = None
+		if(registryDirectory != None):
+			adminsPath = os.path.join(registryDirectory, "admins.json")
+			bannedPath = os.path.join(registryDirectory, "banned.json")
 
-		for personid in adminsid:
-			if(personid not in self.__botAdmins):
-				if (self._debugLevel >= 1): print "Admin: " + personid
-				self.__botAdmins.append (personid)
+		self.__listCommands = {}
+		self.__sharedCommands = set()
+		self.__silentUpdate = threading.local()
+		self.__botAdmins = UserRegistry([superadminid], adminsPath, debuglevel)
+		self.__botBanned = UserRegistry([], bannedPath, debuglevel)
+
+		for personid in self.__botAdmins.add(adminsid):
+			if (self._debugLevel >= 1): print "Admin: " + personid
 
 		# The __isPolling is a flag that will let us know if the bot is polling for messages
 		# The __botUpdater is the one in charge of update the chatbot and contains the dispatcher
@@ -84,27 +113,32 @@ class ChatBot(object):
 		self.__botUpdater = Updater(token=self.__accessToken)
 		self.__botDispatcher = self.__botUpdater.dispatcher
 
+		# The commands are only limited when a rate limiter is given (see setRateLimiter)
+		self.__rateLimiter = rateLimiter
+
 		self.__bannedHandler = MessageHandler(Filters.command, self.__bannedCommand)
+		self.__limitedHandler = MessageHandler(Filters.command, self.__limitedCommand)
 		self.__deactivatedHandler = MessageHandler(Filters.command, self.__deactivatedCommand)
 		self._unknownHandler = MessageHandler(Filters.command, self.__unknownCommand)
 
 		if (self._debugLevel >= 1): print "Adding Priority Handlers\n"
 		# Here we will add all the priority handlers needed for the chat bot
-		self._addCommandHandler('startBot', self.__startBot, group=0)
-		self._addCommandHandler('stopBot', self.__stopBot, group=0)
-		self._addCommandHandler('resumeBot', self.__resumeBot, group=0)
-		self._addCommandHandler('sleepBot', self.__sleepBot, group=0)
+		self._addCommandHandler('startBot', self.__startBot, group=0, shared=True)
+		self._addCommandHandler('stopBot', self.__stopBot, group=0, shared=True)
+		self._addCommandHandler('resumeBot', self.__resumeBot, group=0, shared=True)
+		self._addCommandHandler('sleepBot', self.__sleepBot, group=0, shared=True)
 		self._addCommandHandler('botState', self.__getCurrentState, group=0)
 		self._addCommandHandler('listCommands', self.__getlistCommands, group=0)
 		self._addCommandHandler('listAdmins', self.__listAdmins, group=0)
-		self._addCommandHandler('removeAdmin', self.__removeAdmin, pass_args=True, group=0)
-		self._addCommandHandler('addAdmin', self.__addAdmin, pass_args=True, group=0)
+		self._addCommandHandler('removeAdmin', self.__removeAdmin, pass_args=True, group=0, shared=True)
+		self._addCommandHandler('addAdmin', self.__addAdmin, pass_args=True, group=0, shared=True)
 		self._addCommandHandler('myUserId', self.__getUserId, group=0)
-		self._addCommandHandler('banUser', self.__banUser, group=0)
-		self._addCommandHandler('unbanUser', self.__unbanUser, group=0)
+		self._addCommandHandler('banUser', self.__banUser, pass_args=True, group=0, shared=True)
+		self._addCommandHandler('unbanUser', self.__unbanUser, pass_args=True, group=0, shared=True)
 
 		self._addCommandHandler('help', self.__getlistCommands, group=1)
-		self._addHandler(self.__bannedHandler, group=-1)
+		self._addHandler(self.__bannedHandler, group=-2)
+		self._addHandler(self.__limitedHandler, group=-1)
 		self._addHandler(self.__deactivatedHandler, group=0)
 		self._addHandler(self._unknownHandler)
 
@@ -114,10 +148,15 @@ class ChatBot(object):
 	# those not altere the bot's behavior in any way
 
 	# Function to add new handlers to the bot, it should be only used during the init of the class
-	def _addCommandHandler(self, command, callback, pass_args=False, group=1):
+	# The shared commands are the ones that change something all the workers of a ShardedBot need to know
+	def _addCommandHandler(self, command, callback, pass_args=False, group=1, shared=False):
 		if (self._debugLevel >= 2): print "Adding Command Handler: " + command
 		self.__botDispatcher.add_handler(CommandHandler(command, callback, pass_args=pass_args), group=group)
 		self.__listCommands[command] = group
+
+		if(shared):
+			self.__sharedCommands.add(command)
+
 		return
 
 	def _addMessageHandler(self, filters, callback, group=1):
@@ -137,11 +176,13 @@ class ChatBot(object):
 
 	# Function to make the bot start polling for messages
 	def startPolling(self):
-		if(self.__isPolling):
+		if(self.__isPolling or self.__webhookServer != None):
 			return False
 
 		if (self._debugLevel >= 1): print "Started Polling\n"
 		self.__isPolling = True
+		self.__messageSender = MessageSender(debuglevel=self._debugLevel)
+		self.__messageSender.start()
 		self.__botUpdater.start_polling()
 		return True
 
@@ -153,27 +194,129 @@ class ChatBot(object):
 		if (self._debugLevel >= 1): print "Stopped Polling\n"
 		self.__isPolling = False
 		self.__botUpdater.stop()
+		self.__messageSender.stop()
+		self.__messageSender = None
+		return True
+
+	# Function to make the bot receive the messages through a webhook instead of polling for them
+	# Telegram sends the updates to webhookUrl, which should end up (through a proxy with https) in listen:port/urlPath
+	# If webhookUrl is None the webhook is not set in telegram, for when it is set by someone else
+	def startWebhook(self, listen="127.0.0.1", port=8443, urlPath=None, webhookUrl=None, queueSize=100):
+		if(self.__isPolling or self.__webhookServer != None):
+			return False
+
+		if(urlPath == None):
+			urlPath = "/" + self.__accessToken
+
+		if (self._debugLevel >= 1): print "Started Webhook\n"
+		self.__messageSender = MessageSender(debuglevel=self._debugLevel)
+		self.__messageSender.start()
+		self.__webhookServer = WebhookServer(self.__botDispatcher, listen, port, urlPath, queueSize, self._debugLevel)
+		self.__webhookServer.start()
+
+		if(webhookUrl != None):
+			self.__botUpdater.bot.set_webhook(url=webhookUrl)
+
+		return True
+
+	# Function to make the bot stop receiving messages through the webhook
+	def stopWebhook(self):
+		if(self.__webhookServer == None):
+			return False
+
+		if (self._debugLevel >= 1): print "Stopped Webhook\n"
+		self.__webhookServer.stop()
+		self.__webhookServer = None
+		self.__messageSender.stop()
+		self.__messageSender = None
 		return True
 
+	# Returns if the bot is receiving messages through a webhook
+	def isWebhookRunning(self):
+		return self.__webhookServer != None
+
+	# Returns the webhook server, None if the bot is not using a webhook
+	def _getWebhookServer(self):
+		return self.__webhookServer
+
+	# Function to make the bot process the updates another process receives for it (see ShardedBot)
+	# The updates are taken from the queue as tuples with the update (as a dict) and if it should be answered
+	# The globalRate is the amount of messages per second this bot can send, its part of the limit telegram has for the whole bot
+	# It only returns when it takes None from the queue
+	def processUpdates(self, updateQueue, globalRate=30):
+		if (self._debugLevel >= 1): print "Started Processing Updates\n"
+		self.__messageSender = MessageSender(globalRate=globalRate, debuglevel=self._debugLevel)
+		self.__messageSender.start()
+
+		while(True):
+			item = updateQueue.get()
+
+			if(item == None):
+				break
+
+			try:
+				self.processUpdate(item[0], item[1])
+			except Exception as error:
+				if (self._debugLevel >= 1): print "Error processing update: " + str(error)
+
+		if (self._debugLevel >= 1): print "Stopped Processing Updates\n"
+		self.__messageSender.stop()
+		self.__messageSender = None
+		return
+
+	# Processes an update (as a dict) in this thread
+	# If answer is False the update changes the bot as usual but nothing is sent back, this is used for the shared commands
+	# a ShardedBot sends to all its workers, so only one of them answers
+	def processUpdate(self, data, answer=True):
+		update = Update.de_json(data, self.__botUpdater.bot)
+
+		self.__silentUpdate.active = not answer
+		try:
+			self.__botDispatcher.process_update(update)
+		finally:
+			self.__silentUpdate.active = False
+
+		return
+
+	# Returns the commands that change something all the workers of a ShardedBot need to know
+	def getSharedCommands(self):
+		return sorted(self.__sharedCommands)
+
 	# Returns if the bot is polling for messages
 	def isPolling(self):
 		return self.__isPolling
 
+	# Returns the telegram bot object, used to send messages that are not an answer to a command
+	def _getBot(self):
+		return self.__botUpdater.bot
+
+	# Function used to send all the messages of the bot
+	# While the bot is polling the message is put in the queue of the sender and this returns right away
+	# The priority messages (like the answers to the admins) are sent before the rest
+	def _sendMessage(self, bot, chatId, text, priority=False):
+		if(getattr(self.__silentUpdate, "active", False)):
+			return
+
+		messageSender = self.__messageSender
+
+		if(messageSender == None):
+			bot.send_message(chat_id=chatId, text=text)
+			return
+
+		messageSender.send(bot, chatId, text, priority=priority)
+		return
+
 	# Function to add new admins
 	def addAdmins(self, adminsid):
-		for personid in adminsid:
-			if(personid not in self.__botAdmins):
-				if (self._debugLevel >= 1): print "Adding Admin: " + personid + "\n"
-				self.__botAdmins.append (personid)
+		for personid in self.__botAdmins.add(adminsid):
+			if (self._debugLevel >= 1): print "Adding Admin: " + personid + "\n"
 
 		return
 
 	# Function to remove admins, can't remove the superadmin
 	def removeAdmins(self, adminsid):
-		for personid in adminsid:
-			if(personid in self.__botAdmins and personid != self.__botSuperAdmin):
-				if (self._debugLevel >= 1): print "Removing Admin: " + personid + "\n"
-				self.__botAdmins.remove (personid)
+		for personid in self.__botAdmins.remove([personid for personid in adminsid if personid != self.__botSuperAdmin]):
+			if (self._debugLevel >= 1): print "Removing Admin: " + personid + "\n"
 
 		return
 
@@ -183,7 +326,7 @@ class ChatBot(object):
 
 	# Return a list of all the admins
 	def getAdmins(self):
-		return self.__botAdmins
+		return self.__botAdmins.getUsers()
 
 	# Returns the current state of the bot
 	def getCurrentState(self):
@@ -194,23 +337,32 @@ class ChatBot(object):
 		return self.__listCommands
 
 	def unbanUsers(self, usersid):
-		for personid in usersid:
-			if(personid in self.__botBanned):
-				if (self._debugLevel >= 1): print "Unbanning User: " + personid + "\n"
-				self.__botAdmins.remove (personid)
+		for personid in self.__botBanned.remove(usersid):
+			if (self._debugLevel >= 1): print "Unbanning User: " + personid + "\n"
 
 		return
 
+	# Function to ban users, admins can't be banned
 	def banUsers(self, usersid):
-		for personid in usersid:
-			if(personid not in self.__botBanned and personid not in self.__botAdmins):
-				if (self._debugLevel >= 1): print "Banning User: " + personid + "\n"
-				self.__botAdmins.append (personid)
+		for personid in self.__botBanned.add([personid for personid in usersid if personid not in self.__botAdmins]):
+			if (self._debugLevel >= 1): print "Banning User: " + personid + "\n"
 
 		return
 
+	# Returns if a user is banned
+	def isBanned(self, userid):
+		return userid in self.__botBanned
+
 	def getBannedUsers(self):
-		return self.__botBanned
+		return self.__botBanned.getUsers()
+
+	# Function to change the rate limiter of the commands, None to remove the limit
+	def setRateLimiter(self, rateLimiter):
+		self.__rateLimiter = rateLimiter
+		return
+
+	def getRateLimiter(self):
+		return self.__rateLimiter
 
 	# This set of functions will be the callback options that will define the bot's behavior
 	def __getlistCommands(self, bot, update):
@@ -224,7 +376,37 @@ class ChatBot(object):
 			if(self.__listCommands[command] or userId in self.__botAdmins):
 				returningMessage += "/" + command + "\n"
 
-		bot.send_message(chat_id=chatId, text=returningMessage)
+		self._sendMessage(bot, chatId, returningMessage)
+
+		raise DispatcherHandlerStop
+		return
+
+	# The admins are never limited, the cost of a command is the amount of arguments it has (at least 1)
+	# The user is only told the first time a command is limited or when they get soft banned, the rest are ignored
+	# The copies of the shared commands that are not answered (see processUpdate) are not limited either,
+	# the command was already counted by the worker of its chat
+	def __limitedCommand(self, bot, update):
+		chatId = update.message.chat_id
+		userId = str(update.message.from_user.id)
+		rateLimiter = self.__rateLimiter
+
+		if (rateLimiter == None or userId in self.__botAdmins or getattr(self.__silentUpdate, "active", False)):
+			return
+
+		cost = max(1, len(update.message.text.split()) - 1)
+		reason = rateLimiter.check(userId, chatId, cost)
+
+		if (reason == None):
+			return
+
+		if (self._debugLevel >= 2): print "Limited command: " + reason
+
+		if (reason == "limited" and rateLimiter.getStrikes(userId) == 1):
+			self._sendMessage(bot, chatId, "You are sending too many commands, slow down!")
+		elif (reason == "toolarge" and rateLimiter.getStrikes(userId) == 1):
+			self._sendMessage(bot, chatId, "You asked for too many things at once, I can answer up to " + str(rateLimiter.getMaxCost()) + " in a single command")
+		elif (reason == "banned"):
+			self._sendMessage(bot, chatId, "You sent too many commands, I will ignore you for a while")
 
 		raise DispatcherHandlerStop
 		return
@@ -236,7 +418,7 @@ class ChatBot(object):
 
 		if (userId in self.__botBanned):
 			if (self._debugLevel >= 1): print "Banned command"
-			bot.send_message(chat_id=chatId, text=returningMessage)
+			self._sendMessage(bot, chatId, returningMessage)
 			raise DispatcherHandlerStop
 			return
 
@@ -248,7 +430,7 @@ class ChatBot(object):
 
 		if (self._debugLevel >= 1): print "Deactivated command"
 
-		bot.send_message(chat_id=chatId, text=returningMessage)
+		self._sendMessage(bot, chatId, returningMessage)
 
 		raise DispatcherHandlerStop
 		return
@@ -259,7 +441,7 @@ class ChatBot(object):
 
 		if (self._debugLevel >= 1): print "Unknown command"
 
-		bot.send_message(chat_id=chatId, text=returningMessage)
+		self._sendMessage(bot, chatId, returningMessage)
 
 		return
 
@@ -271,7 +453,7 @@ class ChatBot(object):
 
 		if (userId not in self.__botAdmins):
 			returningMessage = "Only admins ban users!"
-			bot.send_message(chat_id=chatId, text=returningMessage)
+			self._sendMessage(bot, chatId, returningMessage, priority=True)
 			return
 
 		self.banUsers(args)
@@ -286,7 +468,7 @@ class ChatBot(object):
 
 		if (userId not in self.__botAdmins):
 			returningMessage = "Only admins unban users!"
-			bot.send_message(chat_id=chatId, text=returningMessage)
+			self._sendMessage(bot, chatId, returningMessage, priority=True)
 			return
 
 		self.unbanUsers(args)
@@ -299,9 +481,9 @@ class ChatBot(object):
 		
 		if (self._debugLevel >= 1): print "Add admin command"
 
-		if (userId != self.__superAdmin):
+		if (userId != self.__botSuperAdmin):
 			returningMessage = "Only the real boss can add new admins!"
-			bot.send_message(chat_id=chatId, text=returningMessage)
+			self._sendMessage(bot, chatId, returningMessage, priority=True)
 			return
 
 		self.addAdmins(args)
@@ -314,9 +496,9 @@ class ChatBot(object):
 
 		if (self._debugLevel >= 1): print "Remove Admin command"
 		
-		if (userId != self.__superAdmin):
+		if (userId != self.__botSuperAdmin):
 			returningMessage = "Only the real boss can add new admins!"
-			bot.send_message(chat_id=chatId, text=returningMessage)
+			self._sendMessage(bot, chatId, returningMessage, priority=True)
 			return
 
 		self.removeAdmins(args)
@@ -332,13 +514,13 @@ class ChatBot(object):
 
 		if (userId not in self.__botAdmins):
 			returningMessage = "You are not my boss!"
-			bot.send_message(chat_id=chatId, text=returningMessage)
+			self._sendMessage(bot, chatId, returningMessage, priority=True)
 			return
 
 		for personid in self.__botAdmins:
 				returningMessage += personid + "\n"
 
-		bot.send_message(chat_id=chatId, text=returningMessage)
+		self._sendMessage(bot, chatId, returningMessage, priority=True)
 
 		return
 
@@ -348,7 +530,7 @@ class ChatBot(object):
 
 		if (self._debugLevel >= 1): print "User ID command"
 
-		bot.send_message(chat_id=chatId, text=returningMessage)
+		self._sendMessage(bot, chatId, returningMessage)
 
 		return
 
@@ -360,20 +542,20 @@ class ChatBot(object):
 
 		if (userId not in self.__botAdmins):
 			returningMessage = "You are not my boss!"
-			bot.send_message(chat_id=chatId, text=returningMessage)
+			self._sendMessage(bot, chatId, returningMessage, priority=True)
 			raise DispatcherHandlerStop
 			return
 
 		if (self.__currentState != BotState.SLEEPING):
 			returningMessage = "I'm not sleeping!"
-			bot.send_message(chat_id=chatId, text=returningMessage)
+			self._sendMessage(bot, chatId, returningMessage, priority=True)
 			raise DispatcherHandlerStop
 			return
 		
 		if (self._debugLevel >= 1): print "Resuming..."
 
 		returningMessage = "Let's start working again!"
-		bot.send_message(chat_id=chatId, text=returningMessage)
+		self._sendMessage(bot, chatId, returningMessage, priority=True)
 		self.__currentState = BotState.ACTIVATED
 
 		self.__botDispatcher.remove_handler(self.__deactivatedHandler, group=0)
@@ -388,20 +570,20 @@ class ChatBot(object):
 		
 		if (userId not in self.__botAdmins):
 			returningMessage = "You are not my boss!"
-			bot.send_message(chat_id=chatId, text=returningMessage)
+			self._sendMessage(bot, chatId, returningMessage, priority=True)
 			raise DispatcherHandlerStop
 			return
 
 		if (self.__currentState != BotState.DEACTIVATED):
 			returningMessage = "I'm already working!"
-			bot.send_message(chat_id=chatId, text=returningMessage)
+			self._sendMessage(bot, chatId, returningMessage, priority=True)
 			raise DispatcherHandlerStop
 			return
 		
 		if (self._debugLevel >= 1): print "Starting..."
 
 		returningMessage = "Let's start working!"
-		bot.send_message(chat_id=chatId, text=returningMessage)
+		self._sendMessage(bot, chatId, returningMessage, priority=True)
 		self.__currentState = BotState.ACTIVATED
 
 		self.__botDispatcher.remove_handler(self.__deactivatedHandler, group=0)
@@ -416,13 +598,13 @@ class ChatBot(object):
 
 		if (userId not in self.__botAdmins):
 			returningMessage = "You are not my boss!"
-			bot.send_message(chat_id=chatId, text=returningMessage)
+			self._sendMessage(bot, chatId, returningMessage, priority=True)
 			raise DispatcherHandlerStop
 			return
 
 		if (self._debugLevel >= 1): print "Stopping..."
 		returningMessage = "Good bye!"
-		bot.send_message(chat_id=chatId, text=returningMessage)
+		self._sendMessage(bot, chatId, returningMessage, priority=True)
 		self.__currentState = BotState.DEACTIVATED
 
 		self.__botDispatcher.remove_handler(self.__deactivatedHandler, group=0)
@@ -439,20 +621,20 @@ class ChatBot(object):
 
 		if (userId not in self.__botAdmins):
 			returningMessage = "You are not my boss!"
-			bot.send_message(chat_id=chatId, text=returningMessage)
+			self._sendMessage(bot, chatId, returningMessage, priority=True)
 			raise DispatcherHandlerStop
 			return
 
 		if (self.__currentState != BotState.ACTIVATED):
 			returningMessage = "I'm not working right now!"
-			bot.send_message(chat_id=chatId, text=returningMessage)
+			self._sendMessage(bot, chatId, returningMessage, priority=True)
 			raise DispatcherHandlerStop
 			return
 
 		if (self._debugLevel >= 1): print "Sleeping..."
 
 		returningMessage = "Good bye!"
-		bot.send_message(chat_id=chatId, text=returningMessage)
+		self._sendMessage(bot, chatId, returningMessage, priority=True)
 		self.__currentState = BotState.SLEEPING
 
 		self.__botDispatcher.remove_handler(self.__deactivatedHandler, group=0)
@@ -475,7 +657,7 @@ class ChatBot(object):
 		if(self.__currentState == BotState.SLEEPING):
 			returningMessage = "I'm sleeping"
 
-		bot.send_message(chat_id=chatId, text=returningMessage)
+		self._sendMessage(bot, chatId, returningMessage)
 
 		raise DispatcherHandlerStop
 		return 
\ No newline at end of file
@@ -0,0 +1,236 @@
+# Threading is needed since the messages are sent from their own thread
+import threading
+# Time is needed to know when every chat can receive a message again
+import time
+# Deque and OrderedDict are used for the queues of messages of every chat
+from collections import deque, OrderedDict
+# The errors are used to know if a message should be sent again or thrown away
+from telegram.error import RetryAfter, BadRequest, Unauthorized, NetworkError
+# The token buckets are used to respect the limits of messages telegram has
+from TokenBucket import TokenBucket
+
+# This class will be in charge of sending the messages of the bot
+# The handlers only put their messages in the queue and the sender sends them from its own thread
+# respecting the limits of telegram, so the handlers never wait for telegram and we don't get flood errors
+# -There is a token bucket per chat and a global one shared by all the chats
+# -Messages of the priority lane (admin answers) are always sent before the normal ones
+# -Chats take turns, so a chat with a lot of messages doesn't block the others
+# -If telegram asks us to wait or the connection fails, the message is sent again later
+class MessageSender(threading.Thread):
+	# __globalBucket is the bucket with the limit of messages per second for the whole bot
+	# __chatBuckets are the buckets with the limit of messages per second of every chat
+	# __chatRate and __chatBurst are the values used to create the bucket of every chat
+	# __queues is where we store the pending messages, one OrderedDict per lane (priority and normal) from chat id to its deque of messages
+	# __blockedChats is where we store, per chat, the time until it can't receive messages because telegram asked us to wait
+	# __maxRetries is the amount of times we try to send a message before throwing it away
+	# __retryDelay is the amount of seconds we wait before the first retry, it is doubled with every new retry
+	# __condition is used to protect the queues and to wake up the sender when there are new messages
+	# __isStopping is the flag used to let the sender know it should stop
+	# __isDelivering is the flag used to know a message was taken from the queue and it is being sent
+	# __sentCount is the amount of messages sent
+	# __droppedCount is the amount of messages thrown away
+	# _debugLevel is the flag used to enable the printing messages for debugging
+	__globalBucket = None
+	__chatBuckets = None
+	__chatRate = None
+	__chatBurst = None
+	__queues = None
+	__blockedChats = None
+	__maxRetries = None
+	__retryDelay = None
+	__condition = None
+	__isStopping = None
+	__isDelivering = None
+	__sentCount = None
+	__droppedCount = None
+	_debugLevel = None
+
+	def __init__(self, globalRate=30, chatRate=1, chatBurst=1, maxRetries=3, retryDelay=1, debuglevel=0):
+		super(MessageSender, self).__init__(name="MessageSender")
+		self.daemon = True
+		self._debugLevel = debuglevel
+
+		# The bucket can always hold a message, even when the rate is lower than one message per second
+		self.__globalBucket = TokenBucket(globalRate, max(globalRate, 1))
+		self.__chatBuckets = {}
+		self.__chatRate = chatRate
+		self.__chatBurst = chatBurst
+		self.__queues = [OrderedDict(), OrderedDict()]
+		self.__blockedChats = {}
+		self.__maxRetries = maxRetries
+		self.__retryDelay = retryDelay
+		self.__condition = threading.Condition()
+		self.__isStopping = False
+		self.__isDelivering = False
+		self.__sentCount = 0
+		self.__droppedCount = 0
+
+		return
+
+	# Puts a message in the queue, it will be sent with bot.send_message(chat_id=chatId, text=text, **kwargs)
+	def send(self, bot, chatId, text, priority=False, **kwargs):
+		message = _Message(bot, chatId, text, 0 if priority else 1, kwargs)
+
+		with self.__condition:
+			self.__queues[message.lane].setdefault(chatId, deque()).append(message)
+			self.__condition.notify()
+
+		return
+
+	# Function to make the sender stop
+	# If drain is True it sends the pending messages first, waiting at most timeout seconds (forever if it is None)
+	# The messages still pending after that are thrown away, so telegram can't keep the bot from stopping
+	def stop(self, drain=True, timeout=10):
+		if(drain):
+			endTime = None if timeout == None else time.time() + timeout
+
+			with self.__condition:
+				while((self.getPendingCount() > 0 or self.__isDelivering) and self.is_alive()):
+					if(endTime != None and time.time() >= endTime):
+						break
+
+					self.__condition.wait(0.1)
+
+		with self.__condition:
+			pendingCount = self.getPendingCount()
+
+			if (self._debugLevel >= 1 and pendingCount > 0): print "Messages thrown away when stopping: " + str(pendingCount)
+			self.__droppedCount += pendingCount
+			self.__queues = [OrderedDict(), OrderedDict()]
+			self.__isStopping = True
+			self.__condition.notify()
+
+		return
+
+	# Returns the amount of messages waiting to be sent
+	def getPendingCount(self):
+		return sum(len(messages) for queue in self.__queues for messages in queue.values())
+
+	# Returns the amount of messages sent and the amount thrown away
+	def getStats(self):
+		return {"sent": self.__sentCount, "dropped": self.__droppedCount, "pending": self.getPendingCount()}
+
+	def run(self):
+		if (self._debugLevel >= 1): print "Message Sender started"
+
+		while(True):
+			with self.__condition:
+				message, waitTime = self.__nextMessage()
+
+				while(message == None and not self.__isStopping):
+					self.__condition.wait(waitTime)
+					message, waitTime = self.__nextMessage()
+
+				if(message == None):
+					break
+
+				self.__isDelivering = True
+
+			self.__deliver(message)
+
+			with self.__condition:
+				self.__isDelivering = False
+				self.__condition.notify_all()
+
+		if (self._debugLevel >= 1): print "Message Sender stopped"
+		return
+
+	# Takes the next message that can be sent right now
+	# Returns the message (or None) and the amount of seconds until the next one can be sent (None if there are none)
+	def __nextMessage(self):
+		now = time.time()
+		waitTime = None
+
+		globalWait = self.__globalBucket.timeUntilAvailable(now=now)
+
+		for queue in self.__queues:
+			for chatId in queue.keys():
+				chatWait = max(self.__blockedChats.get(chatId, now) - now, self.__getChatBucket(chatId).timeUntilAvailable(now=now))
+				chatWait = max(chatWait, globalWait)
+
+				if(chatWait > 0):
+					waitTime = chatWait if waitTime == None else min(waitTime, chatWait)
+					continue
+
+				self.__globalBucket.consume(now=now)
+				self.__getChatBucket(chatId).consume(now=now)
+
+				# The chat goes to the end of the lane so the other chats get their turn
+				messages = queue.pop(chatId)
+				message = messages.popleft()
+				if(len(messages) > 0):
+					queue[chatId] = messages
+
+				return message, None
+
+		self.__removeIdleChats(now)
+		return None, waitTime
+
+	# Sends a message, putting it back in the queue if it should be retried
+	def __deliver(self, message):
+		try:
+			message.bot.send_message(chat_id=message.chatId, text=message.text, **message.kwargs)
+			self.__sentCount += 1
+			return
+		except RetryAfter as error:
+			delay = error.retry_after
+		except (BadRequest, Unauthorized) as error:
+			if (self._debugLevel >= 1): print "Message to " + str(message.chatId) + " thrown away: " + str(error)
+			self.__droppedCount += 1
+			return
+		except NetworkError as error:
+			delay = self.__retryDelay * (2 ** message.attempts)
+		except Exception as error:
+			if (self._debugLevel >= 1): print "Message to " + str(message.chatId) + " thrown away: " + str(error)
+			self.__droppedCount += 1
+			return
+
+		message.attempts += 1
+		if(message.attempts > self.__maxRetries):
+			if (self._debugLevel >= 1): print "Message to " + str(message.chatId) + " thrown away after " + str(message.attempts) + " attempts"
+			self.__droppedCount += 1
+			return
+
+		if (self._debugLevel >= 2): print "Message to " + str(message.chatId) + " will be sent again in " + str(delay) + " seconds"
+
+		with self.__condition:
+			if(self.__isStopping):
+				self.__droppedCount += 1
+				return
+
+			self.__blockedChats[message.chatId] = time.time() + delay
+			self.__queues[message.lane].setdefault(message.chatId, deque()).appendleft(message)
+			self.__condition.notify()
+
+		return
+
+	def __getChatBucket(self, chatId):
+		bucket = self.__chatBuckets.get(chatId)
+
+		if(bucket == None):
+			bucket = TokenBucket(self.__chatRate, self.__chatBurst)
+			self.__chatBuckets[chatId] = bucket
+
+		return bucket
+
+	# Throws away the buckets of the chats without pending messages that are full again, so they don't use memory
+	def __removeIdleChats(self, now):
+		for chatId in self.__chatBuckets.keys():
+			if(chatId in self.__queues[0] or chatId in self.__queues[1]):
+				continue
+
+			if(self.__chatBuckets[chatId].isFull(now) and self.__blockedChats.get(chatId, now) <= now):
+				del self.__chatBuckets[chatId]
+				self.__blockedChats.pop(chatId, None)
+
+		return
+
+# The information of a message that is waiting to be sent
+class _Message(object):
+	def __init__(self, bot, chatId, text, lane, kwargs):
+		self.bot = bot
+		self.chatId = chatId
+		self.text = text
+		self.lane = lane
+		self.kwargs = kwargs
+		self.attempts = 0
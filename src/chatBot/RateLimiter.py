@@ -0,0 +1,147 @@
+# Threading is needed since the limiter can be used from several threads at the same time
+import threading
+# Time is needed to know when the soft bans end
+import time
+# OrderedDict is used to know which buckets were used the longest time ago, to throw them away when there are too many
+from collections import OrderedDict
+# The token buckets are used to know how many commands every user and chat can still send
+from TokenBucket import TokenBucket
+
+# This class will be in charge of limiting how many commands every user and every chat can send
+# Every user and every chat has a token bucket, and every command takes from both of them as many tokens as its cost
+# -Only the buckets of the last maxBuckets users and chats are kept, the ones used the longest time ago are thrown away
+#  (a bucket nobody used in a while is full, so throwing it away is the same as keeping it)
+# -A command that costs more than the burst of the user or of the chat could never be allowed, so it is rejected right away
+#  and it counts as a strike like the commands limited by the bucket of the user
+# -A user that keeps sending commands after being limited banThreshold times in a row by its own bucket is soft banned for banDuration seconds
+class RateLimiter(object):
+	# __userRate and __userBurst are the commands per second and the maximum burst of commands of every user
+	# __chatRate and __chatBurst are the commands per second and the maximum burst of commands of every chat
+	# __userBuckets and __chatBuckets are where we store the bucket of every user and chat, from the least to the most recently used
+	# The buckets of the users are stored with the amount of times in a row the user was limited
+	# __softBanned is where we store the time when the soft ban of every user ends
+	# __maxBuckets is the maximum amount of buckets kept of the users and of the chats
+	# __banThreshold is the amount of times in a row a user can be limited before being soft banned
+	# __banDuration is the amount of seconds a soft ban lasts
+	# __limiterLock is the lock used to make sure only one thread at a time uses the buckets
+	# _debugLevel is the flag used to enable the printing messages for debugging
+	__userRate = None
+	__userBurst = None
+	__chatRate = None
+	__chatBurst = None
+	__userBuckets = None
+	__chatBuckets = None
+	__softBanned = None
+	__maxBuckets = None
+	__banThreshold = None
+	__banDuration = None
+	__limiterLock = None
+	_debugLevel = None
+
+	def __init__(self, userRate=1, userBurst=5, chatRate=2, chatBurst=10, maxBuckets=10000, banThreshold=20, banDuration=300, debuglevel=0):
+		self._debugLevel = debuglevel
+
+		self.__userRate = userRate
+		self.__userBurst = userBurst
+		self.__chatRate = chatRate
+		self.__chatBurst = chatBurst
+		self.__userBuckets = OrderedDict()
+		self.__chatBuckets = OrderedDict()
+		self.__softBanned = OrderedDict()
+		self.__maxBuckets = maxBuckets
+		self.__banThreshold = banThreshold
+		self.__banDuration = banDuration
+		self.__limiterLock = threading.Lock()
+
+		return
+
+	# Checks if a user can send a command in a chat right now, taking the tokens of the command if it can
+	# Returns None if the command is allowed, or the reason it isn't ("limited", "toolarge" when it costs more than
+	# getMaxCost, "banned" when the user has just been soft banned, or "softbanned" when the user was already soft banned)
+	def check(self, userId, chatId, cost=1, now=None):
+		if(now == None):
+			now = time.time()
+
+		with self.__limiterLock:
+			if(self.__isSoftBanned(userId, now)):
+				return "softbanned"
+
+			userEntry = self.__getEntry(self.__userBuckets, userId, self.__userRate, self.__userBurst, now)
+			chatEntry = self.__getEntry(self.__chatBuckets, chatId, self.__chatRate, self.__chatBurst, now)
+
+			isTooLarge = cost > self.getMaxCost()
+			isUserAllowed = not isTooLarge and userEntry[0].timeUntilAvailable(cost, now) == 0
+
+			if(isUserAllowed and chatEntry[0].timeUntilAvailable(cost, now) == 0):
+				userEntry[0].consume(cost, now)
+				chatEntry[0].consume(cost, now)
+				userEntry[1] = 0
+				return None
+
+			# A busy chat limits everyone in it, but only the commands the user's own bucket rejected count as strikes
+			if(isUserAllowed):
+				return "limited"
+
+			userEntry[1] += 1
+
+			if(userEntry[1] >= self.__banThreshold):
+				if (self._debugLevel >= 1): print "Soft banning " + str(userId) + " for " + str(self.__banDuration) + " seconds"
+				userEntry[1] = 0
+				self.__softBanned[userId] = now + self.__banDuration
+				self.__removeOldest(self.__softBanned)
+				return "banned"
+
+			return "toolarge" if isTooLarge else "limited"
+
+	# Returns the highest cost a command can have, the burst of the users or of the chats (the lowest of them)
+	def getMaxCost(self):
+		return min(self.__userBurst, self.__chatBurst)
+
+	# Returns the amount of times in a row a user was limited
+	def getStrikes(self, userId):
+		userEntry = self.__userBuckets.get(userId)
+		return 0 if userEntry == None else userEntry[1]
+
+	# Returns if a user is soft banned right now
+	def isSoftBanned(self, userId, now=None):
+		with self.__limiterLock:
+			return self.__isSoftBanned(userId, time.time() if now == None else now)
+
+	# Ends the soft ban of a user, returns False if the user wasn't soft banned
+	def liftSoftBan(self, userId):
+		with self.__limiterLock:
+			return self.__softBanned.pop(userId, None) != None
+
+	# Returns the amount of users and chats with a bucket and the amount of soft banned users
+	def getStats(self):
+		return {"users": len(self.__userBuckets), "chats": len(self.__chatBuckets), "softbanned": len(self.__softBanned)}
+
+	def __isSoftBanned(self, userId, now):
+		banEnd = self.__softBanned.get(userId)
+
+		if(banEnd == None):
+			return False
+
+		if(banEnd <= now):
+			del self.__softBanned[userId]
+			return False
+
+		return True
+
+	# Returns the entry (a list with the bucket and the amount of strikes) of a user or chat, moving it to the end as the most recently used
+	def __getEntry(self, buckets, key, rate, burst, now):
+		entry = buckets.pop(key, None)
+
+		if(entry == None):
+			entry = [TokenBucket(rate, burst, now), 0]
+
+		buckets[key] = entry
+		self.__removeOldest(buckets)
+
+		return entry
+
+	def __removeOldest(self, entries):
+		while(len(entries) > self.__maxBuckets):
+			entries.popitem(last=False)
+
+		return
@@ -0,0 +1,189 @@
+# Multiprocessing is used to run the workers in their own processes, so they are not limited by a single interpreter lock
+import multiprocessing
+# The front of the bot receives the updates with its own updater, the same way a ChatBot does
+from telegram import Update
+from telegram.ext import Updater, TypeHandler
+# The updates can also be received through a webhook
+from WebhookServer import WebhookServer
+
+# This class will be in charge of spreading the updates of a bot between several worker processes
+# The front (this process) only receives the updates, by polling or through a webhook, and every worker runs its own ChatBot
+# made by botFactory, that processes the updates of the chats it was given (see ChatBot.processUpdates)
+# -Every chat always goes to the same worker (the id of the chat modulo the amount of workers), so everything
+#  about a chat (like its alerts or its rate limit) lives in a single worker
+# -The shared commands (like adding admins or stopping the bot) change something all the workers need to know,
+#  so they are sent to all of them but only the worker of the chat answers (and only that one rate limits them)
+# -Telegram limits the messages of the whole bot (messageRate per second), so every worker can send its part of them
+#
+# The workers are started when the object is created, so the botFactory runs in a process without any of the threads
+# the front starts later
+class ShardedBot(object):
+	# __accessToken is the identifier needed for the bot to connect
+	# __sharedCommands are the commands sent to all the workers
+	# __updateQueues are the queues where the updates of every worker are put
+	# __workers are the processes of the workers
+	# __routedCounts is the amount of updates that were sent to every worker
+	# __botUpdater is the one receiving the updates while polling, its dispatcher sends them to the workers
+	# __isPolling is a flag that will let us know if the bot is polling for messages
+	# __webhookServer is the one receiving the updates when the bot uses a webhook instead of polling
+	# _debugLevel is the flag used to enable the printing messages for debugging
+	__accessToken = None
+	__sharedCommands = None
+	__updateQueues = None
+	__workers = None
+	__routedCounts = None
+	__botUpdater = None
+	__isPolling = None
+	__webhookServer = None
+	_debugLevel = None
+
+	def __init__(self, token, botFactory, workers=None, sharedCommands=[], queueSize=1000, messageRate=30, debuglevel=0):
+		self._debugLevel = debuglevel
+
+		if(workers == None):
+			workers = multiprocessing.cpu_count()
+
+		self.__accessToken = token
+		self.__sharedCommands = set()
+		self.setSharedCommands(sharedCommands)
+		self.__updateQueues = []
+		self.__workers = []
+		self.__routedCounts = [0] * workers
+
+		for workerNumber in range(workers):
+			updateQueue = multiprocessing.Queue(queueSize)
+			worker = multiprocessing.Process(target=_runWorker, args=(botFactory, updateQueue, float(messageRate) / workers), name="BotWorker-" + str(workerNumber))
+			worker.daemon = True
+			worker.start()
+
+			self.__updateQueues.append(updateQueue)
+			self.__workers.append(worker)
+
+		if (self._debugLevel >= 1): print "Workers started: " + str(workers)
+
+		self.__isPolling = False
+		self.__botUpdater = Updater(token=self.__accessToken)
+		self.__botUpdater.dispatcher.add_handler(TypeHandler(Update, self.__routeUpdate))
+
+		return
+
+	# Function to change the commands sent to all the workers
+	def setSharedCommands(self, sharedCommands):
+		self.__sharedCommands = set(command.lower() for command in sharedCommands)
+
+	def getSharedCommands(self):
+		return sorted(self.__sharedCommands)
+
+	def getWorkerCount(self):
+		return len(self.__workers)
+
+	# Returns the amount of updates sent to every worker and how many of them are still alive
+	def getStats(self):
+		return {"routed": list(self.__routedCounts), "alive": len([worker for worker in self.__workers if worker.is_alive()])}
+
+	# Returns the number of the worker in charge of an update
+	# The updates without a chat (like the inline queries) are spread using the user, or go to the first worker
+	def getWorkerNumber(self, update):
+		if(update.effective_chat):
+			return update.effective_chat.id % len(self.__workers)
+
+		if(update.effective_user):
+			return update.effective_user.id % len(self.__workers)
+
+		return 0
+
+	# Function to make the bot start polling for messages
+	def startPolling(self):
+		if(self.__isPolling or self.__webhookServer != None):
+			return False
+
+		if (self._debugLevel >= 1): print "Started Polling\n"
+		self.__isPolling = True
+		self.__botUpdater.start_polling()
+		return True
+
+	# Function to make the bot stop polling for messages
+	def stopPolling(self):
+		if(not self.__isPolling):
+			return False
+
+		if (self._debugLevel >= 1): print "Stopped Polling\n"
+		self.__isPolling = False
+		self.__botUpdater.stop()
+		return True
+
+	# Function to make the bot receive the messages through a webhook instead of polling for them (see ChatBot.startWebhook)
+	def startWebhook(self, listen="127.0.0.1", port=8443, urlPath=None, webhookUrl=None, queueSize=100):
+		if(self.__isPolling or self.__webhookServer != None):
+			return False
+
+		if(urlPath == None):
+			urlPath = "/" + self.__accessToken
+
+		if (self._debugLevel >= 1): print "Started Webhook\n"
+		self.__webhookServer = WebhookServer(self.__botUpdater.dispatcher, listen, port, urlPath, queueSize, self._debugLevel)
+		self.__webhookServer.start()
+
+		if(webhookUrl != None):
+			self.__botUpdater.bot.set_webhook(url=webhookUrl)
+
+		return True
+
+	# Function to make the bot stop receiving messages through the webhook
+	def stopWebhook(self):
+		if(self.__webhookServer == None):
+			return False
+
+		if (self._debugLevel >= 1): print "Stopped Webhook\n"
+		self.__webhookServer.stop()
+		self.__webhookServer = None
+		return True
+
+	# Returns the webhook server, None if the bot is not using a webhook
+	def _getWebhookServer(self):
+		return self.__webhookServer
+
+	# Stops receiving updates and waits for the workers to process the ones they already have
+	def stop(self):
+		self.stopPolling()
+		self.stopWebhook()
+
+		for updateQueue in self.__updateQueues:
+			updateQueue.put(None)
+
+		for worker in self.__workers:
+			worker.join()
+
+		if (self._debugLevel >= 1): print "Workers stopped"
+		return
+
+	# Sends an update to the worker of its chat, or to all of them if it is a shared command
+	# When the queue of a worker is full this waits, so the updates are kept by telegram (or by the webhook queue)
+	def __routeUpdate(self, bot, update):
+		data = update.to_dict()
+		workerNumber = self.getWorkerNumber(update)
+
+		if(self.__isSharedCommand(update)):
+			for otherNumber in range(len(self.__updateQueues)):
+				if(otherNumber != workerNumber):
+					self.__updateQueues[otherNumber].put((data, False))
+
+		self.__updateQueues[workerNumber].put((data, True))
+		self.__routedCounts[workerNumber] += 1
+
+		if (self._debugLevel >= 3): print "Update " + str(update.update_id) + " sent to worker " + str(workerNumber)
+		return
+
+	def __isSharedCommand(self, update):
+		if(not update.message or not update.message.text or not update.message.text.startswith("/")):
+			return False
+
+		command = update.message.text[1:].split(None, 1)
+
+		return len(command) > 0 and command[0].split("@")[0].lower() in self.__sharedCommands
+
+# Runs a worker: makes its bot and processes the updates it gets until it is stopped, sending at most messageRate messages per second
+def _runWorker(botFactory, updateQueue, messageRate):
+	bot = botFactory()
+	bot.processUpdates(updateQueue, messageRate)
+	return
@@ -0,0 +1,58 @@
+# Time is needed to know how many tokens were added since the last time we used the bucket
+import time
+
+# This class is a token bucket, used to limit how many times something can happen in a period of time
+# The bucket gets rate tokens per second up to its capacity, and every action takes one (or more) tokens
+# It is not thread safe, whoever uses it from several threads needs to protect it
+class TokenBucket(object):
+	# __rate is the amount of tokens added every second
+	# __capacity is the maximum amount of tokens the bucket can have
+	# __tokens is the amount of tokens the bucket had the last time we updated it
+	# __lastUpdate is the time of the last update of the tokens
+	__rate = None
+	__capacity = None
+	__tokens = None
+	__lastUpdate = None
+
+	def __init__(self, rate, capacity, now=None):
+		self.__rate = float(rate)
+		self.__capacity = float(capacity)
+		self.__tokens = float(capacity)
+		self.__lastUpdate = time.time() if now == None else now
+
+		return
+
+	# Takes tokens from the bucket if it has enough of them, returns False if it doesn't
+	def consume(self, tokens=1, now=None):
+		self.__refill(now)
+
+		if(self.__tokens < tokens):
+			return False
+
+		self.__tokens -= tokens
+		return True
+
+	# Returns the amount of seconds until the bucket has the tokens given
+	def timeUntilAvailable(self, tokens=1, now=None):
+		self.__refill(now)
+
+		if(self.__tokens >= tokens):
+			return 0.0
+
+		return (tokens - self.__tokens) / self.__rate
+
+	# Returns if the bucket is full, a full bucket is the same as a new one so it can be thrown away
+	def isFull(self, now=None):
+		self.__refill(now)
+		return self.__tokens >= self.__capacity
+
+	def __refill(self, now):
+		if(now == None):
+			now = time.time()
+
+		elapsed = now - self.__lastUpdate
+		if(elapsed > 0):
+			self.__tokens = min(self.__capacity, self.__tokens + elapsed * self.__rate)
+			self.__lastUpdate = now
+
+		return
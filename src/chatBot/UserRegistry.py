@@ -0,0 +1,82 @@
+# Json is used to save the users in a small file that can be read and edited by hand
+import json
+# Os is needed to replace the file at once, so nobody reads a file that is half written
+import os
+# Threading is needed since the users can be changed from several threads at the same time
+import threading
+
+# This class will be in charge of keeping a group of users of the bot (like the admins or the banned users)
+# The users are kept in a set, so checking if someone is in the group doesn't depend on how many users there are
+# If a path is given the users are loaded from that file and it is saved again every time the group changes
+class UserRegistry(object):
+	# __users is the set with the ids of the users
+	# __path is the file where the users are saved, None if they are not saved
+	# __registryLock is the lock used to make sure only one thread at a time changes the users
+	# _debugLevel is the flag used to enable the printing messages for debugging
+	__users = None
+	__path = None
+	__registryLock = None
+	_debugLevel = None
+
+	def __init__(self, users=[], path=None, debuglevel=0):
+		self._debugLevel = debuglevel
+
+		self.__users = set(users)
+		self.__path = path
+		self.__registryLock = threading.Lock()
+
+		if(path != None and os.path.exists(path)):
+			with open(path, "r") as registryFile:
+				self.__users.update(str(user) for user in json.load(registryFile)["users"])
+
+			if (self._debugLevel >= 1): print "Users loaded from " + path + ": " + str(len(self.__users))
+
+		return
+
+	# Adds the users given, returns the list of the ones that weren't there before
+	def add(self, users):
+		with self.__registryLock:
+			addedUsers = [user for user in users if user not in self.__users]
+			self.__users.update(addedUsers)
+
+			if(len(addedUsers) > 0):
+				self.__save()
+
+		return addedUsers
+
+	# Removes the users given, returns the list of the ones that were there
+	def remove(self, users):
+		with self.__registryLock:
+			removedUsers = [user for user in users if user in self.__users]
+			self.__users.difference_update(removedUsers)
+
+			if(len(removedUsers) > 0):
+				self.__save()
+
+		return removedUsers
+
+	# Returns the list of users
+	def getUsers(self):
+		return sorted(self.__users)
+
+	def __contains__(self, user):
+		return user in self.__users
+
+	def __len__(self):
+		return len(self.__users)
+
+	def __iter__(self):
+		return iter(self.getUsers())
+
+	# Saves the users in the file, writing first to a temporary file and then replacing the old one
+	# The temporary file has the id of the process, since several processes can share the same registry (see ShardedBot)
+	def __save(self):
+		if(self.__path == None):
+			return
+
+		temporaryPath = self.__path + "." + str(os.getpid()) + ".tmp"
+		with open(temporaryPath, "w") as registryFile:
+			json.dump({"users": sorted(self.__users)}, registryFile)
+
+		os.rename(temporaryPath, self.__path)
+		return
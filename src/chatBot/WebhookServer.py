@@ -0,0 +1,140 @@
+# BaseHTTPServer and SocketServer are used for the small http server that receives the updates from telegram
+import BaseHTTPServer
+import SocketServer
+# Json is used to read the updates telegram sends
+import json
+# Queue is used to keep the updates received until the dispatcher can process them
+import Queue
+# Threading is needed since the server and the forwarder run in their own threads
+import threading
+# The updates are rebuilt from the json with the telegram library, so the dispatcher gets the same objects as when polling
+from telegram import Update
+
+# This class will be in charge of receiving the updates of telegram through a webhook and passing them to the dispatcher
+# The http server only reads the update and puts it in a queue, and a forwarder thread takes them from the queue
+# and gives them to the dispatcher, so telegram gets its answer right away
+# The queue has a maximum size: when it is full the server answers 503 and telegram sends the update again later,
+# so a burst of updates never makes the bot use more and more memory
+class WebhookServer(object):
+	# __dispatcher is the dispatcher that will process the updates
+	# __urlPath is the path of the url where telegram sends the updates, requests to other paths are rejected
+	# __updateQueue is the queue of updates waiting for the dispatcher
+	# __httpServer is the http server receiving the updates
+	# __serverThread and __forwarderThread are the threads of the http server and the one passing the updates to the dispatcher
+	# __receivedCount is the amount of updates received
+	# __rejectedCount is the amount of updates rejected because the queue was full
+	# _debugLevel is the flag used to enable the printing messages for debugging
+	__dispatcher = None
+	__urlPath = None
+	__updateQueue = None
+	__httpServer = None
+	__serverThread = None
+	__forwarderThread = None
+	__receivedCount = None
+	__rejectedCount = None
+	_debugLevel = None
+
+	def __init__(self, dispatcher, listen="127.0.0.1", port=8443, urlPath="/", queueSize=100, debuglevel=0):
+		self._debugLevel = debuglevel
+
+		self.__dispatcher = dispatcher
+		self.__urlPath = urlPath
+		self.__updateQueue = Queue.Queue(queueSize)
+		self.__receivedCount = 0
+		self.__rejectedCount = 0
+
+		self.__httpServer = _HttpServer((listen, port), _WebhookHandler)
+		self.__httpServer.webhookServer = self
+
+		return
+
+	# Returns the address and port the server is listening on
+	def getAddress(self):
+		return self.__httpServer.server_address
+
+	def start(self):
+		self.__serverThread = threading.Thread(target=self.__httpServer.serve_forever, name="WebhookServer")
+		self.__serverThread.daemon = True
+		self.__serverThread.start()
+
+		self.__forwarderThread = threading.Thread(target=self.__forwardUpdates, name="WebhookForwarder")
+		self.__forwarderThread.daemon = True
+		self.__forwarderThread.start()
+
+		if (self._debugLevel >= 1): print "Webhook listening on " + str(self.getAddress())
+		return
+
+	# Stops receiving updates, the ones already in the queue are processed before the forwarder stops
+	def stop(self):
+		self.__httpServer.shutdown()
+		self.__httpServer.server_close()
+		self.__updateQueue.put(None)
+		self.__forwarderThread.join()
+
+		if (self._debugLevel >= 1): print "Webhook stopped"
+		return
+
+	# Returns the amount of updates received, rejected and waiting in the queue
+	def getStats(self):
+		return {"received": self.__receivedCount, "rejected": self.__rejectedCount, "pending": self.__updateQueue.qsize()}
+
+	# Puts an update received in the queue, returns False if the path is not the one of the webhook
+	# Raises Queue.Full when the queue is full
+	def _receive(self, path, body):
+		if(path != self.__urlPath):
+			return False
+
+		try:
+			self.__updateQueue.put_nowait(body)
+		except Queue.Full:
+			self.__rejectedCount += 1
+			raise
+
+		self.__receivedCount += 1
+		return True
+
+	def __forwardUpdates(self):
+		while(True):
+			body = self.__updateQueue.get()
+
+			if(body == None):
+				break
+
+			try:
+				update = Update.de_json(json.loads(body), self.__dispatcher.bot)
+				self.__dispatcher.process_update(update)
+			except Exception as error:
+				if (self._debugLevel >= 1): print "Error processing webhook update: " + str(error)
+
+		return
+
+class _HttpServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+	daemon_threads = True
+	webhookServer = None
+
+# The handler of the requests of the http server, it only accepts POST requests with an update
+class _WebhookHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+	protocol_version = "HTTP/1.1"
+
+	def do_POST(self):
+		body = self.rfile.read(int(self.headers.getheader("Content-Length", 0)))
+
+		try:
+			if(self.server.webhookServer._receive(self.path, body)):
+				self.__answer(200)
+			else:
+				self.__answer(404)
+		except Queue.Full:
+			self.__answer(503)
+
+		return
+
+	def __answer(self, code):
+		self.send_response(code)
+		self.send_header("Content-Length", "0")
+		self.end_headers()
+		return
+
+	# The requests are not printed, telegram can send a lot of them
+	def log_message(self, format, *args):
+		return
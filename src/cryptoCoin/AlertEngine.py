@@ -0,0 +1,156 @@
+# Heapq is used to keep the thresholds of every coin in heaps, so we only look at the alerts that were crossed
+import heapq
+# Math is needed to know if a price is a real number
+import math
+# Threading is needed since alerts are added by the commands and checked after the refreshes in other threads
+import threading
+# Enum is used for the type of the alerts
+from enum import Enum
+
+# Class to be able to identify when an alert should be triggered
+class AlertType(Enum):
+	ABOVE = 'above'
+	BELOW = 'below'
+
+# This class will be in charge of keeping the price alerts of the users and checking them after every refresh
+# For every coin the thresholds of each type of alert are kept in a heap with the closest one to be crossed on top
+# (the lowest threshold of the alerts above and the highest one of the alerts below), so checking a coin only pops
+# the alerts that were crossed (O(k log n) instead of going through all the alerts)
+# Triggered alerts are removed, so every alert is triggered only once
+# Removed alerts are only forgotten in __alerts and skipped when they reach the top of their heap,
+# the heap is built again without them when they are more than the alerts still waiting
+class AlertEngine(object):
+	# __alerts is where we store every alert by its id, as a tuple with the coin, type, price and person
+	# __thresholds is where we store, per type and coin, the heap of tuples with the key and id of every alert
+	# and the amount of alerts in the heap that were not removed
+	# The key is the price for the alerts above and the negated price for the alerts below,
+	# so in both heaps an alert was crossed when its key is lower or equal to the price (negated for the alerts below)
+	# __keySigns is the sign used to make the key of every type of alert
+	# __nextAlertId is the id that the next alert will have
+	# __alertsLock is the lock used to make sure only one thread at a time changes the alerts
+	# _debugLevel is the flag used to enable the printing messages for debugging
+	__alerts = None
+	__thresholds = None
+	__keySigns = {AlertType.ABOVE: 1, AlertType.BELOW: -1}
+	__nextAlertId = None
+	__alertsLock = None
+	_debugLevel = None
+
+	def __init__(self, debuglevel=0):
+		self._debugLevel = debuglevel
+
+		self.__alerts = {}
+		self.__thresholds = {AlertType.ABOVE: {}, AlertType.BELOW: {}}
+		self.__nextAlertId = 1
+		self.__alertsLock = threading.Lock()
+
+		return
+
+	# Adds a new alert and returns its id, or None if the price is not valid (see isValidPrice)
+	def addAlert(self, coin, alertType, price, person):
+		if(not isValidPrice(price)):
+			return None
+
+		with self.__alertsLock:
+			alertId = self.__nextAlertId
+			self.__nextAlertId += 1
+
+			thresholds = self.__thresholds[alertType].setdefault(coin, [[], 0])
+			heapq.heappush(thresholds[0], (self.__keySigns[alertType] * price, alertId))
+			thresholds[1] += 1
+
+			self.__alerts[alertId] = (coin, alertType, price, person)
+
+		if (self._debugLevel >= 2): print "Alert " + str(alertId) + " added: " + str(self.__alerts[alertId])
+		return alertId
+
+	# Removes an alert, only the person that created it can remove it
+	# Returns False if the alert doesn't exist or belongs to somebody else
+	def removeAlert(self, alertId, person):
+		with self.__alertsLock:
+			alert = self.__alerts.get(alertId)
+
+			if(alert == None or alert[3] != person):
+				return False
+
+			coin, alertType, price, person = alert
+			thresholds = self.__thresholds[alertType][coin]
+
+			del self.__alerts[alertId]
+			thresholds[1] -= 1
+
+			if(thresholds[1] == 0):
+				del self.__thresholds[alertType][coin]
+			elif(len(thresholds[0]) > 2 * thresholds[1]):
+				thresholds[0] = [entry for entry in thresholds[0] if entry[1] in self.__alerts]
+				heapq.heapify(thresholds[0])
+
+		if (self._debugLevel >= 2): print "Alert " + str(alertId) + " removed"
+		return True
+
+	# Returns the alerts of a person, as a dict from the alert id to a tuple with the coin, type and price
+	def getAlerts(self, person):
+		with self.__alertsLock:
+			return dict((alertId, alert[:3]) for alertId, alert in self.__alerts.items() if alert[3] == person)
+
+	# Returns the amount of alerts that are waiting to be triggered
+	def getAlertsCount(self):
+		return len(self.__alerts)
+
+	# Returns the coins that have at least one alert
+	def getCoins(self):
+		with self.__alertsLock:
+			return set(self.__thresholds[AlertType.ABOVE]) | set(self.__thresholds[AlertType.BELOW])
+
+	# Checks the alerts of every coin against its current price, getPrice is the function that returns the price of a coin
+	# Returns the list of triggered alerts (as tuples with the id, coin, type, price and person), which are removed
+	def evaluate(self, getPrice):
+		triggered = []
+
+		for coin in self.getCoins():
+			price = getPrice(coin)
+
+			if(price == None):
+				continue
+
+			with self.__alertsLock:
+				triggered += self.__popCrossed(AlertType.ABOVE, coin, price)
+				triggered += self.__popCrossed(AlertType.BELOW, coin, price)
+
+		if (self._debugLevel >= 1 and len(triggered) > 0): print "Alerts triggered: " + str(len(triggered))
+		return triggered
+
+	# Removes and returns the alerts of a type of a coin that were crossed by the price
+	# The alerts above are the ones with a threshold lower or equal to the price
+	# The alerts below are the ones with a threshold higher or equal to the price
+	def __popCrossed(self, alertType, coin, price):
+		thresholds = self.__thresholds[alertType].get(coin)
+
+		if(thresholds == None):
+			return []
+
+		heap = thresholds[0]
+		key = self.__keySigns[alertType] * price
+		triggered = []
+
+		while(len(heap) > 0 and heap[0][0] <= key):
+			alertId = heapq.heappop(heap)[1]
+			alert = self.__alerts.pop(alertId, None)
+
+			# The alerts that were removed are still in the heap
+			if(alert != None):
+				triggered.append((alertId,) + alert)
+				thresholds[1] -= 1
+
+		if(thresholds[1] == 0):
+			del self.__thresholds[alertType][coin]
+
+		return triggered
+
+# Returns if a price can be used for an alert: it has to be a positive number
+# Nan and infinite prices are not valid since they would break the order of the sorted thresholds
+def isValidPrice(price):
+	if(not isinstance(price, (int, long, float))):
+		return False
+
+	return not math.isnan(price) and not math.isinf(price) and price > 0
@@ -0,0 +1,81 @@
+# Mapping is used so the converted tickers can be used in the same way as the ones coinmarketcap returns
+from collections import Mapping
+
+# This class will be in charge of showing a ticker from coinmarketcap in another fiat currency
+# Instead of downloading the same ticker once per currency, we keep the one in the base currency
+# and the fields that depend on the currency are calculated only when someone reads them
+class ConvertedTicker(Mapping):
+	# __convertedFields is the list of fields that change between currencies, without the currency suffix
+	# The amount of decimals of every converted field is in convertedDecimals
+	# __ticker is the original ticker in the base currency
+	# __baseCurrency is the currency of the original ticker, in lowercase
+	# __currency is the currency we are converting to, in lowercase
+	# __rate is the value of 1 unit of the base currency in the currency we are converting to
+	__convertedFields = ["price_", "market_cap_", "24h_volume_"]
+	__ticker = None
+	__baseCurrency = None
+	__currency = None
+	__rate = None
+
+	def __init__(self, ticker, baseCurrency, currency, rate):
+		self.__ticker = ticker
+		self.__baseCurrency = baseCurrency.lower()
+		self.__currency = currency.lower()
+		self.__rate = rate
+
+		return
+
+	def __getitem__(self, key):
+		for field in self.__convertedFields:
+			if(key == field + self.__currency):
+				return convertValue(self.__ticker[field + self.__baseCurrency], self.__rate, convertedDecimals[field])
+
+		return self.__ticker[key]
+
+	def __iter__(self):
+		for key in self.__ticker:
+			yield key
+
+		for field in self.__convertedFields:
+			if(field + self.__baseCurrency in self.__ticker):
+				yield field + self.__currency
+
+	def __len__(self):
+		return len(list(iter(self)))
+
+	def __repr__(self):
+		return repr(dict(self))
+
+# convertedDecimals is the amount of decimals used to show the converted values of every field, without the currency suffix
+# The same amount coinmarketcap used when we downloaded every currency: 8 for the prices and 2 for the market caps and volumes
+convertedDecimals = {"price_": 8, "market_cap_": 2, "24h_volume_": 2}
+
+# Converts a value with the format coinmarketcap uses (a string or None) using the rate given
+def convertValue(value, rate, decimals=8):
+	if(value == None):
+		return None
+
+	return formatDecimal(float(value) * rate, decimals)
+
+# Formats a number with a fixed amount of decimals, without the zeros at the end (but always with at least one decimal)
+# so a converted price shows as 1049.325 instead of 1049.3249999999998
+def formatDecimal(value, decimals):
+	text = ("%." + str(decimals) + "f") % value
+	text = text.rstrip("0")
+
+	if(text.endswith(".")):
+		text += "0"
+
+	return text
+
+# Converts the stats of the market from one currency to another
+# The stats are small enough to convert all of them at once, and unlike the tickers their values are numbers
+def convertStats(stats, baseCurrency, currency, rate):
+	suffix = "_" + baseCurrency.lower()
+	converted = dict(stats)
+
+	for key in stats:
+		if(key.endswith(suffix) and stats[key] != None):
+			converted[key[:-len(suffix)] + "_" + currency.lower()] = stats[key] * rate
+
+	return converted
@@ -0,0 +1,551 @@
+# Datetime import is needed to know how old each one of the snapshots is
+import datetime
+# Threading is needed since the snapshots can be replaced from several threads at the same time
+import threading
+# The thread pool is used to download the information of several currencies at the same time
+from multiprocessing.pool import ThreadPool
+# The converted tickers are used to show the tickers of the default currency in other currencies
+from ConvertedTicker import ConvertedTicker, convertStats
+# The ticker store keeps the tickers of a currency by columns, with the index to find every coin
+from TickerStore import TickerStore
+# The single flight is used to make sure there is only one download of the same information at the same time
+from SingleFlight import SingleFlight
+# The snapshot file is used to keep the snapshots between restarts
+import SnapshotFile
+
+# This class will be in charge of keeping all the information we get from coinmarketcap
+# Every currency has its own snapshot of the stats and the tickers, and each snapshot is replaced
+# all at once after a refresh, so whoever is reading it always gets a complete version of the data
+# If a refresh fails we keep serving the last good snapshot we had
+#
+# When the fiat derivation is enabled only the default currency stats and tickers are downloaded
+# For the other currencies we just download the rate against the default currency (using the price of a single coin)
+# and their stats and tickers are calculated from the default ones when someone reads them
+#
+# There is never more than one download of the same information running at the same time
+# If someone needs information that is already being downloaded, they wait for that download if they have nothing,
+# or they just keep using the expired snapshot if they have one
+#
+# A read only cache never downloads anything, it only has the snapshots loaded from the snapshot file
+# that another process keeps updated (see SnapshotWatcher)
+class MarketCache(object):
+	# __market is the coinmarketcap api object that will get us all the information from them
+	# __defaultCurrency is the currency coinmarketcap uses when we don't ask for a conversion
+	# __supportedCurrencies is the list of currencies that coinmarketcap supports in their api
+	# __updateInterval is the value in seconds of the minimum amount of time needed to update the stats and tickers again
+	# __lazyRefresh is the flag that tells if an expired snapshot should be refreshed when someone reads it
+	# __blockingReads is the flag that tells if the ones reading a missing or expired snapshot wait for its download
+	# __readOnly is the flag that tells if the snapshots are only loaded from the snapshot file, without downloading them
+	# __deriveFiat is the flag that tells if the currencies other than the default one are calculated using the rates
+	# __rateCoin is the id of the coin used to calculate the rates between currencies
+	# __snapshots is where we store, per kind of information (stats, tickers or rates), the snapshot of every currency
+	# The tickers of every currency are kept in a TickerStore
+	# Each snapshot is a tuple whose first value is the information and the last value is the time (in UTC) we got it
+	# __maxWorkers is the maximum amount of requests to coinmarketcap that a batch refresh will do at the same time
+	# __snapshotsLock is the lock used to make sure only one thread at a time replaces the snapshots
+	# __downloads is the single flight used to merge the downloads of the same kind of information and currency
+	# __snapshotPath is the file where the snapshots are saved after every refresh, None if they are not saved
+	# __saveLock is the lock used to make sure only one thread at a time writes the snapshot file
+	# __saveDelay is the amount of seconds a single refresh waits before saving the snapshot file,
+	# so the refreshes done in the meantime (like the stats and the tickers of a currency) are saved only once
+	# __pendingSave is the timer that will save the snapshot file, None if there is no save waiting
+	# __listeners are the functions called with the kind of information and the currency every time a snapshot is replaced
+	# _debugLevel is the flag used to enable the printing messages for debugging
+	__market = None
+	__defaultCurrency = None
+	__supportedCurrencies = None
+	__updateInterval = None
+	__lazyRefresh = None
+	__blockingReads = None
+	__readOnly = None
+	__deriveFiat = None
+	__rateCoin = None
+	__snapshots = None
+	__maxWorkers = None
+	__snapshotsLock = None
+	__downloads = None
+	__snapshotPath = None
+	__saveLock = None
+	__saveDelay = None
+	__pendingSave = None
+	__listeners = None
+	_debugLevel = None
+
+	def __init__(self, market, defaultCurrency, supportedCurrencies, updateInterval=300, maxWorkers=4, deriveFiat=False, rateCoin="bitcoin", saveDelay=1, debuglevel=0):
+		self._debugLevel = debuglevel
+
+		self.__market = market
+		self.__defaultCurrency = defaultCurrency
+		self.__supportedCurrencies = supportedCurrencies
+		self.__updateInterval = updateInterval
+		self.__lazyRefresh = True
+		self.__blockingReads = True
+		self.__readOnly = False
+		self.__maxWorkers = maxWorkers
+		self.__deriveFiat = deriveFiat
+		self.__rateCoin = rateCoin
+		if (self._debugLevel >= 1): print "Derive Fiat: " + str(deriveFiat)
+
+		self.__snapshots = {"stats": {}, "tickers": {}, "rates": {}}
+		self.__snapshotsLock = threading.Lock()
+		self.__downloads = SingleFlight()
+		self.__saveLock = threading.Lock()
+		self.__saveDelay = saveDelay
+		self.__listeners = []
+
+		return
+
+	# Function to change the interval between updates
+	def setUpdateInterval(self, interval):
+		self.__updateInterval = interval
+
+	# Function to get the interval between updates
+	def getUpdateInterval(self):
+		return self.__updateInterval
+
+	# Function to choose if expired snapshots are refreshed by the ones reading them
+	# It should be disabled when there is something else refreshing the snapshots in the background
+	def setLazyRefresh(self, lazyRefresh):
+		self.__lazyRefresh = lazyRefresh
+
+	# Function to choose if the ones reading a missing or expired snapshot wait for its download
+	# If they don't, the download is started in the background and they get what we have right now (None if we have nothing)
+	def setBlockingReads(self, blockingReads):
+		self.__blockingReads = blockingReads
+
+	# Function to choose if the snapshots are only loaded from the snapshot file, so coinmarketcap is never asked for anything
+	# The ones reading a missing or expired snapshot get what we have right now (None if we have nothing)
+	def setReadOnly(self, readOnly):
+		self.__readOnly = readOnly
+
+	# Adds a function that will be called with the kind of information and the currency after every refresh
+	# or every time a snapshot is replaced by one loaded from the snapshot file
+	def addListener(self, listener):
+		self.__listeners.append(listener)
+
+	# Function to choose the file where the snapshots are saved after every refresh, None to stop saving them
+	def setSnapshotPath(self, path):
+		self.__snapshotPath = path
+
+	# Saves all the snapshots we have in a file, by default the one set with setSnapshotPath
+	def saveSnapshot(self, path=None):
+		if(path == None):
+			path = self.__snapshotPath
+
+		with self.__snapshotsLock:
+			snapshots = {}
+			for kind in self.__snapshots:
+				snapshots[kind] = dict(self.__snapshots[kind])
+
+		with self.__saveLock:
+			try:
+				SnapshotFile.writeSnapshots(path, snapshots)
+			except (IOError, OSError, ValueError) as error:
+				if (self._debugLevel >= 1): print "Error saving Snapshot in " + path + ": " + str(error)
+				return False
+
+		if (self._debugLevel >= 2): print "Snapshot saved in: " + path
+		return True
+
+	# Loads the snapshots saved in a file, by default the one set with setSnapshotPath
+	# Only the snapshots that are not older than maxAge seconds (by default the update interval) are used
+	# Returns the list of currencies that were completely loaded
+	def loadSnapshot(self, path=None, maxAge=None):
+		if(path == None):
+			path = self.__snapshotPath
+
+		if(maxAge == None):
+			maxAge = self.__updateInterval
+
+		try:
+			savedSnapshots = SnapshotFile.readSnapshots(path)
+		except (IOError, OSError, EOFError, ValueError, TypeError, KeyError) as error:
+			if (self._debugLevel >= 1): print "Error loading Snapshot from " + path + ": " + str(error)
+			return []
+
+		if(savedSnapshots == None):
+			return []
+
+		# Only the snapshots newer than the ones we have are replaced, so loading the same file twice changes nothing
+		now = datetime.datetime.utcnow()
+		replacedSnapshots = []
+		with self.__snapshotsLock:
+			for kind in self.__snapshots:
+				for currency, snapshot in savedSnapshots.get(kind, {}).items():
+					currentSnapshot = self.__snapshots[kind].get(currency)
+
+					if((now - snapshot[-1]).total_seconds() <= maxAge and (currentSnapshot == None or currentSnapshot[-1] < snapshot[-1])):
+						self.__snapshots[kind][currency] = snapshot
+						replacedSnapshots.append((kind, currency))
+
+		for kind, currency in replacedSnapshots:
+			self.__notifyListeners(kind, currency)
+
+		loadedCurrencies = []
+		for currency in self.__supportedCurrencies:
+			if(None not in [self.__snapshots[kind].get(currency) for kind in self.__getKinds(currency)]):
+				loadedCurrencies.append(currency)
+
+		if (self._debugLevel >= 1): print "Snapshot loaded from " + path + ": " + str(loadedCurrencies)
+		return loadedCurrencies
+
+	# Returns the stats of a currency, refreshing them first only if they are expired and the lazy refresh is enabled
+	def getStats(self, currency):
+		if(self.__isDerived(currency)):
+			stats = self.getStats(self.__defaultCurrency)
+			rate = self.getRate(currency)
+
+			if(stats == None or rate == None):
+				return None
+
+			return convertStats(stats, self.__defaultCurrency, currency, rate)
+
+		snapshot = self.__getSnapshot("stats", currency)
+
+		if(snapshot == None):
+			return None
+
+		return snapshot[0]
+
+	# Returns the tickers of a currency, refreshing them first only if they are expired and the lazy refresh is enabled
+	def getTickers(self, currency):
+		if(self.__isDerived(currency)):
+			tickers = self.getTickers(self.__defaultCurrency)
+			rate = self.getRate(currency)
+
+			if(tickers == None or rate == None):
+				return None
+
+			return tickers.convert(self.__defaultCurrency, currency, rate)
+
+		snapshot = self.__getSnapshot("tickers", currency)
+
+		if(snapshot == None):
+			return None
+
+		return snapshot[0]
+
+	# Returns the ticker of a coin, looking for it by its symbol, name or id
+	def getTicker(self, coin, currency):
+		if(self.__isDerived(currency)):
+			ticker = self.getTicker(coin, self.__defaultCurrency)
+			rate = self.getRate(currency)
+
+			if(ticker == None or rate == None):
+				return None
+
+			return ConvertedTicker(ticker, self.__defaultCurrency, currency, rate)
+
+		snapshot = self.__getSnapshot("tickers", currency)
+
+		if(snapshot == None):
+			return None
+
+		return snapshot[0].getTicker(coin)
+
+	# Returns the value of 1 unit of the default currency in the currency given
+	# Rates are only downloaded when the fiat derivation is enabled
+	def getRate(self, currency):
+		if(currency == self.__defaultCurrency):
+			return 1.0
+
+		snapshot = self.__getSnapshot("rates", currency)
+
+		if(snapshot == None):
+			return None
+
+		return snapshot[0]
+
+	# Returns the amount of seconds since the stats of a currency were updated, None if we never got them
+	def getStatsAge(self, currency):
+		return self.__getAge("stats", currency)
+
+	# Returns the amount of seconds since the tickers of a currency were updated, None if we never got them
+	def getTickersAge(self, currency):
+		return self.__getAge("tickers", currency)
+
+	# Returns how stale every currency is, using the oldest of its snapshots
+	def getStaleness(self):
+		staleness = {}
+
+		for currency in self.__supportedCurrencies:
+			statsAge = self.getStatsAge(currency)
+			tickersAge = self.getTickersAge(currency)
+
+			if(statsAge == None or tickersAge == None):
+				staleness[currency] = None
+			else:
+				staleness[currency] = max(statsAge, tickersAge)
+
+		return staleness
+
+	# Returns the currencies that have a snapshot that will expire in less than margin seconds
+	# Currencies that were never loaded are left out, those will be loaded the first time someone reads them
+	def getExpiringCurrencies(self, margin=0):
+		expiring = []
+
+		for currency in self.__supportedCurrencies:
+			ages = [self.__getOwnAge(kind, currency) for kind in self.__getKinds(currency)]
+
+			if(ages.count(None) == len(ages)):
+				continue
+
+			if(None in ages or max(ages) > self.__updateInterval - margin):
+				expiring.append(currency)
+
+		return expiring
+
+	# Downloads the stats and the tickers of a currency, or just its rate if it is derived from the default currency
+	# Returns False if any of them couldn't be downloaded
+	def refresh(self, currency):
+		updated = True
+
+		for kind in self.__getKinds(currency):
+			updated = self.__refreshSnapshot(kind, currency) and updated
+
+		return updated
+
+	# Downloads the stats and the tickers of several currencies at the same time, using at most maxWorkers requests at once
+	# The new snapshots are only stored after all the requests finished, replacing all of them at once
+	# Returns the list of currencies that were completely updated
+	def refreshCurrencies(self, currencies, maxWorkers=None):
+		if(maxWorkers == None):
+			maxWorkers = self.__maxWorkers
+
+		requests = [(kind, currency) for currency in currencies for kind in self.__getKinds(currency)]
+
+		if (self._debugLevel >= 1): print "Updating Currencies: " + str(currencies)
+
+		if(len(requests) == 0):
+			return []
+
+		pool = ThreadPool(min(maxWorkers, len(requests)))
+		try:
+			snapshots = pool.map(self.__download, requests)
+		finally:
+			pool.close()
+			pool.join()
+
+		failedCurrencies = set()
+		newSnapshots = {}
+		for kind in self.__snapshots:
+			newSnapshots[kind] = {}
+
+		for (kind, currency), snapshot in zip(requests, snapshots):
+			if(snapshot == None):
+				failedCurrencies.add(currency)
+			else:
+				newSnapshots[kind][currency] = snapshot
+
+		replacedSnapshots = []
+		with self.__snapshotsLock:
+			allSnapshots = {}
+			for kind in self.__snapshots:
+				allSnapshots[kind] = dict(self.__snapshots[kind])
+
+				for currency in newSnapshots[kind]:
+					if(self.__isNewer(newSnapshots[kind][currency], allSnapshots[kind].get(currency))):
+						allSnapshots[kind][currency] = newSnapshots[kind][currency]
+						replacedSnapshots.append((kind, currency))
+
+			self.__snapshots = allSnapshots
+
+		if(self.__snapshotPath != None and len(replacedSnapshots) > 0):
+			self.saveSnapshot()
+
+		for kind, currency in replacedSnapshots:
+			self.__notifyListeners(kind, currency)
+
+		return [currency for currency in currencies if currency not in failedCurrencies]
+
+	# Downloads the stats of a currency and replaces its snapshot
+	def refreshStats(self, currency):
+		if(self.__isDerived(currency)):
+			return self.__refreshSnapshot("rates", currency)
+
+		return self.__refreshSnapshot("stats", currency)
+
+	# Downloads the tickers of a currency and replaces its snapshot
+	def refreshTickers(self, currency):
+		if(self.__isDerived(currency)):
+			return self.__refreshSnapshot("rates", currency)
+
+		return self.__refreshSnapshot("tickers", currency)
+
+	def __refreshSnapshot(self, kind, currency):
+		snapshot = self.__download((kind, currency))
+
+		if(snapshot == None):
+			return False
+
+		with self.__snapshotsLock:
+			isReplaced = self.__isNewer(snapshot, self.__snapshots[kind].get(currency))
+
+			if(isReplaced):
+				self.__snapshots[kind][currency] = snapshot
+
+		if(not isReplaced):
+			return True
+
+		if(self.__snapshotPath != None):
+			self.__scheduleSave()
+
+		self.__notifyListeners(kind, currency)
+		return True
+
+	# Saves the snapshot file in a timer thread after the save delay, unless there is already a save waiting
+	# This way the ones refreshing a single snapshot (like a command with the lazy refresh) never wait for the file
+	def __scheduleSave(self):
+		with self.__snapshotsLock:
+			if(self.__pendingSave != None):
+				return
+
+			self.__pendingSave = threading.Timer(self.__saveDelay, self.__savePending)
+			self.__pendingSave.daemon = True
+			self.__pendingSave.start()
+
+		return
+
+	def __savePending(self):
+		with self.__snapshotsLock:
+			self.__pendingSave = None
+
+		self.saveSnapshot()
+		return
+
+	# Lets the listeners know that a snapshot was replaced, an error in one of them doesn't stop the others
+	def __notifyListeners(self, kind, currency):
+		for listener in self.__listeners:
+			try:
+				listener(kind, currency)
+			except Exception as error:
+				if (self._debugLevel >= 1): print "Error in listener for " + kind + " of " + currency + ": " + str(error)
+
+		return
+
+	# Downloads a snapshot, or waits for the download of that same snapshot if someone else is already doing it
+	def __download(self, request):
+		return self.__downloads.run(request, self.__runRequest, request)
+
+	# Returns if a snapshot should replace the one we have: a slow download never replaces a more recent one,
+	# and the snapshot everyone waiting for the same download gets is only stored once
+	def __isNewer(self, snapshot, currentSnapshot):
+		return currentSnapshot == None or (currentSnapshot is not snapshot and currentSnapshot[-1] <= snapshot[-1])
+
+	# Runs one of the snapshot downloads, returning None if it failed so we keep the last good snapshot
+	def __runRequest(self, request):
+		kind, currency = request
+
+		try:
+			if(kind == "stats"):
+				return self.__fetchStatsSnapshot(currency)
+			elif(kind == "tickers"):
+				return self.__fetchTickersSnapshot(currency)
+			else:
+				return self.__fetchRateSnapshot(currency)
+		except Exception as error:
+			if (self._debugLevel >= 1): print "Error updating " + kind + " for " + currency + ": " + str(error)
+			return None
+
+	def __fetchStatsSnapshot(self, currency):
+		if (self._debugLevel >= 1): print "Updating Stats for: " + currency
+		stats = self.__fetchStats(currency)
+		return (stats, datetime.datetime.utcnow())
+
+	def __fetchTickersSnapshot(self, currency):
+		if (self._debugLevel >= 1): print "Updating Ticker for: " + currency
+		tickers = TickerStore(self.__fetchTickers(currency))
+		if (self._debugLevel >= 2): print "Tickers Stored: " + str(len(tickers))
+		return (tickers, datetime.datetime.utcnow())
+
+	def __fetchRateSnapshot(self, currency):
+		if (self._debugLevel >= 1): print "Updating Rate for: " + currency
+		rate = self.__fetchRate(currency)
+		return (rate, datetime.datetime.utcnow())
+
+	# Returns the snapshot of a kind of information of a currency
+	# If we don't have it yet we download it (or wait for the download that is running)
+	# If it is expired and nobody is downloading it yet we refresh it, otherwise we return the expired one
+	# Without blocking reads the downloads are done in the background and we return what we have
+	def __getSnapshot(self, kind, currency):
+		snapshot = self.__snapshots[kind].get(currency)
+		isMissing = snapshot == None
+
+		if(self.__readOnly):
+			return snapshot
+
+		if(not isMissing and not (self.__lazyRefresh and self.__isExpired(snapshot[-1]))):
+			return snapshot
+
+		if(not self.__blockingReads):
+			self.__refreshInBackground(kind, currency)
+		elif(isMissing or not self.__downloads.isRunning((kind, currency))):
+			self.__refreshSnapshot(kind, currency)
+			snapshot = self.__snapshots[kind].get(currency)
+
+		return snapshot
+
+	# Starts the refresh of a snapshot in its own thread, unless it is already being downloaded
+	def __refreshInBackground(self, kind, currency):
+		if(self.__downloads.isRunning((kind, currency))):
+			return
+
+		refreshThread = threading.Thread(target=self.__refreshSnapshot, args=(kind, currency), name="Refresh " + kind + " " + currency)
+		refreshThread.daemon = True
+		refreshThread.start()
+
+		return
+
+	# Returns the age of a kind of information of a currency
+	# Derived currencies are as old as the oldest between their rate and the information of the default currency
+	def __getAge(self, kind, currency):
+		if(self.__isDerived(currency)):
+			ages = [self.__getOwnAge(kind, self.__defaultCurrency), self.__getOwnAge("rates", currency)]
+
+			if(None in ages):
+				return None
+
+			return max(ages)
+
+		return self.__getOwnAge(kind, currency)
+
+	def __getOwnAge(self, kind, currency):
+		snapshot = self.__snapshots[kind].get(currency)
+
+		if(snapshot == None):
+			return None
+
+		return (datetime.datetime.utcnow() - snapshot[-1]).total_seconds()
+
+	# Returns the kinds of information we need to download for a currency
+	def __getKinds(self, currency):
+		if(self.__isDerived(currency)):
+			return ["rates"]
+
+		return ["stats", "tickers"]
+
+	def __isDerived(self, currency):
+		return self.__deriveFiat and currency != self.__defaultCurrency
+
+	def __isExpired(self, lastUpdated):
+		return (datetime.datetime.utcnow() - lastUpdated).total_seconds() > self.__updateInterval
+
+	# Coinmarketcap function wrapper to get the stats in the currency we want
+	def __fetchStats(self, currency):
+		if(currency != self.__defaultCurrency and currency in self.__supportedCurrencies):
+			return self.__market.stats(convert=currency)
+
+		return self.__market.stats()
+
+	# Coinmarketcap function wrapper to get the tickers in the currency we want
+	def __fetchTickers(self, currency):
+		if(currency != self.__defaultCurrency):
+			return self.__market.ticker(convert=currency)
+
+		return self.__market.ticker()
+
+	# Coinmarketcap function wrapper to get the rate between the default currency and the one we want
+	# The rate is calculated using the price of a single coin in both currencies
+	def __fetchRate(self, currency):
+		ticker = self.__market.ticker(self.__rateCoin, convert=currency)[0]
+		return float(ticker["price_" + currency.lower()]) / float(ticker["price_" + self.__defaultCurrency.lower()])
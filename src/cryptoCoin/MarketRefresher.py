@@ -0,0 +1,52 @@
+# Threading is needed since the refresh will be done outside of the threads answering the commands
+import threading
+
+# This class will be in charge of refreshing the snapshots of a MarketCache in the background
+# Every few seconds it checks which currencies are about to expire and refreshes them
+# before that happens, so the ones reading the cache never have to wait for coinmarketcap
+class MarketRefresher(threading.Thread):
+	# __marketCache is the cache whose snapshots we are going to keep updated
+	# __margin is the amount of seconds before the expiration of a snapshot when we are going to refresh it
+	# __checkInterval is the amount of seconds between each check of the snapshots
+	# __stopEvent is the event used to wake up the thread and let it know it should stop
+	# _debugLevel is the flag used to enable the printing messages for debugging
+	__marketCache = None
+	__margin = None
+	__checkInterval = None
+	__stopEvent = None
+	_debugLevel = None
+
+	def __init__(self, marketCache, margin=30, checkInterval=5, debuglevel=0):
+		super(MarketRefresher, self).__init__(name="MarketRefresher")
+		self.daemon = True
+		self._debugLevel = debuglevel
+
+		self.__marketCache = marketCache
+		self.__margin = margin
+		self.__checkInterval = checkInterval
+		self.__stopEvent = threading.Event()
+
+		return
+
+	def run(self):
+		if (self._debugLevel >= 1): print "Market Refresher started"
+
+		while(not self.__stopEvent.is_set()):
+			expiringCurrencies = self.__marketCache.getExpiringCurrencies(self.__margin)
+
+			if(len(expiringCurrencies) > 0):
+				self.__marketCache.refreshCurrencies(expiringCurrencies)
+
+			self.__stopEvent.wait(self.__checkInterval)
+
+		if (self._debugLevel >= 1): print "Market Refresher stopped"
+		return
+
+	# Function to make the refresher stop, it will finish the refresh it is doing before stopping
+	def stop(self):
+		self.__stopEvent.set()
+		return
+
+	# Returns if the refresher is still running
+	def isRunning(self):
+		return self.is_alive() and not self.__stopEvent.is_set()
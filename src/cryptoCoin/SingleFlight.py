@@ -0,0 +1,60 @@
+# Threading is needed since the calls we are merging come from different threads
+import threading
+
+# This class will be in charge of merging the calls to the same function that happen at the same time
+# The first thread that asks for a key does the call, and the rest of the threads asking for that same key
+# while the call is running just wait for it to finish and get the same result
+class SingleFlight(object):
+	# __calls is where we keep, per key, the call that is running right now
+	# __callsLock is the lock used to make sure only one thread becomes the one doing the call
+	__calls = None
+	__callsLock = None
+
+	def __init__(self):
+		self.__calls = {}
+		self.__callsLock = threading.Lock()
+
+		return
+
+	# Calls the function with the arguments given, unless there is already a call running for the key
+	# In that case it waits for that call and returns its result (or raises its error)
+	def run(self, key, function, *args):
+		with self.__callsLock:
+			call = self.__calls.get(key)
+			isLeader = call == None
+
+			if(isLeader):
+				call = _Call()
+				self.__calls[key] = call
+
+		if(not isLeader):
+			call.finished.wait()
+
+			if(call.error != None):
+				raise call.error
+
+			return call.result
+
+		try:
+			call.result = function(*args)
+		except Exception as error:
+			call.error = error
+			raise
+		finally:
+			with self.__callsLock:
+				del self.__calls[key]
+
+			call.finished.set()
+
+		return call.result
+
+	# Returns if there is a call running for the key
+	def isRunning(self, key):
+		return key in self.__calls
+
+# The information of a call, so the threads waiting for it can get the result
+class _Call(object):
+	def __init__(self):
+		self.finished = threading.Event()
+		self.result = None
+		self.error = None
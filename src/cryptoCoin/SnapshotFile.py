@@ -0,0 +1,71 @@
+# Marshal is used since it is the fastest way to save and load basic python types
+import marshal
+# Os is needed to replace the snapshot file at once, so nobody reads a file that is half written
+import os
+# Calendar and datetime are needed to save the time of every snapshot (in UTC) as a number
+import calendar
+import datetime
+# The tickers are saved by columns using the raw bytes of the ticker store
+import TickerStore
+
+# This file has the functions in charge of saving and loading the market snapshots in a file
+# It is used to keep the information we got from coinmarketcap between restarts of the bot
+# The file is a marshal dump of a dict with the snapshots of every kind of information and currency
+# where the tickers are stored by columns and the times are stored as timestamps
+# The times of the snapshots are in UTC, so the file can be read by a process with another timezone
+
+# _snapshotVersion is the version of the format of the file, files with a different version are ignored
+# (the version 2 added the original texts and the converted fields of the ticker stores)
+_snapshotVersion = 2
+
+# Saves the snapshots in the file given, writing first to a temporary file and then replacing the old one
+def writeSnapshots(path, snapshots):
+	data = {}
+
+	for kind in snapshots:
+		data[kind] = {}
+
+		for currency in snapshots[kind]:
+			snapshot = snapshots[kind][currency]
+			value = snapshot[0]
+
+			if(kind == "tickers"):
+				value = value.toData()
+
+			data[kind][currency] = (value, _toTimestamp(snapshot[-1]))
+
+	temporaryPath = path + ".tmp"
+	with open(temporaryPath, "wb") as snapshotFile:
+		marshal.dump({"version": _snapshotVersion, "snapshots": data}, snapshotFile, 2)
+
+	os.rename(temporaryPath, path)
+	return
+
+# Loads the snapshots from the file given, returning None if the file doesn't exist or has another version
+def readSnapshots(path):
+	if(not os.path.exists(path)):
+		return None
+
+	with open(path, "rb") as snapshotFile:
+		data = marshal.load(snapshotFile)
+
+	if(data.get("version") != _snapshotVersion):
+		return None
+
+	snapshots = {}
+	for kind in data["snapshots"]:
+		snapshots[kind] = {}
+
+		for currency in data["snapshots"][kind]:
+			value, timestamp = data["snapshots"][kind][currency]
+
+			if(kind == "tickers"):
+				value = TickerStore.fromData(value)
+
+			snapshots[kind][currency] = (value, datetime.datetime.utcfromtimestamp(timestamp))
+
+	return snapshots
+
+# Converts a time in UTC to a timestamp
+def _toTimestamp(moment):
+	return calendar.timegm(moment.timetuple()) + moment.microsecond / 1000000.0
@@ -0,0 +1,71 @@
+# Os is needed to know when the snapshot file was replaced
+import os
+# Threading is needed since the file is checked outside of the threads answering the commands
+import threading
+
+# This class will be in charge of keeping a read only MarketCache updated with the snapshot file another process saves
+# Every few seconds it checks if the file was replaced and loads it again only when it was,
+# so the processes reading the file never ask coinmarketcap for anything
+# The file is always replaced at once (see SnapshotFile), so a new file means a new inode
+class SnapshotWatcher(threading.Thread):
+	# __marketCache is the cache where the snapshots are loaded
+	# __snapshotPath is the file with the snapshots
+	# __checkInterval is the amount of seconds between each check of the file
+	# __lastVersion is the inode, time and size of the file the last time it was loaded, None if it was never loaded
+	# __stopEvent is the event used to wake up the thread and let it know it should stop
+	# _debugLevel is the flag used to enable the printing messages for debugging
+	__marketCache = None
+	__snapshotPath = None
+	__checkInterval = None
+	__lastVersion = None
+	__stopEvent = None
+	_debugLevel = None
+
+	def __init__(self, marketCache, snapshotPath, checkInterval=1, debuglevel=0):
+		super(SnapshotWatcher, self).__init__(name="SnapshotWatcher")
+		self.daemon = True
+		self._debugLevel = debuglevel
+
+		self.__marketCache = marketCache
+		self.__snapshotPath = snapshotPath
+		self.__checkInterval = checkInterval
+		self.__stopEvent = threading.Event()
+
+		return
+
+	def run(self):
+		if (self._debugLevel >= 1): print "Snapshot Watcher started"
+
+		while(not self.__stopEvent.is_set()):
+			self.check()
+			self.__stopEvent.wait(self.__checkInterval)
+
+		if (self._debugLevel >= 1): print "Snapshot Watcher stopped"
+		return
+
+	# Loads the snapshot file if it changed since the last time it was loaded, returns False if it didn't change
+	# The snapshots are loaded no matter how old they are, an old snapshot is better than nothing
+	def check(self):
+		try:
+			fileStat = os.stat(self.__snapshotPath)
+		except OSError:
+			return False
+
+		version = (fileStat.st_ino, fileStat.st_mtime, fileStat.st_size)
+
+		if(version == self.__lastVersion):
+			return False
+
+		self.__lastVersion = version
+		self.__marketCache.loadSnapshot(self.__snapshotPath, float("inf"))
+
+		return True
+
+	# Function to make the watcher stop
+	def stop(self):
+		self.__stopEvent.set()
+		return
+
+	# Returns if the watcher is still running
+	def isRunning(self):
+		return self.is_alive() and not self.__stopEvent.is_set()
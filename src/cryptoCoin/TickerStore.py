@@ -0,0 +1,329 @@
+# Arrays are used to keep the numeric values of the tickers in a compact way
+from array import array
+# Mapping is used so every row can still be read like the tickers coinmarketcap returns
+from collections import Mapping
+# Numpy is used to sort the numeric columns without going through them in python
+import numpy
+# The converted values are shown with the same decimals as the converted tickers
+from ConvertedTicker import convertedDecimals, formatDecimal
+
+# This class will be in charge of storing the tickers of a currency by columns
+# Instead of a dict with strings per coin, every numeric field is stored in a typed array with one position per coin
+# and the text fields (id, name and symbol) are stored in plain lists
+# It also has the index to find the row of a coin by its symbol, name or id
+#
+# To keep working with the code that expects the coinmarketcap format, every row can be read as a dict of strings
+# The numbers are shown with the same text coinmarketcap sent: the few values whose text can't be rebuilt from the number
+# (like "0", that would be shown as "0.0") keep their original text apart
+class TickerStore(object):
+	# __textFields are the fields that are always stored as text
+	# __integerFields are the numeric fields stored as integers, the rest of the numeric fields are stored as floats
+	# __missingInteger is the value stored in the integer columns when coinmarketcap doesn't send the value
+	# __fields is the list of fields in the store, in the order we found them
+	# __columns is where we store the values of every field, one array or list per field
+	# __index is the map from the upper cased symbol, name and id of a coin to its row
+	# __size is the amount of coins in the store
+	# __texts is where we keep, per field, the original text of the values that can't be rebuilt from their number
+	# __convertedFields are the fields calculated with a conversion, with the amount of decimals they are shown with
+	# __conversions is where we keep the stores converted to other currencies, with the rate used for them
+	__textFields = ["id", "name", "symbol"]
+	__integerFields = ["rank", "last_updated"]
+	__missingInteger = -1
+	__fields = None
+	__columns = None
+	__index = None
+	__size = None
+	__texts = None
+	__convertedFields = None
+	__conversions = None
+
+	def __init__(self, tickers=[], columns=None, index=None, size=0, fields=None, texts=None, convertedFields=None):
+		self.__conversions = {}
+		self.__convertedFields = convertedFields or {}
+
+		if(columns != None):
+			self.__fields = fields or list(columns.keys())
+			self.__columns = columns
+			self.__index = index
+			self.__size = size
+			self.__texts = texts or {}
+			return
+
+		self.__fields = []
+		self.__columns = {}
+		self.__index = {}
+		self.__size = len(tickers)
+		self.__texts = {}
+
+		for ticker in tickers:
+			for field in ticker:
+				if(field not in self.__columns):
+					self.__fields.append(field)
+					self.__columns[field] = None
+
+		for field in self.__fields:
+			values = [ticker.get(field) for ticker in tickers]
+			self.__columns[field] = self.__buildColumn(field, values)
+
+			if(isinstance(self.__columns[field], array)):
+				texts = self.__getDifferentTexts(field, values)
+
+				if(len(texts) > 0):
+					self.__texts[field] = texts
+
+		# Later tickers overwrite the previous ones, same as the old linear search that kept the last match
+		for row in xrange(self.__size):
+			for field in self.__textFields:
+				if(field in self.__columns and self.__columns[field][row] != None):
+					self.__index[self.__columns[field][row].upper()] = row
+
+		return
+
+	def __len__(self):
+		return self.__size
+
+	def __iter__(self):
+		for row in xrange(self.__size):
+			yield TickerRow(self, row)
+
+	def __getitem__(self, row):
+		if(row < 0):
+			row += self.__size
+
+		if(row < 0 or row >= self.__size):
+			raise IndexError("Ticker row out of range")
+
+		return TickerRow(self, row)
+
+	# Returns the list of fields in the store
+	def getFields(self):
+		return self.__fields
+
+	# Returns if the store has a field
+	def hasField(self, field):
+		return field in self.__columns
+
+	# Returns the whole column of a field, it shouldn't be modified
+	def getColumn(self, field):
+		return self.__columns[field]
+
+	# Returns the row of a coin looking for it by its symbol, name or id, None if it is not in the store
+	def getRow(self, coin):
+		return self.__index.get(coin.upper())
+
+	# Returns the ticker of a coin looking for it by its symbol, name or id, None if it is not in the store
+	def getTicker(self, coin):
+		row = self.getRow(coin)
+
+		if(row == None):
+			return None
+
+		return TickerRow(self, row)
+
+	# Returns the value of a field in a row, using its type (float, integer or text), None if it is missing
+	def getValue(self, row, field):
+		value = self.__columns[field][row]
+
+		if(field in self.__integerFields and value == self.__missingInteger):
+			return None
+
+		if(isinstance(value, float) and value != value):
+			return None
+
+		return value
+
+	# Returns the value of a field in a row with the same format coinmarketcap uses (strings or None)
+	def getText(self, row, field):
+		texts = self.__texts.get(field)
+
+		if(texts != None and row in texts):
+			return texts[row]
+
+		value = self.getValue(row, field)
+
+		if(value == None or isinstance(value, basestring)):
+			return value
+
+		if(field in self.__convertedFields):
+			return formatDecimal(value, self.__convertedFields[field])
+
+		return formatNumber(value)
+
+	# Returns the tickers with the n highest (or lowest) values of a field
+	# Coins without a value for that field are left out
+	# Only the n best rows are sorted, the rest of them are just split apart with a partition
+	def topBy(self, field, n, ascending=False):
+		if(n <= 0):
+			return []
+
+		rows, keys = self.__getSortKeys(field, ascending)
+
+		if(n < len(rows)):
+			best = numpy.argpartition(keys, n - 1)[:n]
+		else:
+			best = numpy.arange(len(rows))
+
+		best = best[numpy.argsort(keys[best], kind="mergesort")]
+
+		return [TickerRow(self, row) for row in rows[best].tolist()]
+
+	# Returns all the tickers sorted by a field, coins without a value for that field are left out
+	def sortBy(self, field, ascending=True):
+		rows, keys = self.__getSortKeys(field, ascending)
+
+		return [TickerRow(self, row) for row in rows[numpy.argsort(keys, kind="mergesort")].tolist()]
+
+	# Returns a store with the prices, market caps and volumes converted to another currency using the rate given
+	# The new store shares all the other columns and the index with this one, and it is kept until the rate changes
+	def convert(self, baseCurrency, currency, rate):
+		conversion = self.__conversions.get(currency)
+
+		if(conversion != None and conversion[0] == rate):
+			return conversion[1]
+
+		columns = dict(self.__columns)
+		fields = list(self.__fields)
+		convertedFields = dict(self.__convertedFields)
+		for field in ["price_", "market_cap_", "24h_volume_"]:
+			baseColumn = self.__columns.get(field + baseCurrency.lower())
+
+			if(isinstance(baseColumn, array)):
+				columns[field + currency.lower()] = array('d', [value * rate for value in baseColumn])
+				convertedFields[field + currency.lower()] = convertedDecimals[field]
+				if(field + currency.lower() not in fields):
+					fields.append(field + currency.lower())
+
+		texts = dict((field, self.__texts[field]) for field in self.__texts if field not in convertedFields)
+		converted = TickerStore(columns=columns, index=self.__index, size=self.__size, fields=fields, texts=texts, convertedFields=convertedFields)
+		self.__conversions[currency] = (rate, converted)
+		return converted
+
+	# Returns all the information of the store using only basic types (dicts, lists, tuples, strings and numbers)
+	# The typed columns are returned as their raw bytes, so they can be saved and loaded really fast
+	def toData(self):
+		columns = {}
+
+		for field in self.__fields:
+			column = self.__columns[field]
+
+			if(isinstance(column, array)):
+				columns[field] = (column.typecode, column.tostring())
+			else:
+				columns[field] = (None, column)
+
+		return {"fields": self.__fields, "columns": columns, "index": self.__index, "size": self.__size, "texts": self.__texts, "convertedFields": self.__convertedFields}
+
+	# Returns the original text of the values of a numeric field that formatNumber can't rebuild from their number
+	def __getDifferentTexts(self, field, values):
+		texts = {}
+
+		for row in xrange(len(values)):
+			value = values[row]
+
+			if(value != None and self.getText(row, field) != value):
+				texts[row] = value
+
+		return texts
+
+	# Returns the rows with a value for a field and the keys to sort them from the first to the last
+	# The numeric columns are read as numpy arrays without copying them, the text ones are sorted by their text
+	def __getSortKeys(self, field, ascending):
+		column = self.__columns[field]
+
+		if(not isinstance(column, array)):
+			rows = [row for row in xrange(self.__size) if column[row] != None]
+			keys = numpy.argsort(numpy.array([column[row] for row in rows], dtype=object), kind="mergesort").argsort()
+			rows = numpy.array(rows, dtype=numpy.int64)
+		else:
+			values = numpy.frombuffer(column, dtype=column.typecode)
+
+			if(field in self.__integerFields):
+				rows = numpy.flatnonzero(values != self.__missingInteger)
+			else:
+				rows = numpy.flatnonzero(~numpy.isnan(values))
+
+			keys = values[rows]
+
+		if(not ascending):
+			keys = -keys
+
+		return rows, keys
+
+	# Stores the values of a field in the most compact column possible
+	# If any of the values is not a number the whole field is stored as text
+	def __buildColumn(self, field, values):
+		if(field in self.__textFields):
+			return values
+
+		try:
+			if(field in self.__integerFields):
+				return array('l', [self.__missingInteger if value == None else int(value) for value in values])
+
+			return array('d', [float('nan') if value == None else float(value) for value in values])
+		except (ValueError, TypeError, OverflowError):
+			return values
+
+# Creates a store from the information returned by toData
+def fromData(data):
+	columns = {}
+
+	for field in data["fields"]:
+		typecode, values = data["columns"][field]
+
+		if(typecode == None):
+			columns[field] = values
+		else:
+			columns[field] = array(typecode)
+			columns[field].fromstring(values)
+
+	return TickerStore(columns=columns, index=data["index"], size=data["size"], fields=data["fields"], texts=data["texts"], convertedFields=data["convertedFields"])
+
+# This class is a single row of a TickerStore that can be used as the dicts returned by coinmarketcap
+class TickerRow(Mapping):
+	# __store is the store that has the values of the row
+	# __row is the position of the coin in the store
+	__store = None
+	__row = None
+
+	def __init__(self, store, row):
+		self.__store = store
+		self.__row = row
+
+		return
+
+	def __getitem__(self, field):
+		if(not self.__store.hasField(field)):
+			raise KeyError(field)
+
+		return self.__store.getText(self.__row, field)
+
+	def __iter__(self):
+		return iter(self.__store.getFields())
+
+	def __len__(self):
+		return len(self.__store.getFields())
+
+	def __repr__(self):
+		return repr(dict(self))
+
+	# Returns the value of a field using its type instead of the coinmarketcap string
+	def getValue(self, field):
+		return self.__store.getValue(self.__row, field)
+
+	# Returns the position of the coin in its store
+	def getRow(self):
+		return self.__row
+
+# Formats a number the same way coinmarketcap does, avoiding the scientific notation for small or big values
+def formatNumber(value):
+	if(isinstance(value, (int, long))):
+		return str(value)
+
+	text = repr(value)
+
+	if("e" in text):
+		text = ("%.10f" % value).rstrip("0")
+		if(text.endswith(".")):
+			text += "0"
+
+	return text
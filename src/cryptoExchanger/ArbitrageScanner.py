@@ -0,0 +1,241 @@
+# Threading is needed since the scanner is refreshed and read from different threads
+import threading
+
+# This class will be in charge of finding arbitrage opportunities between the markets of the exchangers
+# It keeps the last bid and ask of every market of every exchanger indexed by its normalized pair (base and quote currencies)
+# and only checks the opportunities that involve a market whose prices changed since the last update:
+# -Cross exchanger: buying a pair in one exchanger and selling it in another one
+# -Triangular: going from a currency to two others and back inside the same exchanger (like BTC -> LTC -> ETH -> BTC)
+# The triangles every market is part of are calculated only when the exchanger adds a new market, not on every scan
+# The prices of an exchanger are forgotten when it is removed, or when it didn't answer in the last maxAge refreshes
+# (because it was busy or it timed out), so the opportunities are never found with old prices
+class ArbitrageScanner(object):
+	# __threshold is the minimum profit (as a fraction, 0.01 is 1%) of an opportunity
+	# __prices is where we store, per pair, the bid and ask of every exchanger that has it
+	# __neighbours is where we store, per exchanger, the currencies every currency has a market with
+	# __triangles is where we store, per exchanger and pair, the triangles (sorted tuples of 3 currencies) the pair is part of
+	# __opportunities is where we store the opportunities found, by their key
+	# __maxAge is the amount of refreshes an exchanger can miss before its prices are forgotten
+	# __refreshCount is the amount of refreshes done, and __lastRefreshes is the last one every exchanger was updated in
+	# __scannerLock is the lock used to make sure only one thread at a time updates the scanner
+	# _debugLevel is the flag used to enable the printing messages for debugging
+	__threshold = None
+	__prices = None
+	__neighbours = None
+	__triangles = None
+	__opportunities = None
+	__maxAge = None
+	__refreshCount = None
+	__lastRefreshes = None
+	__scannerLock = None
+	_debugLevel = None
+
+	def __init__(self, threshold=0.01, maxAge=3, debuglevel=0):
+		self._debugLevel = debuglevel
+
+		self.__threshold = threshold
+		self.__prices = {}
+		self.__neighbours = {}
+		self.__triangles = {}
+		self.__opportunities = {}
+		self.__maxAge = maxAge
+		self.__refreshCount = 0
+		self.__lastRefreshes = {}
+		self.__scannerLock = threading.Lock()
+
+		return
+
+	def setThreshold(self, threshold):
+		self.__threshold = threshold
+
+	def getThreshold(self):
+		return self.__threshold
+
+	# Gets the summaries of every exchanger of the aggregator and updates the scanner with them
+	# The exchangers the aggregator doesn't have anymore, and the ones that didn't answer in the last refreshes, are removed
+	# Returns the opportunities found
+	def refresh(self, aggregator):
+		summaries = aggregator.getMarketSummaries()
+
+		with self.__scannerLock:
+			self.__refreshCount += 1
+
+		for name in summaries:
+			self.update(aggregator.getExchanger(name), summaries[name])
+
+		with self.__scannerLock:
+			expiredNames = [name for name in self.__lastRefreshes if aggregator.getExchanger(name) == None or self.__refreshCount - self.__lastRefreshes[name] >= self.__maxAge]
+
+		for name in expiredNames:
+			if (self._debugLevel >= 1): print "Arbitrage " + name + ": prices expired"
+			self.removeExchanger(name)
+
+		return self.getOpportunities()
+
+	# Updates the prices of an exchanger with its summaries (dicts with MarketName, Bid and Ask) and checks
+	# the opportunities of the markets whose prices changed, returns the amount of markets that changed
+	def update(self, exchanger, summaries):
+		name = exchanger.getName()
+		changedPairs = []
+
+		with self.__scannerLock:
+			self.__lastRefreshes[name] = self.__refreshCount
+
+			for summary in summaries:
+				if(summary.get("Bid") == None or summary.get("Ask") == None):
+					continue
+
+				pair = exchanger.normalizeMarket(summary["MarketName"])
+				venues = self.__prices.setdefault(pair, {})
+				prices = (summary["Bid"], summary["Ask"])
+
+				if(name not in venues):
+					self.__addMarket(name, pair)
+				elif(venues[name] == prices):
+					continue
+
+				venues[name] = prices
+				changedPairs.append(pair)
+
+			triangles = set()
+			for pair in changedPairs:
+				self.__checkCross(pair)
+				triangles.update(self.__triangles[name].get(pair, []))
+
+			for triangle in triangles:
+				self.__checkTriangle(name, triangle)
+
+		if (self._debugLevel >= 2): print "Arbitrage " + name + ": " + str(len(changedPairs)) + " markets changed, " + str(len(triangles)) + " triangles checked"
+		return len(changedPairs)
+
+	# Forgets the prices of an exchanger (by its name) and the opportunities they were part of
+	# Returns False if the scanner didn't have any price of it
+	def removeExchanger(self, name):
+		with self.__scannerLock:
+			if(self.__lastRefreshes.pop(name, None) == None and name not in self.__neighbours):
+				return False
+
+			for pair in self.__prices.keys():
+				venues = self.__prices[pair]
+
+				if(venues.pop(name, None) == None):
+					continue
+
+				if(len(venues) == 0):
+					del self.__prices[pair]
+					self.__opportunities.pop(("cross", pair), None)
+				else:
+					self.__checkCross(pair)
+
+			self.__neighbours.pop(name, None)
+			self.__triangles.pop(name, None)
+
+			for key in self.__opportunities.keys():
+				if(key[0] == "triangle" and key[1] == name):
+					del self.__opportunities[key]
+
+		return True
+
+	# Returns the opportunities found, sorted from the highest profit
+	# Every opportunity is a dict with its "type" ("cross" or "triangle"), its "profit" and how to do it:
+	# -Cross: the "pair", the exchanger and price to "buy" and the exchanger and price to "sell"
+	# -Triangle: the "exchanger" and the "path" of currencies
+	def getOpportunities(self):
+		with self.__scannerLock:
+			opportunities = self.__opportunities.values()
+
+		return sorted(opportunities, key=lambda opportunity: opportunity["profit"], reverse=True)
+
+	# Returns the best bid and the best ask of a market (like BTC-LTC) between the exchangers, with the prices of the last update
+	# It has the same format as ExchangerAggregator.getBestPrices, an invalid market (see isValidMarket) is a market nobody has
+	def getBestPrices(self, market):
+		venues = {}
+
+		if(isValidMarket(market)):
+			with self.__scannerLock:
+				venues = dict(self.__prices.get(tuple(market.upper().split("-")), {}))
+
+		tickers = dict((name, {"Bid": venues[name][0], "Ask": venues[name][1]}) for name in venues)
+		bestBid = max((venues[name][0], name) for name in venues) if len(venues) > 0 else None
+		bestAsk = min((venues[name][1], name) for name in venues) if len(venues) > 0 else None
+
+		return {"bid": bestBid, "ask": bestAsk, "tickers": tickers}
+
+	# Adds a market of an exchanger to its graph of currencies, and the triangles it closes to the precalculated ones
+	def __addMarket(self, name, pair):
+		neighbours = self.__neighbours.setdefault(name, {})
+		triangles = self.__triangles.setdefault(name, {})
+		first, second = pair
+
+		for third in neighbours.get(first, set()) & neighbours.get(second, set()):
+			triangle = tuple(sorted((first, second, third)))
+
+			for trianglePair in [pair, self.__getPair(name, first, third), self.__getPair(name, second, third)]:
+				triangles.setdefault(trianglePair, []).append(triangle)
+
+		neighbours.setdefault(first, set()).add(second)
+		neighbours.setdefault(second, set()).add(first)
+
+		return
+
+	# Returns the pair an exchanger has between two currencies
+	def __getPair(self, name, first, second):
+		if(name in self.__prices.get((first, second), {})):
+			return (first, second)
+
+		return (second, first)
+
+	# Checks the best bid and ask of a pair between all the exchangers
+	def __checkCross(self, pair):
+		venues = self.__prices[pair]
+		key = ("cross", pair)
+		self.__opportunities.pop(key, None)
+
+		if(len(venues) < 2):
+			return
+
+		bestBid = max((venues[name][0], name) for name in venues)
+		bestAsk = min((venues[name][1], name) for name in venues)
+
+		if(bestAsk[0] <= 0 or bestBid[1] == bestAsk[1]):
+			return
+
+		profit = bestBid[0] / bestAsk[0] - 1
+		if(profit > self.__threshold):
+			self.__opportunities[key] = {"type": "cross", "pair": pair[0] + "-" + pair[1], "buy": (bestAsk[1], bestAsk[0]), "sell": (bestBid[1], bestBid[0]), "profit": profit}
+
+		return
+
+	# Checks the two directions of a triangle of currencies in an exchanger
+	def __checkTriangle(self, name, triangle):
+		first, second, third = triangle
+
+		for path in [(first, second, third, first), (first, third, second, first)]:
+			key = ("triangle", name, path)
+			self.__opportunities.pop(key, None)
+
+			amount = 1.0
+			for position in range(3):
+				amount *= self.__getRate(name, path[position], path[position + 1])
+
+			profit = amount - 1
+			if(profit > self.__threshold):
+				self.__opportunities[key] = {"type": "triangle", "exchanger": name, "path": list(path), "profit": profit}
+
+		return
+
+	# Returns the amount of a currency we get for each unit of another one in an exchanger
+	# In a market with base B and quote Q we buy Q with B at the ask and we sell Q for B at the bid
+	def __getRate(self, name, source, destination):
+		if(name in self.__prices.get((source, destination), {})):
+			bid, ask = self.__prices[(source, destination)][name]
+			return 1.0 / ask if ask > 0 else 0.0
+
+		bid, ask = self.__prices[(destination, source)][name]
+		return bid
+
+# Returns if a market has the format the exchangers use for it: a base and a quote currency separated by a dash (like BTC-LTC)
+def isValidMarket(market):
+	currencies = market.split("-")
+
+	return len(currencies) == 2 and currencies[0].isalnum() and currencies[1].isalnum()
@@ -1,38 +1,128 @@
+import threading
+import time
 from Exchanger import Exchanger
+from MarketCatalog import MarketCatalog
+from CurrencyCatalog import CurrencyCatalog
 from bittrex.bittrex import Bittrex, API_V1_1, BUY_ORDERBOOK, SELL_ORDERBOOK 
 
+# In bulk mode the summaries of all the markets are downloaded at once every summariesInterval seconds
+# and the tickers and summaries of the markets are taken from them, instead of doing one request per market
+# The active markets and currencies are kept in catalogs, updated only when the lists given by bittrex change
 class BittrexExchanger(Exchanger):
+	# __summariesInterval is the amount of seconds the summaries are used in bulk mode, 0 means bulk mode is disabled
+	# __summaries is the list of summaries of all the markets we got the last time
+	# __summariesIndex is where we store the summary of every market by its name
+	# __summariesTime is the time we got the summaries
+	# __summariesLock is the lock used to make sure only one thread at a time downloads the summaries
+	# __marketCatalog and __currencyCatalog are the catalogs of the active markets and currencies
+	# __catalogSources are the last lists of markets and currencies used to update the catalogs
 	__bittrex = None
-
-	def __init__(self, key, secret):
+	__summariesInterval = None
+	__summaries = None
+	__summariesIndex = None
+	__summariesTime = None
+	__summariesLock = None
+	__marketCatalog = None
+	__currencyCatalog = None
+	__catalogSources = None
+
+	def __init__(self, key, secret, transport=None, summariesInterval=0):
 		self.__apiKey = key
 		self.__apiSecret = secret
 		self.__apiVersion = API_V1_1
 
-		self.__bittrex = Bittrex(self.__apiKey, self.__apiSecret, api_version=self.__apiVersion)
+		if(transport == None):
+			transport = self.getTransport()
 
-	def __getMarketsList(self):
-		data = self.__bittrex.get_markets()
-		result = []
+		self.__bittrex = Bittrex(self.__apiKey, self.__apiSecret, dispatch=transport.dispatch, api_version=self.__apiVersion)
 
-		for market in data["result"]:
-			if(market["MarketName"] not in result and market["IsActive"]):
-				result.append(market["MarketName"])
+		self.__summariesInterval = summariesInterval
+		self.__summaries = None
+		self.__summariesIndex = {}
+		self.__summariesTime = 0
+		self.__summariesLock = threading.Lock()
 
-		return result
+		self.__marketCatalog = MarketCatalog()
+		self.__currencyCatalog = CurrencyCatalog()
+		self.__catalogSources = {"markets": None, "currencies": None}
 
-	def __getCurrenciesList(self):
-		data = self.__bittrex.get_currencies()
+	# Function to enable the bulk mode (or disable it with 0)
+	def setSummariesInterval(self, interval):
+		self.__summariesInterval = interval
+
+	def getSummariesInterval(self):
+		return self.__summariesInterval
+
+	# Returns the summaries of all the markets, downloading them again if they are older than the interval
+	# If the download fails the old ones are kept until the next interval
+	def __getBulkSummaries(self):
+		with self.__summariesLock:
+			if(time.time() - self.__summariesTime >= self.__summariesInterval):
+				data = self.__bittrex.get_market_summaries()
+
+				if(data["result"] != None):
+					self.__summaries = data["result"]
+					self.__summariesIndex = dict((summary["MarketName"].upper(), summary) for summary in data["result"])
+
+				self.__summariesTime = time.time()
+
+			return self.__summaries
+
+	# Returns the summary of a market in bulk mode, or None if bulk mode is disabled or the market isn't in the summaries
+	def __getIndexedSummary(self, market):
+		if(self.__summariesInterval <= 0):
+			return None
+
+		self.__getBulkSummaries()
+		return self.__summariesIndex.get(market.upper())
+
+	# Returns the catalog of the active markets, updating it if bittrex gave a different list of markets
+	# The list comes from getMarkets, so while it is cached the catalog is not even compared with it
+	def getMarketCatalog(self):
+		markets = self.getMarkets()
+
+		if(markets != None and markets is not self.__catalogSources["markets"]):
+			self.__marketCatalog.update(markets)
+			self.__catalogSources["markets"] = markets
+
+		return self.__marketCatalog
 
-		result = []
+	# Returns the catalog of the active currencies, updating it if bittrex gave a different list of currencies
+	def getCurrencyCatalog(self):
+		currencies = self.getCurrencies()
 
-		for currency in data["result"]:
-			if(currency["Currency"] not in result and currency["IsActive"]):
-				result.append(currency["Currency"])
+		if(currencies != None and currencies is not self.__catalogSources["currencies"]):
+			self.__currencyCatalog.update(currencies)
+			self.__catalogSources["currencies"] = currencies
 
-		return result
+		return self.__currencyCatalog
+
+	def isActiveMarket(self, market):
+		return self.getMarketCatalog().isActive(market)
+
+	def isActiveCurrency(self, currency):
+		return self.getCurrencyCatalog().isActive(currency)
+
+	# Returns the active markets with the base currency given (like BTC in BTC-LTC)
+	def getMarketsByBase(self, currency):
+		return self.getMarketCatalog().getByBase(currency)
+
+	# Returns the active markets with the quote currency given (like LTC in BTC-LTC)
+	def getMarketsByQuote(self, currency):
+		return self.getMarketCatalog().getByQuote(currency)
+
+	def __getMarketsList(self):
+		return self.getMarketCatalog().getNames()
+
+	def __getCurrenciesList(self):
+		return self.getCurrencyCatalog().getNames()
 
 	def __getLastPrice(self, market):
+		summary = self.__getIndexedSummary(market)
+
+		if(summary != None):
+			return summary["Last"]
+
 		data = self.__bittrex.get_ticker(market)
 		result = data["result"]
 		return result["Last"]
@@ -46,6 +136,11 @@ class BittrexExchanger(Exchanger):
 		return data["result"]
 
 	def getTicker(self, market):
+		summary = self.__getIndexedSummary(market)
+
+		if(summary != None):
+			return {"Bid": summary["Bid"], "Ask": summary["Ask"], "Last": summary["Last"]}
+
 		data = self.__bittrex.get_ticker(market)
 		return data["result"]
 
@@ -62,10 +157,18 @@ class BittrexExchanger(Exchanger):
 		return data["result"]
 
 	def getMarketSummaries(self):
+		if(self.__summariesInterval > 0):
+			return self.__getBulkSummaries()
+
 		data = self.__bittrex.get_market_summaries()
 		return data["result"]
 
 	def getMarketSummary(self, market):
+		summary = self.__getIndexedSummary(market)
+
+		if(summary != None):
+			return [summary]
+
 		data = self.__bittrex.get_market_summary(market)
 		return data["result"]
 
@@ -0,0 +1,139 @@
+# Threading is needed since the trades are added by the poller and the candles are read by the bot from different threads
+import threading
+# Calendar and datetime are needed to convert the times of the trades to timestamps
+import calendar
+import datetime
+# Deque is used to remember the order of the ids of the trades we have seen, to forget the oldest ones
+from collections import deque
+
+# This class will be in charge of building the OHLCV candles of a market from its trades
+# Every trade is added only once (the ids of the last trades are kept to know which ones we already have)
+# and it only updates the candle it belongs to, so the work of every poll is proportional to the new trades
+# The candles of every interval are kept in a ring buffer of a fixed size, so the memory used doesn't grow
+class CandleBuilder(object):
+	# __market is the name of the market of the candles
+	# __series is where we store the ring buffer of candles of every interval, by its name (like "1m")
+	# __seenIds is the set of ids of the trades we already added
+	# __seenOrder is the order the ids were added, to forget the oldest ones when there are more than __maxSeen
+	# __maxSeen is the maximum amount of ids of trades we remember
+	# __builderLock is the lock used to make sure nobody reads the candles while they are being updated
+	__market = None
+	__series = None
+	__seenIds = None
+	__seenOrder = None
+	__maxSeen = None
+	__builderLock = None
+
+	def __init__(self, market, intervals=None, size=500, maxSeen=5000):
+		if(intervals == None):
+			intervals = {"1m": 60, "5m": 300, "1h": 3600}
+
+		self.__market = market
+		self.__series = dict((name, _CandleSeries(intervals[name], size)) for name in intervals)
+		self.__seenIds = set()
+		self.__seenOrder = deque()
+		self.__maxSeen = maxSeen
+		self.__builderLock = threading.Lock()
+
+		return
+
+	def getMarket(self):
+		return self.__market
+
+	def getIntervals(self):
+		return self.__series.keys()
+
+	# Adds the trades given (in the format of the market history of bittrex) to the candles, ignoring the ones already added
+	# Returns the amount of new trades
+	def addTrades(self, trades):
+		with self.__builderLock:
+			newTrades = []
+
+			for trade in trades:
+				if(trade["Id"] in self.__seenIds):
+					continue
+
+				self.__rememberId(trade["Id"])
+				newTrades.append((_toTimestamp(trade["TimeStamp"]), trade["Id"], trade["Price"], trade["Quantity"]))
+
+			newTrades.sort()
+
+			for timestamp, tradeId, price, quantity in newTrades:
+				for series in self.__series.values():
+					series.addTrade(timestamp, price, quantity)
+
+		return len(newTrades)
+
+	# Returns the last candles of an interval, from the oldest to the newest
+	# Every candle is a dict with its start timestamp, open, high, low, close and volume
+	def getCandles(self, interval, count=None):
+		with self.__builderLock:
+			return self.__series[interval].getCandles(count)
+
+	def __rememberId(self, tradeId):
+		self.__seenIds.add(tradeId)
+		self.__seenOrder.append(tradeId)
+
+		if(len(self.__seenOrder) > self.__maxSeen):
+			self.__seenIds.discard(self.__seenOrder.popleft())
+
+		return
+
+# The candles of an interval, kept in a ring buffer where the position of every candle is its start divided by the interval
+# Every candle is a list with its start, open, high, low, close, volume and the times of its first and last trades
+class _CandleSeries(object):
+	def __init__(self, interval, size):
+		self.__interval = interval
+		self.__size = size
+		self.__candles = [None] * size
+		self.__lastStart = None
+
+	def addTrade(self, timestamp, price, quantity):
+		start = int(timestamp // self.__interval) * self.__interval
+		position = (start // self.__interval) % self.__size
+		candle = self.__candles[position]
+
+		if(self.__lastStart != None and start <= self.__lastStart - self.__size * self.__interval):
+			return
+
+		if(candle == None or candle[0] != start):
+			self.__candles[position] = [start, price, price, price, price, quantity, timestamp, timestamp]
+			self.__lastStart = start if self.__lastStart == None else max(self.__lastStart, start)
+			return
+
+		candle[2] = max(candle[2], price)
+		candle[3] = min(candle[3], price)
+		candle[5] += quantity
+
+		if(timestamp < candle[6]):
+			candle[1] = price
+			candle[6] = timestamp
+
+		if(timestamp >= candle[7]):
+			candle[4] = price
+			candle[7] = timestamp
+
+	def getCandles(self, count=None):
+		if(self.__lastStart == None):
+			return []
+
+		count = self.__size if count == None else min(count, self.__size)
+		candles = []
+
+		for start in xrange(self.__lastStart - (count - 1) * self.__interval, self.__lastStart + 1, self.__interval):
+			candle = self.__candles[(start // self.__interval) % self.__size]
+
+			if(candle != None and candle[0] == start):
+				candles.append({"start": start, "open": candle[1], "high": candle[2], "low": candle[3], "close": candle[4], "volume": candle[5]})
+
+		return candles
+
+# Converts the time of a trade of bittrex (like 2014-07-09T03:21:20.08, in UTC) to a timestamp
+def _toTimestamp(moment):
+	if("." in moment):
+		moment, fraction = moment.split(".")
+		fraction = float("0." + fraction)
+	else:
+		fraction = 0.0
+
+	return calendar.timegm(datetime.datetime.strptime(moment, "%Y-%m-%dT%H:%M:%S").timetuple()) + fraction
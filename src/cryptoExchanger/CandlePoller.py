@@ -0,0 +1,116 @@
+# Threading is needed since the history is polled in the background
+import threading
+from CandleBuilder import CandleBuilder
+
+# This class will be in charge of polling the market history of some markets of an exchanger
+# and adding the new trades to the candles of every market
+class CandlePoller(threading.Thread):
+	# __exchanger is the exchanger we get the market history from
+	# __builders is where we store the candle builder of every market
+	# __buildersLock is the lock used to add and remove markets while the poller is running
+	# __pollInterval is the amount of seconds between each poll
+	# __stopEvent is the event used to wake up the thread and let it know it should stop
+	# _debugLevel is the flag used to enable the printing messages for debugging
+	__exchanger = None
+	__builders = None
+	__buildersLock = None
+	__pollInterval = None
+	__stopEvent = None
+	_debugLevel = None
+
+	def __init__(self, exchanger, markets=[], pollInterval=10, debuglevel=0):
+		super(CandlePoller, self).__init__(name="CandlePoller")
+		self.daemon = True
+		self._debugLevel = debuglevel
+
+		self.__exchanger = exchanger
+		self.__builders = {}
+		self.__buildersLock = threading.Lock()
+		self.__pollInterval = pollInterval
+		self.__stopEvent = threading.Event()
+
+		for market in markets:
+			self.addMarket(market)
+
+		return
+
+	# Starts building the candles of a market, the builder can be given to use other intervals or sizes
+	def addMarket(self, market, builder=None):
+		with self.__buildersLock:
+			if(market not in self.__builders):
+				self.__builders[market] = builder if builder != None else CandleBuilder(market)
+
+		return
+
+	def removeMarket(self, market):
+		with self.__buildersLock:
+			self.__builders.pop(market, None)
+
+		return
+
+	# Returns the candle builder of a market, None if we are not polling it
+	def getBuilder(self, market):
+		return self.__builders.get(market)
+
+	# Returns the last candles of an interval of a market, None if we are not polling it
+	def getCandles(self, market, interval, count=None):
+		builder = self.getBuilder(market)
+
+		if(builder == None):
+			return None
+
+		return builder.getCandles(interval, count)
+
+	# Gets the market history of every market once and adds the new trades, returns the amount of new trades
+	def poll(self):
+		with self.__buildersLock:
+			builders = self.__builders.items()
+
+		newTrades = 0
+		for market, builder in builders:
+			newTrades += self.__pollBuilder(market, builder) or 0
+
+		if (self._debugLevel >= 2): print "New trades: " + str(newTrades)
+		return newTrades
+
+	# Gets the market history of a single market and adds the new trades, returns the amount of new trades
+	# Returns None if we are not polling the market or its history couldn't be downloaded
+	def pollMarket(self, market):
+		builder = self.getBuilder(market)
+
+		if(builder == None):
+			return None
+
+		return self.__pollBuilder(market, builder)
+
+	def run(self):
+		if (self._debugLevel >= 1): print "Candle Poller started"
+
+		while(not self.__stopEvent.is_set()):
+			try:
+				self.poll()
+			except Exception as error:
+				if (self._debugLevel >= 1): print "Error polling the market history: " + str(error)
+
+			self.__stopEvent.wait(self.__pollInterval)
+
+		if (self._debugLevel >= 1): print "Candle Poller stopped"
+		return
+
+	def __pollBuilder(self, market, builder):
+		trades = self.__exchanger.getMarketHistory(market)
+
+		if(trades == None):
+			if (self._debugLevel >= 1): print "Error getting the market history of " + market
+			return None
+
+		return builder.addTrades(trades)
+
+	# Function to make the poller stop, it will finish the poll it is doing before stopping
+	def stop(self):
+		self.__stopEvent.set()
+		return
+
+	# Returns if the poller is still running
+	def isRunning(self):
+		return self.is_alive() and not self.__stopEvent.is_set()
@@ -0,0 +1,56 @@
+# Threading is needed since the catalog can be updated and read from several threads at the same time
+import threading
+# OrderedDict is used to keep the currencies in the order the exchanger gives them
+from collections import OrderedDict
+
+# This class will be in charge of keeping the active currencies of an exchanger
+# The currencies are kept in an OrderedDict, so checking if a currency is active doesn't need to go through the list
+# When the list of currencies of the exchanger changes only the currencies added or removed are updated
+class CurrencyCatalog(object):
+	# __currencies is where we store the active currencies, from their name to their full information
+	# __catalogLock is the lock used to make sure only one thread at a time changes the catalog
+	__currencies = None
+	__catalogLock = None
+
+	def __init__(self, currencies=[]):
+		self.__currencies = OrderedDict()
+		self.__catalogLock = threading.Lock()
+
+		self.update(currencies)
+		return
+
+	# Updates the catalog with the list of currencies given by the exchanger (dicts with Currency and IsActive)
+	# Returns the lists of the names of the currencies added and removed
+	def update(self, currencies):
+		activeCurrencies = OrderedDict()
+
+		for currency in currencies:
+			if(currency["IsActive"]):
+				activeCurrencies[currency["Currency"]] = currency
+
+		with self.__catalogLock:
+			removed = [name for name in self.__currencies if name not in activeCurrencies]
+			added = [name for name in activeCurrencies if name not in self.__currencies]
+
+			for name in removed:
+				del self.__currencies[name]
+
+			for name in activeCurrencies:
+				self.__currencies[name] = activeCurrencies[name]
+
+		return added, removed
+
+	# Returns if the currency is active
+	def isActive(self, currency):
+		return currency in self.__currencies
+
+	# Returns the names of the active currencies
+	def getNames(self):
+		return self.__currencies.keys()
+
+	# Returns the information the exchanger gave of a currency, None if it isn't active
+	def getCurrency(self, currency):
+		return self.__currencies.get(currency)
+
+	def __len__(self):
+		return len(self.__currencies)
@@ -1,14 +1,140 @@
 from abc import ABCMeta, abstractmethod
+import functools
+import threading
+from HttpTransport import HttpTransport
+from TtlCache import TtlCache
+
+# Metaclass of the exchangers, it puts a cache in front of the public endpoints of every exchanger
+# The endpoints cached are the ones in the _cacheTtls of the class, so any new exchanger gets the cache without doing anything
+class CachedExchangerType(ABCMeta):
+	def __init__(cls, name, bases, attributes):
+		super(CachedExchangerType, cls).__init__(name, bases, attributes)
+
+		for endpoint in cls._cacheTtls:
+			function = attributes.get(endpoint)
+
+			if(function == None or getattr(function, "__isabstractmethod__", False)):
+				continue
+
+			setattr(cls, endpoint, _cachedEndpoint(endpoint, function))
+
+		return
+
+# Returns the function given with the cache of the endpoint in front of it
+# The values are cached by the arguments (like the market), the answers that failed (None) are never cached
+def _cachedEndpoint(endpoint, function):
+	@functools.wraps(function)
+	def cachedFunction(self, *args, **kwargs):
+		cache = self.getCache(endpoint)
+		key = (args, tuple(sorted(kwargs.items())))
+
+		found, value = cache.get(key)
+		if(found):
+			return value
+
+		value = function(self, *args, **kwargs)
+
+		if(value != None):
+			cache.put(key, value)
+
+		return value
+
+	return cachedFunction
 
 # Class definition of exchanger objects that will be used by the bot
 # It will be class that all the wrappers for exchangers need to use
 # All of them should return the same information
 # Right now the only wrapper that will be created will be Bittrex
+# All the exchangers share the same http transport, so they share the pool of connections
+# The public endpoints are cached, every exchanger has its own caches (the values are shared, they shouldn't be modified)
 class Exchanger(object):
-	__metaclass__ = ABCMeta
+	__metaclass__ = CachedExchangerType
 	__apiKey = None
 	__apiSecret = None
 	__apiVersion = None
+	__transport = None
+	__transportLock = threading.Lock()
+	__caches = None
+	__cachesLock = threading.Lock()
+
+	# _cacheTtls are the seconds the answers of every endpoint are valid, 0 means they are not cached
+	# _cacheSize is the maximum amount of answers (different arguments, like markets) cached per endpoint
+	_cacheTtls = {
+		"getMarkets": 3600,
+		"getCurrencies": 3600,
+		"getMarketSummaries": 30,
+		"getMarketSummary": 30,
+		"getTicker": 10,
+		"getMarketHistory": 10,
+		"getBothOrderBook": 5,
+		"getBuyOrderBook": 5,
+		"getSellOrderBook": 5
+	}
+	_cacheSize = 512
+
+	# Returns the http transport shared by all the exchangers, creating it the first time
+	@staticmethod
+	def getTransport():
+		with Exchanger.__transportLock:
+			if(Exchanger.__transport == None):
+				Exchanger.__transport = HttpTransport()
+
+			return Exchanger.__transport
+
+	# Function to change the http transport shared by all the exchangers (to change the pool size or the timeouts)
+	# It only affects the exchangers created after the change
+	@staticmethod
+	def setTransport(transport):
+		with Exchanger.__transportLock:
+			Exchanger.__transport = transport
+
+		return
+
+	# Returns the cache of an endpoint of this exchanger, creating it the first time
+	def getCache(self, endpoint):
+		with Exchanger.__cachesLock:
+			if(self.__caches == None):
+				self.__caches = {}
+
+			cache = self.__caches.get(endpoint)
+			if(cache == None):
+				cache = TtlCache(self._cacheTtls.get(endpoint, 0), self._cacheSize)
+				self.__caches[endpoint] = cache
+
+			return cache
+
+	# Function to change the seconds the answers of an endpoint are valid, 0 stops caching it
+	def setCacheTtl(self, endpoint, ttl):
+		cache = self.getCache(endpoint)
+		cache.setTtl(ttl)
+
+		if(ttl <= 0):
+			cache.clear()
+
+		return
+
+	# Throws away the cached answers of an endpoint, or of all of them if no endpoint is given
+	def clearCache(self, endpoint=None):
+		endpoints = self._cacheTtls.keys() if endpoint == None else [endpoint]
+
+		for endpoint in endpoints:
+			self.getCache(endpoint).clear()
+
+		return
+
+	# Returns the hits, misses and size of the cache of every endpoint
+	def getCacheStats(self):
+		return dict((endpoint, self.getCache(endpoint).getStats()) for endpoint in self._cacheTtls)
+
+	# Returns the name of the exchanger, by default the name of its class without "Exchanger" (like Bittrex)
+	def getName(self):
+		return self.__class__.__name__.replace("Exchanger", "")
+
+	# Returns the base and quote currencies of the name of a market of the exchanger (like ("BTC", "LTC") for BTC-LTC)
+	# The exchangers that name their markets in other way need to change it, so the markets of all of them can be compared
+	def normalizeMarket(self, market):
+		base, quote = market.upper().split("-", 1)
+		return base, quote
 
 	@abstractmethod
 	def getMarkets(self):
@@ -0,0 +1,135 @@
+# Threading is needed since the exchangers can be added and removed while they are being queried
+import threading
+# Time is needed to know how long we have been waiting for the exchangers
+import time
+# The thread pool is used to query all the exchangers at the same time
+from multiprocessing.pool import ThreadPool
+
+# This class will be in charge of querying all the exchangers at the same time
+# Every query waits at most timeout seconds, the exchangers that didn't answer in time are left out of the results,
+# so a slow exchanger doesn't make us wait more than the timeout for the rest of them
+# An exchanger whose last query didn't finish yet is not queried again until it finishes, so a stuck exchanger
+# doesn't end up using all the threads of the pool
+class ExchangerAggregator(object):
+	# __exchangers is where we store the exchangers by their name
+	# __pendingQueries is where we store the query of every exchanger that didn't finish yet
+	# __timeout is the maximum amount of seconds we wait for the exchangers
+	# __pool is the pool of threads used to query the exchangers
+	# __aggregatorLock is the lock used to change the exchangers and the pending queries
+	# _debugLevel is the flag used to enable the printing messages for debugging
+	__exchangers = None
+	__pendingQueries = None
+	__timeout = None
+	__pool = None
+	__aggregatorLock = None
+	_debugLevel = None
+
+	def __init__(self, exchangers=[], timeout=5, maxWorkers=8, debuglevel=0):
+		self._debugLevel = debuglevel
+
+		self.__exchangers = {}
+		self.__pendingQueries = {}
+		self.__timeout = timeout
+		self.__pool = ThreadPool(maxWorkers)
+		self.__aggregatorLock = threading.Lock()
+
+		for exchanger in exchangers:
+			self.addExchanger(exchanger)
+
+		return
+
+	# Adds an exchanger, returns False if there was already an exchanger with the same name
+	def addExchanger(self, exchanger):
+		with self.__aggregatorLock:
+			if(exchanger.getName() in self.__exchangers):
+				return False
+
+			self.__exchangers[exchanger.getName()] = exchanger
+
+		return True
+
+	# Removes an exchanger (or the exchanger with the name given), returns False if we didn't have it
+	def removeExchanger(self, exchanger):
+		name = exchanger if isinstance(exchanger, basestring) else exchanger.getName()
+
+		with self.__aggregatorLock:
+			if(name not in self.__exchangers):
+				return False
+
+			del self.__exchangers[name]
+
+		return True
+
+	def getExchanger(self, name):
+		return self.__exchangers.get(name)
+
+	def getExchangers(self):
+		return self.__exchangers.values()
+
+	def setTimeout(self, timeout):
+		self.__timeout = timeout
+
+	def getTimeout(self):
+		return self.__timeout
+
+	# Calls the function with the name and arguments given in every exchanger at the same time
+	# Returns a dict with the answer of every exchanger that answered in time and a dict with the reason of the ones that didn't
+	def query(self, functionName, *args):
+		queries = {}
+		failures = {}
+
+		with self.__aggregatorLock:
+			for name in self.__exchangers:
+				if(name in self.__pendingQueries and not self.__pendingQueries[name].ready()):
+					failures[name] = "busy"
+					continue
+
+				function = getattr(self.__exchangers[name], functionName)
+				queries[name] = self.__pool.apply_async(function, args)
+				self.__pendingQueries[name] = queries[name]
+
+		results = {}
+		endTime = time.time() + self.__timeout
+
+		for name in queries:
+			try:
+				results[name] = queries[name].get(max(0, endTime - time.time()))
+			except Exception as error:
+				failures[name] = "timeout" if queries[name].ready() == False else str(error)
+
+		if (self._debugLevel >= 1 and len(failures) > 0): print "Exchangers without answer for " + functionName + ": " + str(failures)
+		return results, failures
+
+	# Returns the tickers of a market in every exchanger that answered
+	def getTickers(self, market):
+		results, failures = self.query("getTicker", market)
+		return dict((name, results[name]) for name in results if results[name] != None)
+
+	# Returns the summaries of all the markets of every exchanger that answered
+	def getMarketSummaries(self):
+		results, failures = self.query("getMarketSummaries")
+		return dict((name, results[name]) for name in results if results[name] != None)
+
+	# Returns the best bid and the best ask of a market between all the exchangers that answered
+	# as a dict with "bid" and "ask" (tuples with the price and the name of the exchanger, or None) and the "tickers" used
+	def getBestPrices(self, market):
+		tickers = self.getTickers(market)
+		bestBid = None
+		bestAsk = None
+
+		for name in tickers:
+			bid = tickers[name].get("Bid")
+			ask = tickers[name].get("Ask")
+
+			if(bid != None and (bestBid == None or bid > bestBid[0])):
+				bestBid = (bid, name)
+
+			if(ask != None and (bestAsk == None or ask < bestAsk[0])):
+				bestAsk = (ask, name)
+
+		return {"bid": bestBid, "ask": bestAsk, "tickers": tickers}
+
+	# Stops the threads used to query the exchangers
+	def close(self):
+		self.__pool.terminate()
+		return
@@ -0,0 +1,82 @@
+# Threading is needed since the exchangers can be used from several threads at the same time
+import threading
+# Urlparse is used to know the endpoint of every request, so we can use its own timeout
+from urlparse import urlparse
+# Requests is used for the http connections, its sessions keep the connections alive between requests
+import requests
+from requests.adapters import HTTPAdapter
+
+# This class will be in charge of the http connections of the exchangers
+# All the requests go through the same session, so the connections to the exchangers are kept alive
+# and reused between requests instead of opening a new connection (and doing the TLS handshake) every time
+# -The amount of connections kept per host is configurable with poolSize
+# -Every endpoint can have its own timeout, the rest use the default one
+# -The responses are asked compressed with gzip
+class HttpTransport(object):
+	# __session is the requests session that keeps the pool of connections
+	# __timeout is the timeout in seconds used for the endpoints without their own timeout
+	# __endpointTimeouts is where we store the timeout of every endpoint, by the last part of its path (like "getmarkets")
+	# __requestsCount is the amount of requests done
+	# __countLock is the lock used to count the requests from several threads
+	# _debugLevel is the flag used to enable the printing messages for debugging
+	__session = None
+	__timeout = None
+	__endpointTimeouts = None
+	__requestsCount = None
+	__countLock = None
+	_debugLevel = None
+
+	def __init__(self, poolSize=10, timeout=10, endpointTimeouts={}, debuglevel=0):
+		self._debugLevel = debuglevel
+
+		self.__timeout = timeout
+		self.__endpointTimeouts = {}
+		self.__requestsCount = 0
+		self.__countLock = threading.Lock()
+
+		for endpoint in endpointTimeouts:
+			self.setTimeout(endpoint, endpointTimeouts[endpoint])
+
+		adapter = HTTPAdapter(pool_connections=poolSize, pool_maxsize=poolSize)
+
+		self.__session = requests.Session()
+		self.__session.mount("http://", adapter)
+		self.__session.mount("https://", adapter)
+		self.__session.headers.update({"Accept-Encoding": "gzip", "Connection": "keep-alive"})
+
+		return
+
+	# Function to change the timeout of an endpoint
+	def setTimeout(self, endpoint, timeout):
+		self.__endpointTimeouts[endpoint.lower()] = timeout
+		return
+
+	# Returns the timeout used for the url given
+	def getTimeout(self, url):
+		endpoint = urlparse(url).path.rstrip("/").rsplit("/", 1)[-1].lower()
+		return self.__endpointTimeouts.get(endpoint, self.__timeout)
+
+	# Returns the amount of requests done
+	def getRequestsCount(self):
+		return self.__requestsCount
+
+	# Does a GET request to the url given and returns the json of the answer
+	def get(self, url, headers=None):
+		timeout = self.getTimeout(url)
+
+		if (self._debugLevel >= 2): print "GET " + url + " (timeout " + str(timeout) + ")"
+
+		with self.__countLock:
+			self.__requestsCount += 1
+
+		response = self.__session.get(url, headers=headers, timeout=timeout)
+		return response.json()
+
+	# Function with the same signature as the dispatch function of the bittrex library, so it can be used by it
+	def dispatch(self, requestUrl, apisign):
+		return self.get(requestUrl, headers={"apisign": apisign})
+
+	# Closes all the connections of the pool
+	def close(self):
+		self.__session.close()
+		return
@@ -0,0 +1,92 @@
+# Threading is needed since the catalog can be updated and read from several threads at the same time
+import threading
+# OrderedDict is used to keep the markets in the order the exchanger gives them
+from collections import OrderedDict
+
+# This class will be in charge of keeping the active markets of an exchanger
+# The markets are kept in an OrderedDict, so checking if a market is active doesn't need to go through the list,
+# and they are also indexed by their base currency (BTC in BTC-LTC) and their quote currency (LTC in BTC-LTC)
+# When the list of markets of the exchanger changes only the markets added or removed are updated
+class MarketCatalog(object):
+	# __markets is where we store the active markets, from their name to a tuple with their base and quote currencies
+	# __byBase is where we store the names of the markets of every base currency
+	# __byQuote is where we store the names of the markets of every quote currency
+	# __catalogLock is the lock used to make sure only one thread at a time changes the catalog
+	__markets = None
+	__byBase = None
+	__byQuote = None
+	__catalogLock = None
+
+	def __init__(self, markets=[]):
+		self.__markets = OrderedDict()
+		self.__byBase = {}
+		self.__byQuote = {}
+		self.__catalogLock = threading.Lock()
+
+		self.update(markets)
+		return
+
+	# Updates the catalog with the list of markets given by the exchanger (dicts with MarketName, BaseCurrency, MarketCurrency and IsActive)
+	# Returns the lists of the names of the markets added and removed
+	def update(self, markets):
+		activeMarkets = OrderedDict()
+
+		for market in markets:
+			if(market["IsActive"]):
+				activeMarkets[market["MarketName"]] = (market["BaseCurrency"], market["MarketCurrency"])
+
+		with self.__catalogLock:
+			removed = [name for name in self.__markets if name not in activeMarkets]
+			added = [name for name in activeMarkets if activeMarkets[name] != self.__markets.get(name)]
+
+			for name in removed:
+				self.__removeMarket(name)
+
+			for name in added:
+				if(name in self.__markets):
+					self.__removeMarket(name)
+
+				self.__addMarket(name, activeMarkets[name])
+
+		return added, removed
+
+	# Returns if the market is active
+	def isActive(self, market):
+		return market in self.__markets
+
+	# Returns the names of the active markets
+	def getNames(self):
+		return self.__markets.keys()
+
+	# Returns the names of the active markets with the base currency given
+	def getByBase(self, currency):
+		return list(self.__byBase.get(currency, []))
+
+	# Returns the names of the active markets with the quote currency given
+	def getByQuote(self, currency):
+		return list(self.__byQuote.get(currency, []))
+
+	def __len__(self):
+		return len(self.__markets)
+
+	def __addMarket(self, name, currencies):
+		base, quote = currencies
+
+		self.__markets[name] = currencies
+		self.__byBase.setdefault(base, set()).add(name)
+		self.__byQuote.setdefault(quote, set()).add(name)
+
+		return
+
+	def __removeMarket(self, name):
+		base, quote = self.__markets.pop(name)
+
+		self.__byBase[base].discard(name)
+		if(len(self.__byBase[base]) == 0):
+			del self.__byBase[base]
+
+		self.__byQuote[quote].discard(name)
+		if(len(self.__byQuote[quote]) == 0):
+			del self.__byQuote[quote]
+
+		return
@@ -0,0 +1,253 @@
+# Bisect is used to keep the price levels sorted and to search in them
+import bisect
+# Threading is needed since the book is updated by the feed and read by the bot from different threads
+import threading
+
+# This class will be in charge of keeping the order book of a market in memory
+# The books are updated with diffs in the same format bittrex gives the books: a dict with the "buy" and "sell" lists
+# of levels, each level a dict with its "Rate" and "Quantity", where a Quantity of 0 means the level was removed
+# A diff with "reset" set to True replaces the whole book
+# -The quantities and costs of the levels are kept in Fenwick trees, so a diff to a level the book already has is O(log n)
+#  and the best price, the depth up to a price and the VWAP of a quantity are O(log n)
+# -A diff with a new price only changes a dict, the trees are built again (in O(n)) the first time the book is read after it
+class OrderBook(object):
+	# __market is the name of the market of the book
+	# __sides is where we store the buy side (bids) and the sell side (asks) of the book
+	# __updatesCount is the amount of diffs applied to the book
+	# __bookLock is the lock used to make sure nobody reads the book while it is being updated
+	__market = None
+	__sides = None
+	__updatesCount = None
+	__bookLock = None
+
+	def __init__(self, market):
+		self.__market = market
+		self.__sides = {"buy": _BookSide(descending=True), "sell": _BookSide(descending=False)}
+		self.__updatesCount = 0
+		self.__bookLock = threading.Lock()
+
+		return
+
+	def getMarket(self):
+		return self.__market
+
+	def getUpdatesCount(self):
+		return self.__updatesCount
+
+	# Applies a diff to the book
+	def applyDiff(self, diff):
+		with self.__bookLock:
+			for sideName in self.__sides:
+				side = self.__sides[sideName]
+
+				if(diff.get("reset", False)):
+					side.clear()
+
+				for level in diff.get(sideName, []):
+					side.setLevel(level["Rate"], level["Quantity"])
+
+			self.__updatesCount += 1
+
+		return
+
+	# Returns the best price and its quantity of the buy side, or None if the side is empty
+	def getBestBid(self):
+		with self.__bookLock:
+			return self.__sides["buy"].getBest()
+
+	# Returns the best price and its quantity of the sell side, or None if the side is empty
+	def getBestAsk(self):
+		with self.__bookLock:
+			return self.__sides["sell"].getBest()
+
+	# Returns the difference between the best ask and the best bid, None if one of the sides is empty
+	def getSpread(self):
+		with self.__bookLock:
+			bestBid = self.__sides["buy"].getBest()
+			bestAsk = self.__sides["sell"].getBest()
+
+		if(bestBid == None or bestAsk == None):
+			return None
+
+		return bestAsk[0] - bestBid[0]
+
+	# Returns the quantity of a side ("buy" or "sell") at the price given or better
+	def getDepth(self, sideName, price):
+		with self.__bookLock:
+			return self.__sides[sideName].getDepth(price)
+
+	# Returns the average price of taking the quantity given from a side ("buy" when selling and "sell" when buying)
+	# Returns None if the side doesn't have that much quantity
+	def getVwap(self, sideName, quantity):
+		with self.__bookLock:
+			return self.__sides[sideName].getVwap(quantity)
+
+	# Returns the levels of a side from the best price, as a list of tuples with the price and the quantity
+	def getLevels(self, sideName, count=None):
+		with self.__bookLock:
+			return self.__sides[sideName].getLevels(count)
+
+	# Returns the book in the same format bittrex gives it
+	def toDict(self):
+		with self.__bookLock:
+			return dict((sideName, [{"Rate": price, "Quantity": quantity} for price, quantity in self.__sides[sideName].getLevels()]) for sideName in self.__sides)
+
+# One side of a book, with its levels sorted from the best price to the worst one
+# The keys of the levels are the prices, negated in the descending sides, so the keys are always sorted from lowest to highest
+# The removed levels keep their position (with a quantity of 0) until the trees are built again, so removing them is O(log n)
+class _BookSide(object):
+	# __maxRemovedRatio is how many times the amount of levels the removed ones can be before the trees are built again
+	__maxRemovedRatio = 2
+
+	def __init__(self, descending):
+		self.__sign = -1 if descending else 1
+		self.clear()
+
+	def clear(self):
+		# __quantities is where we store the quantity of every price of the side
+		# __keys are the sorted keys of the levels the trees were built with, __positions is the position of every key
+		# (None when the trees have to be built again), and the trees have the amount, quantity and cost of the levels
+		self.__quantities = {}
+		self.__keys = []
+		self.__positions = None
+		self.__countTree = None
+		self.__quantityTree = None
+		self.__costTree = None
+
+	def setLevel(self, price, quantity):
+		oldQuantity = self.__quantities.get(price, 0.0)
+
+		if(quantity <= 0):
+			if(price not in self.__quantities):
+				return
+
+			del self.__quantities[price]
+			quantity = 0.0
+		else:
+			self.__quantities[price] = quantity
+
+		if(self.__positions == None):
+			return
+
+		position = self.__positions.get(self.__sign * price)
+
+		# A new price changes the positions of the levels after it, so the trees are built again the next time they are read
+		if(position == None or len(self.__keys) > self.__maxRemovedRatio * len(self.__quantities) + 16):
+			self.__positions = None
+			return
+
+		_addToTree(self.__countTree, position, (quantity > 0) - (oldQuantity > 0))
+		_addToTree(self.__quantityTree, position, quantity - oldQuantity)
+		_addToTree(self.__costTree, position, (quantity - oldQuantity) * price)
+
+	def getBest(self):
+		if(len(self.__quantities) == 0):
+			return None
+
+		self.__buildTrees()
+		price = self.__sign * self.__keys[_searchTree(self.__countTree, 1)]
+
+		return price, self.__quantities[price]
+
+	def getLevels(self, count=None):
+		self.__buildTrees()
+		levels = []
+
+		for key in self.__keys:
+			if(count != None and len(levels) >= count):
+				break
+
+			quantity = self.__quantities.get(self.__sign * key)
+
+			if(quantity != None):
+				levels.append((self.__sign * key, quantity))
+
+		return levels
+
+	def getDepth(self, price):
+		self.__buildTrees()
+		position = bisect.bisect_right(self.__keys, self.__sign * price)
+
+		return _sumTree(self.__quantityTree, position)
+
+	def getVwap(self, quantity):
+		self.__buildTrees()
+
+		if(quantity <= 0 or len(self.__quantities) == 0 or _sumTree(self.__quantityTree, len(self.__keys)) < quantity):
+			return None
+
+		# The position of the first level needed to fill the quantity, the levels before it are taken completely
+		position = min(_searchTree(self.__quantityTree, quantity), len(self.__keys) - 1)
+		takenQuantity = _sumTree(self.__quantityTree, position)
+		takenCost = _sumTree(self.__costTree, position)
+
+		price = self.__sign * self.__keys[position]
+		return (takenCost + (quantity - takenQuantity) * price) / quantity
+
+	# Builds the trees with the levels we have right now, unless they are already built
+	def __buildTrees(self):
+		if(self.__positions != None):
+			return
+
+		self.__keys = sorted(self.__sign * price for price in self.__quantities)
+		self.__positions = dict((key, position) for position, key in enumerate(self.__keys))
+
+		prices = [self.__sign * key for key in self.__keys]
+		self.__countTree = _buildTree([1] * len(prices))
+		self.__quantityTree = _buildTree([float(self.__quantities[price]) for price in prices])
+		self.__costTree = _buildTree([self.__quantities[price] * price for price in prices])
+
+		return
+
+# The functions of the Fenwick trees used by the sides of the books
+# A tree is a list where the position i (starting at 1) has the sum of the last (i & -i) values up to i
+
+# Builds a tree with the values given in O(n)
+def _buildTree(values):
+	tree = [0] + values
+
+	for position in xrange(1, len(tree)):
+		parent = position + (position & -position)
+
+		if(parent < len(tree)):
+			tree[parent] += tree[position]
+
+	return tree
+
+# Adds a value to the position given (starting at 0)
+def _addToTree(tree, position, value):
+	position += 1
+
+	while(position < len(tree)):
+		tree[position] += value
+		position += position & -position
+
+	return
+
+# Returns the sum of the first count values
+def _sumTree(tree, count):
+	total = 0
+
+	while(count > 0):
+		total += tree[count]
+		count -= count & -count
+
+	return total
+
+# Returns the first position (starting at 0) where the sum of the values up to it reaches the target
+# Returns the amount of values if the target is never reached
+def _searchTree(tree, target):
+	position = 0
+	step = 1
+
+	while(step * 2 < len(tree)):
+		step *= 2
+
+	while(step > 0):
+		if(position + step < len(tree) and tree[position + step] < target):
+			position += step
+			target -= tree[position]
+
+		step //= 2
+
+	return position
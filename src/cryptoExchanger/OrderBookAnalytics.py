@@ -0,0 +1,175 @@
+# Numpy is used so all the calculations over the levels of the books are done in arrays instead of python loops
+import numpy
+
+# This file has the analytics of the order books: spread, cumulative depth, slippage and imbalance
+# The books are converted to numpy arrays only once (in BookAnalytics) and then every calculation is vectorized
+# The sides are named like in bittrex: "buy" are the bids (used when selling) and "sell" are the asks (used when buying)
+
+# Returns the prices and quantities of a side of a book sorted from the best price to the worst one
+# The book can be the dict bittrex gives (lists of dicts with Rate and Quantity) or an OrderBook
+def toArrays(book, sideName):
+	if(hasattr(book, "getLevels")):
+		levels = book.getLevels(sideName)
+		prices = numpy.array([level[0] for level in levels], dtype=float)
+		quantities = numpy.array([level[1] for level in levels], dtype=float)
+	else:
+		levels = book.get(sideName) or []
+		prices = numpy.array([level["Rate"] for level in levels], dtype=float)
+		quantities = numpy.array([level["Quantity"] for level in levels], dtype=float)
+
+	order = numpy.argsort(-prices if sideName == "buy" else prices, kind="mergesort")
+	return prices[order], quantities[order]
+
+# This class has the analytics of one book, its arrays are calculated once when it is created
+class BookAnalytics(object):
+	# __prices and __quantities are the arrays of every side sorted from the best price
+	# __cumulativeQuantities and __cumulativeCosts are the cumulative sums of the quantities and of the price times the quantity
+	__prices = None
+	__quantities = None
+	__cumulativeQuantities = None
+	__cumulativeCosts = None
+
+	def __init__(self, book):
+		self.__prices = {}
+		self.__quantities = {}
+		self.__cumulativeQuantities = {}
+		self.__cumulativeCosts = {}
+
+		for sideName in ["buy", "sell"]:
+			prices, quantities = toArrays(book, sideName)
+
+			self.__prices[sideName] = prices
+			self.__quantities[sideName] = quantities
+			self.__cumulativeQuantities[sideName] = numpy.cumsum(quantities)
+			self.__cumulativeCosts[sideName] = numpy.cumsum(prices * quantities)
+
+		return
+
+	# Returns the best price of a side, NaN if the side is empty
+	def getBest(self, sideName):
+		prices = self.__prices[sideName]
+		return prices[0] if len(prices) > 0 else numpy.nan
+
+	def getSpread(self):
+		return self.getBest("sell") - self.getBest("buy")
+
+	def getMidPrice(self):
+		return (self.getBest("sell") + self.getBest("buy")) / 2
+
+	# Returns the total quantity of a side
+	def getTotalQuantity(self, sideName):
+		cumulativeQuantities = self.__cumulativeQuantities[sideName]
+		return cumulativeQuantities[-1] if len(cumulativeQuantities) > 0 else 0.0
+
+	# Returns the prices of a side and the quantity available at every one of them or better
+	def getCumulativeDepth(self, sideName):
+		return self.__prices[sideName], self.__cumulativeQuantities[sideName]
+
+	# Returns the average prices of taking the quantities given from a side, NaN where the side doesn't have enough quantity
+	def getVwap(self, sideName, quantities):
+		quantities = numpy.asarray(quantities, dtype=float)
+		prices = self.__prices[sideName]
+		cumulativeQuantities = self.__cumulativeQuantities[sideName]
+		cumulativeCosts = self.__cumulativeCosts[sideName]
+
+		if(len(prices) == 0):
+			return numpy.full(quantities.shape, numpy.nan)
+
+		# The position of the first level needed to fill every quantity, the levels before it are taken completely
+		positions = numpy.searchsorted(cumulativeQuantities, quantities, side="left")
+		isFilled = (positions < len(prices)) & (quantities > 0)
+		positions = numpy.minimum(positions, len(prices) - 1)
+
+		takenQuantities = numpy.where(positions > 0, cumulativeQuantities[positions - 1], 0.0)
+		takenCosts = numpy.where(positions > 0, cumulativeCosts[positions - 1], 0.0)
+
+		with numpy.errstate(divide="ignore", invalid="ignore"):
+			vwap = (takenCosts + (quantities - takenQuantities) * prices[positions]) / quantities
+
+		return numpy.where(isFilled, vwap, numpy.nan)
+
+	# Returns the slippage of taking the quantities given from a side, as a fraction of the best price
+	# (0.01 means the average price is 1% worse than the best one), NaN where the side doesn't have enough quantity
+	def getSlippage(self, sideName, quantities):
+		best = self.getBest(sideName)
+		vwap = self.getVwap(sideName, quantities)
+
+		if(sideName == "buy"):
+			return (best - vwap) / best
+
+		return (vwap - best) / best
+
+	# Returns the imbalance between the bids and the asks, from -1 (only asks) to 1 (only bids)
+	# If priceRange is given only the levels at less than that fraction of the mid price are used
+	def getImbalance(self, priceRange=None):
+		if(priceRange == None):
+			bidQuantity = self.getTotalQuantity("buy")
+			askQuantity = self.getTotalQuantity("sell")
+		else:
+			midPrice = self.getMidPrice()
+			bidQuantity = self.__getDepth("buy", midPrice * (1 - priceRange))
+			askQuantity = self.__getDepth("sell", midPrice * (1 + priceRange))
+
+		if(bidQuantity + askQuantity == 0):
+			return numpy.nan
+
+		return (bidQuantity - askQuantity) / (bidQuantity + askQuantity)
+
+	# Returns the arrays of a side, used by the batch functions
+	def _getArrays(self, sideName):
+		return self.__prices[sideName], self.__cumulativeQuantities[sideName], self.__cumulativeCosts[sideName]
+
+	def __getDepth(self, sideName, price):
+		prices = self.__prices[sideName]
+
+		if(sideName == "buy"):
+			count = numpy.searchsorted(-prices, -price, side="right")
+		else:
+			count = numpy.searchsorted(prices, price, side="right")
+
+		return self.__cumulativeQuantities[sideName][count - 1] if count > 0 else 0.0
+
+# Returns the spreads of a list of BookAnalytics as an array
+def getBatchSpreads(analytics):
+	bestBids = numpy.array([bookAnalytics.getBest("buy") for bookAnalytics in analytics])
+	bestAsks = numpy.array([bookAnalytics.getBest("sell") for bookAnalytics in analytics])
+
+	return bestAsks - bestBids
+
+# Returns the slippage of taking a quantity from a side in every one of a list of BookAnalytics, as an array
+# The levels of all the books are put one after the other in the same arrays (with the cumulative sums of every book
+# moved after the ones of the book before), so all the books are searched with only one searchsorted
+def getBatchSlippage(analytics, sideName, quantity):
+	if(len(analytics) == 0):
+		return numpy.array([])
+
+	arrays = [bookAnalytics._getArrays(sideName) for bookAnalytics in analytics]
+	sizes = numpy.array([len(prices) for prices, cumulativeQuantities, cumulativeCosts in arrays])
+	totalQuantities = numpy.array([cumulativeQuantities[-1] if len(cumulativeQuantities) > 0 else 0.0 for prices, cumulativeQuantities, cumulativeCosts in arrays])
+	totalCosts = numpy.array([cumulativeCosts[-1] if len(cumulativeCosts) > 0 else 0.0 for prices, cumulativeQuantities, cumulativeCosts in arrays])
+
+	starts = numpy.concatenate(([0], numpy.cumsum(sizes)[:-1]))
+	quantityOffsets = numpy.concatenate(([0.0], numpy.cumsum(totalQuantities)[:-1]))
+	costOffsets = numpy.concatenate(([0.0], numpy.cumsum(totalCosts)[:-1]))
+
+	prices = numpy.concatenate([prices for prices, cumulativeQuantities, cumulativeCosts in arrays] + [[numpy.nan]])
+	cumulativeQuantities = numpy.concatenate([arrays[i][1] + quantityOffsets[i] for i in range(len(arrays))] + [[numpy.inf]])
+	cumulativeCosts = numpy.concatenate([arrays[i][2] + costOffsets[i] for i in range(len(arrays))] + [[numpy.inf]])
+
+	positions = numpy.searchsorted(cumulativeQuantities, quantityOffsets + quantity, side="left")
+	isFilled = (totalQuantities >= quantity) & (quantity > 0)
+
+	isFirstLevel = positions == starts
+	takenQuantities = numpy.where(isFirstLevel, 0.0, cumulativeQuantities[positions - 1] - quantityOffsets)
+	takenCosts = numpy.where(isFirstLevel, 0.0, cumulativeCosts[positions - 1] - costOffsets)
+
+	with numpy.errstate(divide="ignore", invalid="ignore"):
+		vwap = (takenCosts + (quantity - takenQuantities) * prices[positions]) / quantity
+		best = numpy.where(sizes > 0, prices[numpy.minimum(starts, len(prices) - 1)], numpy.nan)
+
+		if(sideName == "buy"):
+			slippage = (best - vwap) / best
+		else:
+			slippage = (vwap - best) / best
+
+	return numpy.where(isFilled, slippage, numpy.nan)
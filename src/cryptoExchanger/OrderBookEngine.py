@@ -0,0 +1,59 @@
+# Threading is needed since the books are updated and read from different threads
+import threading
+from OrderBook import OrderBook
+
+# This class will be in charge of keeping the order books of several markets in memory
+# Every update takes the diffs from the feed and applies them to the books, so the books don't need
+# to be downloaded and parsed again every time somebody wants to know something about them
+class OrderBookEngine(object):
+	# __feed is the one giving the diffs of the books (a PollingFeed or a ReplayFeed)
+	# __books is where we store the book of every market
+	# __booksLock is the lock used to make sure only one thread at a time creates books
+	# _debugLevel is the flag used to enable the printing messages for debugging
+	__feed = None
+	__books = None
+	__booksLock = None
+	_debugLevel = None
+
+	def __init__(self, feed, debuglevel=0):
+		self._debugLevel = debuglevel
+
+		self.__feed = feed
+		self.__books = {}
+		self.__booksLock = threading.Lock()
+
+		return
+
+	# Applies the new diffs of the feed to the books, returns the markets that changed
+	def update(self):
+		diffs = self.__feed.getDiffs()
+
+		for market, diff in diffs:
+			self.__getOrCreateBook(market).applyDiff(diff)
+
+		if (self._debugLevel >= 2): print "Order books updated: " + str(len(diffs))
+		return [market for market, diff in diffs]
+
+	# Returns the book of a market, None if we don't have it
+	def getBook(self, market):
+		return self.__books.get(market)
+
+	def getMarkets(self):
+		return self.__books.keys()
+
+	# Throws away the book of a market
+	def removeBook(self, market):
+		with self.__booksLock:
+			self.__books.pop(market, None)
+
+		return
+
+	def __getOrCreateBook(self, market):
+		with self.__booksLock:
+			book = self.__books.get(market)
+
+			if(book == None):
+				book = OrderBook(market)
+				self.__books[market] = book
+
+			return book
@@ -0,0 +1,97 @@
+# The feeds are the ones giving the diffs of the books to the order book engine
+# Every feed has a getDiffs function that returns the list of tuples with the market and the diff
+# that happened since the last call, with the diffs in the format the OrderBook uses
+
+# Returns the diff between two sides of a book, given as dicts from the rate to the quantity
+def diffLevels(oldLevels, newLevels):
+	diff = [{"Rate": rate, "Quantity": newLevels[rate]} for rate in newLevels if oldLevels.get(rate) != newLevels[rate]]
+	diff += [{"Rate": rate, "Quantity": 0} for rate in oldLevels if rate not in newLevels]
+
+	return diff
+
+# Feed that downloads the books of the markets from an exchanger and gives only what changed since the last download
+# Bittrex doesn't give the diffs of its books, so this lets the books in memory be updated only where they changed
+class PollingFeed(object):
+	# __exchanger is the exchanger we download the books from
+	# __levels is where we store the last levels of every side of the book of every market, as dicts from the rate to the quantity
+	# _debugLevel is the flag used to enable the printing messages for debugging
+	__exchanger = None
+	__levels = None
+	_debugLevel = None
+
+	def __init__(self, exchanger, markets=[], debuglevel=0):
+		self._debugLevel = debuglevel
+
+		self.__exchanger = exchanger
+		self.__levels = {}
+
+		for market in markets:
+			self.addMarket(market)
+
+		return
+
+	def addMarket(self, market):
+		self.__levels.setdefault(market, None)
+		return
+
+	def removeMarket(self, market):
+		self.__levels.pop(market, None)
+		return
+
+	def getMarkets(self):
+		return self.__levels.keys()
+
+	def getDiffs(self):
+		diffs = []
+
+		for market in self.__levels.keys():
+			book = self.__exchanger.getBothOrderBook(market)
+
+			if(book == None):
+				if (self._debugLevel >= 1): print "Error downloading the book of " + market
+				continue
+
+			newLevels = {}
+			for sideName in ["buy", "sell"]:
+				newLevels[sideName] = dict((level["Rate"], level["Quantity"]) for level in (book.get(sideName) or []))
+
+			oldLevels = self.__levels.get(market)
+			self.__levels[market] = newLevels
+
+			if(oldLevels == None):
+				diff = {"reset": True, "buy": diffLevels({}, newLevels["buy"]), "sell": diffLevels({}, newLevels["sell"])}
+			else:
+				diff = {"buy": diffLevels(oldLevels["buy"], newLevels["buy"]), "sell": diffLevels(oldLevels["sell"], newLevels["sell"])}
+
+				if(len(diff["buy"]) == 0 and len(diff["sell"]) == 0):
+					continue
+
+			diffs.append((market, diff))
+
+		return diffs
+
+# Feed that gives diffs that were saved before, used to test the engine without connecting to an exchanger
+# Every call to getDiffs gives the next batch of diffs
+class ReplayFeed(object):
+	# __batches is the list of batches of diffs, every batch a list of tuples with the market and the diff
+	# __position is the position of the next batch
+	__batches = None
+	__position = None
+
+	def __init__(self, batches):
+		self.__batches = batches
+		self.__position = 0
+
+		return
+
+	def getDiffs(self):
+		if(self.isFinished()):
+			return []
+
+		batch = self.__batches[self.__position]
+		self.__position += 1
+
+		return batch
+
+	def isFinished(self):
+		return self.__position >= len(self.__batches)
@@ -0,0 +1,51 @@
+# Threading is needed since the scanner will be refreshed outside of the threads answering the commands
+import threading
+
+# This class will be in charge of refreshing an ArbitrageScanner with the summaries of the exchangers in the background
+# so the ones reading the prices and the opportunities of the scanner never have to wait for the exchangers
+class ScannerRefresher(threading.Thread):
+	# __scanner is the arbitrage scanner we are going to keep updated
+	# __aggregator is the one we use to get the summaries of all the exchangers
+	# __refreshInterval is the amount of seconds between each refresh
+	# __stopEvent is the event used to wake up the thread and let it know it should stop
+	# _debugLevel is the flag used to enable the printing messages for debugging
+	__scanner = None
+	__aggregator = None
+	__refreshInterval = None
+	__stopEvent = None
+	_debugLevel = None
+
+	def __init__(self, scanner, aggregator, refreshInterval=10, debuglevel=0):
+		super(ScannerRefresher, self).__init__(name="ScannerRefresher")
+		self.daemon = True
+		self._debugLevel = debuglevel
+
+		self.__scanner = scanner
+		self.__aggregator = aggregator
+		self.__refreshInterval = refreshInterval
+		self.__stopEvent = threading.Event()
+
+		return
+
+	def run(self):
+		if (self._debugLevel >= 1): print "Scanner Refresher started"
+
+		while(not self.__stopEvent.is_set()):
+			try:
+				self.__scanner.refresh(self.__aggregator)
+			except Exception as error:
+				if (self._debugLevel >= 1): print "Error refreshing the arbitrage scanner: " + str(error)
+
+			self.__stopEvent.wait(self.__refreshInterval)
+
+		if (self._debugLevel >= 1): print "Scanner Refresher stopped"
+		return
+
+	# Function to make the refresher stop, it will finish the refresh it is doing before stopping
+	def stop(self):
+		self.__stopEvent.set()
+		return
+
+	# Returns if the refresher is still running
+	def isRunning(self):
+		return self.is_alive() and not self.__stopEvent.is_set()
@@ -0,0 +1,79 @@
+# Threading is needed since the exchangers can be used from several threads at the same time
+import threading
+# Time is needed to know when the values expire
+import time
+# OrderedDict is used to know which value was used the longest time ago, to throw it away when the cache is full
+from collections import OrderedDict
+
+# This class is a cache where the values expire after ttl seconds
+# When it has more than maxSize values it throws away the one used the longest time ago
+# It also counts the hits and misses, to know how useful it is
+class TtlCache(object):
+	# __ttl is the amount of seconds a value is valid, 0 means the cache doesn't keep anything
+	# __maxSize is the maximum amount of values the cache can have
+	# __values is where we store the values with the time they expire, ordered from the least to the most recently used
+	# __hits is the amount of times a valid value was found
+	# __misses is the amount of times a value wasn't found or was expired
+	# __valuesLock is the lock used to make sure only one thread at a time changes the values
+	__ttl = None
+	__maxSize = None
+	__values = None
+	__hits = None
+	__misses = None
+	__valuesLock = None
+
+	def __init__(self, ttl, maxSize=512):
+		self.__ttl = ttl
+		self.__maxSize = maxSize
+		self.__values = OrderedDict()
+		self.__hits = 0
+		self.__misses = 0
+		self.__valuesLock = threading.Lock()
+
+		return
+
+	def setTtl(self, ttl):
+		self.__ttl = ttl
+		return
+
+	def getTtl(self):
+		return self.__ttl
+
+	# Returns if the cache found a valid value for the key and the value (None if it wasn't found)
+	def get(self, key):
+		now = time.time()
+
+		with self.__valuesLock:
+			entry = self.__values.pop(key, None)
+
+			if(entry == None or entry[1] <= now):
+				self.__misses += 1
+				return False, None
+
+			self.__values[key] = entry
+			self.__hits += 1
+			return True, entry[0]
+
+	def put(self, key, value):
+		if(self.__ttl <= 0):
+			return
+
+		with self.__valuesLock:
+			self.__values.pop(key, None)
+			self.__values[key] = (value, time.time() + self.__ttl)
+
+			while(len(self.__values) > self.__maxSize):
+				self.__values.popitem(last=False)
+
+		return
+
+	# Throws away all the values
+	def clear(self):
+		with self.__valuesLock:
+			self.__values.clear()
+
+		return
+
+	# Returns the amount of hits, misses and values of the cache
+	def getStats(self):
+		return {"hits": self.__hits, "misses": self.__misses, "size": len(self.__values)}
@@ -0,0 +1,6 @@
+# The tests import the modules of the bot the same way the bot does, from the src folder
+# Run them from the root of the repository with: python -m unittest discover -s tests -t .
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
@@ -0,0 +1,213 @@
+# Threading is needed since the fakes are called from several threads at the same time
+import threading
+# Time is needed to simulate slow answers
+import time
+# Queue is used to give the updates to the bots the way a ShardedBot does
+import Queue
+# The fake telegram updates are made with the users telegram gives
+from telegram import User
+# The fake exchangers implement the same interface as the real ones
+from cryptoExchanger.Exchanger import Exchanger
+
+# This file has the fake versions of the services the bot talks to, so the tests never use the network
+
+# Waits until the condition is True, returns False if it never was
+def waitFor(condition, timeout=5):
+	endTime = time.time() + timeout
+
+	while(time.time() < endTime):
+		if(condition()):
+			return True
+
+		time.sleep(0.01)
+
+	return condition()
+
+# Returns a list of n tickers with the format coinmarketcap uses, the first one is always bitcoin
+# If convert is given the tickers also have the values in that currency (twice the values in USD)
+def makeTickers(n=50, convert=None):
+	tickers = []
+
+	for position in range(n):
+		ticker = {"id": "coin-" + str(position), "name": "Coin " + str(position), "symbol": "C" + str(position), "rank": str(position + 1),
+			"price_usd": str(position + 1) + ".5", "price_btc": "0.0001", "24h_volume_usd": "1000.0", "market_cap_usd": "50000.0",
+			"available_supply": "1000.0", "total_supply": "1000.0", "max_supply": None,
+			"percent_change_1h": "0.5", "percent_change_24h": "-1.2", "percent_change_7d": "3.3", "last_updated": "1510000000"}
+
+		if(position == 0):
+			ticker.update({"id": "bitcoin", "name": "Bitcoin", "symbol": "BTC", "price_btc": "1.0"})
+
+		if(convert != None):
+			for field in ["price_", "24h_volume_", "market_cap_"]:
+				ticker[field + convert.lower()] = str(float(ticker[field + "usd"]) * 2)
+
+		tickers.append(ticker)
+
+	return tickers
+
+# A fake of the coinmarketcap Market, it counts the calls it gets
+# Every call takes delay seconds, and fails while failing is True
+class FakeMarket(object):
+	def __init__(self, coins=50, delay=0):
+		self.coins = coins
+		self.delay = delay
+		self.failing = False
+		self.calls = []
+		self.__callsLock = threading.Lock()
+
+	def ticker(self, currency="", **kwargs):
+		self.__call("ticker", kwargs.get("convert"))
+		tickers = makeTickers(self.coins, kwargs.get("convert"))
+
+		if(currency != ""):
+			return [ticker for ticker in tickers if ticker["id"] == currency]
+
+		return tickers
+
+	def stats(self, **kwargs):
+		self.__call("stats", kwargs.get("convert"))
+		return {"total_market_cap_usd": 1000000.0, "active_currencies": self.coins}
+
+	def countCalls(self, name=None):
+		with self.__callsLock:
+			return len([call for call in self.calls if name == None or call[0] == name])
+
+	def __call(self, name, convert):
+		with self.__callsLock:
+			self.calls.append((name, convert))
+
+		time.sleep(self.delay)
+
+		if(self.failing):
+			raise IOError("coinmarketcap is down")
+
+# A fake of the telegram Bot that records when every message was sent
+# The errors in failures are raised, one per call, for the chat they belong to before sending anything
+class FakeBot(object):
+	def __init__(self):
+		self.sent = []
+		self.failures = {}
+		self.__sentLock = threading.Lock()
+
+	def send_message(self, chat_id, text, **kwargs):
+		with self.__sentLock:
+			failures = self.failures.get(chat_id, [])
+
+			if(len(failures) > 0):
+				raise failures.pop(0)
+
+			self.sent.append((time.time(), chat_id, text))
+
+	def getTimes(self, chatId=None):
+		with self.__sentLock:
+			return [sent[0] for sent in self.sent if chatId == None or sent[1] == chatId]
+
+# Makes the telegram Bot of a ChatBot send its messages to a FakeBot instead of telegram, returns the FakeBot
+# The telegram Bot also gets its own user, so it never asks telegram for it
+def useFakeBot(chatBot):
+	fakeBot = FakeBot()
+	telegramBot = chatBot._getBot()
+	telegramBot.bot = User(1, "Bot", True, username="testbot")
+	telegramBot.send_message = fakeBot.send_message
+
+	return fakeBot
+
+# Returns an update (as the dict telegram sends) with a message from a user in its private chat
+def makeUpdate(updateId, userId, text):
+	return {"update_id": updateId, "message": {"message_id": updateId, "date": 0, "text": text,
+		"chat": {"id": userId, "type": "private"}, "from": {"id": userId, "first_name": "User", "is_bot": False}}}
+
+# A fake of telegram giving updates to a bot, the updates are put in the queue ChatBot.processUpdates reads
+class FakeUpdateSource(object):
+	def __init__(self):
+		self.queue = Queue.Queue()
+		self.__nextId = 1
+
+	def send(self, userId, text, answer=True):
+		self.queue.put((makeUpdate(self.__nextId, userId, text), answer))
+		self.__nextId += 1
+
+	def close(self):
+		self.queue.put(None)
+
+# A fake exchanger that answers after latency seconds, with the bid and ask of every market in prices
+# and the market history of every market in trades
+# Its answers are never cached, so every query reaches it
+class FakeExchanger(Exchanger):
+	_cacheTtls = {}
+
+	def __init__(self, name, latency=0, prices=None):
+		super(FakeExchanger, self).__init__()
+		self.name = name
+		self.latency = latency
+		self.prices = prices if prices != None else {}
+		self.trades = {}
+		self.calls = 0
+
+	def getName(self):
+		return self.name
+
+	def getTicker(self, market):
+		self.__wait()
+		prices = self.prices.get(market)
+
+		if(prices == None):
+			return None
+
+		return {"Bid": prices[0], "Ask": prices[1], "Last": prices[0]}
+
+	def getMarketSummaries(self):
+		self.__wait()
+		return [{"MarketName": market, "Bid": self.prices[market][0], "Ask": self.prices[market][1]} for market in sorted(self.prices)]
+
+	def getMarketSummary(self, market):
+		self.__wait()
+		prices = self.prices.get(market)
+
+		if(prices == None):
+			return None
+
+		return [{"MarketName": market, "Bid": prices[0], "Ask": prices[1]}]
+
+	def getMarkets(self):
+		return sorted(self.prices)
+
+	def getCurrencies(self):
+		return sorted(set(currency for market in self.prices for currency in market.split("-")))
+
+	def getBuyOrderBook(self, market):
+		return None
+
+	def getSellOrderBook(self, market):
+		return None
+
+	def getBothOrderBook(self, market):
+		return None
+
+	def getMarketHistory(self, market):
+		return self.trades.get(market)
+
+	def placeBuyOrder(self, market, ordertype, quantity, rate):
+		return None
+
+	def placeSellOrder(self, market, ordertype, quantity, rate):
+		return None
+
+	def cancelOrder(self, orderid):
+		return None
+
+	def getOpenOrders(self, market=None):
+		return None
+
+	def getBalance(self, currency):
+		return None
+
+	def getBalances(self):
+		return None
+
+	def getOrderInfo(self, orderid):
+		return None
+
+	def __wait(self):
+		self.calls += 1
+		time.sleep(self.latency)
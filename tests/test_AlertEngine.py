@@ -0,0 +1,71 @@
+import unittest
+
+from cryptoCoin.AlertEngine import AlertEngine, AlertType
+
+class AlertEngineTest(unittest.TestCase):
+	def setUp(self):
+		self.engine = AlertEngine()
+
+	def triggeredIds(self, prices):
+		return sorted(alert[0] for alert in self.engine.evaluate(prices.get))
+
+	def testAlertsAbove(self):
+		low = self.engine.addAlert("BTC", AlertType.ABOVE, 100, "1")
+		high = self.engine.addAlert("BTC", AlertType.ABOVE, 200, "1")
+
+		self.assertEqual(self.triggeredIds({"BTC": 99}), [])
+		self.assertEqual(self.triggeredIds({"BTC": 150}), [low])
+		self.assertEqual(self.triggeredIds({"BTC": 1000}), [high])
+		self.assertEqual(self.engine.getAlertsCount(), 0)
+		self.assertEqual(self.engine.getCoins(), set())
+
+	def testAlertsBelow(self):
+		low = self.engine.addAlert("BTC", AlertType.BELOW, 100, "1")
+		high = self.engine.addAlert("BTC", AlertType.BELOW, 200, "1")
+
+		self.assertEqual(self.triggeredIds({"BTC": 201}), [])
+		self.assertEqual(self.triggeredIds({"BTC": 150}), [high])
+		self.assertEqual(self.triggeredIds({"BTC": 1}), [low])
+		self.assertEqual(self.engine.getAlertsCount(), 0)
+
+	# An alert is triggered when the price reaches its threshold, not only when it goes past it
+	def testThresholdsEqualToThePrice(self):
+		above = self.engine.addAlert("BTC", AlertType.ABOVE, 100, "1")
+		below = self.engine.addAlert("BTC", AlertType.BELOW, 100, "2")
+		other = self.engine.addAlert("ETH", AlertType.ABOVE, 100, "1")
+
+		triggered = self.engine.evaluate({"BTC": 100.0, "ETH": None}.get)
+
+		self.assertEqual(sorted(triggered), [(above, "BTC", AlertType.ABOVE, 100, "1"), (below, "BTC", AlertType.BELOW, 100, "2")])
+		self.assertEqual(self.engine.getAlerts("1"), {other: ("ETH", AlertType.ABOVE, 100)})
+
+	def testRemovedAlertsAreNeverTriggered(self):
+		removed = self.engine.addAlert("BTC", AlertType.ABOVE, 100, "1")
+		kept = self.engine.addAlert("BTC", AlertType.ABOVE, 100, "1")
+
+		self.assertFalse(self.engine.removeAlert(removed, "2"))
+		self.assertTrue(self.engine.removeAlert(removed, "1"))
+		self.assertFalse(self.engine.removeAlert(removed, "1"))
+
+		self.assertEqual(self.triggeredIds({"BTC": 100}), [kept])
+		self.assertEqual(self.engine.getCoins(), set())
+
+	# The removed alerts are thrown away from the heap when they are most of it
+	def testManyRemovedAlerts(self):
+		alertIds = [self.engine.addAlert("BTC", AlertType.BELOW, price, "1") for price in range(1, 101)]
+
+		for alertId in alertIds[:90]:
+			self.assertTrue(self.engine.removeAlert(alertId, "1"))
+
+		self.assertEqual(self.engine.getAlertsCount(), 10)
+		self.assertEqual(self.triggeredIds({"BTC": 95}), alertIds[94:])
+		self.assertEqual(self.triggeredIds({"BTC": 0.5}), alertIds[90:94])
+
+		for alertId in alertIds:
+			self.assertFalse(self.engine.removeAlert(alertId, "1"))
+
+	def testInvalidPrices(self):
+		for price in [0, -1, float("nan"), float("inf"), "10", None]:
+			self.assertEqual(self.engine.addAlert("BTC", AlertType.ABOVE, price, "1"), None)
+
+		self.assertEqual(self.engine.getAlertsCount(), 0)
@@ -0,0 +1,72 @@
+import unittest
+
+from tests.fakes import FakeExchanger
+from cryptoExchanger.CandleBuilder import CandleBuilder
+from cryptoExchanger.CandlePoller import CandlePoller
+
+# Returns a trade in the format of the market history of bittrex, at the seconds given after 2018-01-01 00:00:00 UTC
+def makeTrade(tradeId, seconds, price, quantity=1.0):
+	return {"Id": tradeId, "TimeStamp": "2018-01-01T%02d:%02d:%02d.5" % (seconds // 3600, seconds // 60 % 60, seconds % 60), "Price": price, "Quantity": quantity}
+
+# The timestamp of 2018-01-01 00:00:00 UTC
+firstMinute = 1514764800
+
+class CandleBuilderTest(unittest.TestCase):
+	def setUp(self):
+		self.builder = CandleBuilder("BTC-LTC")
+
+	def testTradesAreBucketedInCandles(self):
+		self.builder.addTrades([makeTrade(1, 0, 10), makeTrade(2, 20, 12, 2), makeTrade(3, 40, 9), makeTrade(4, 59, 11), makeTrade(5, 60, 13)])
+
+		self.assertEqual(self.builder.getCandles("1m"), [
+			{"start": firstMinute, "open": 10, "high": 12, "low": 9, "close": 11, "volume": 5.0},
+			{"start": firstMinute + 60, "open": 13, "high": 13, "low": 13, "close": 13, "volume": 1.0}])
+		self.assertEqual(self.builder.getCandles("5m"), [{"start": firstMinute, "open": 10, "high": 13, "low": 9, "close": 13, "volume": 6.0}])
+		self.assertEqual(self.builder.getCandles("1h", 1), self.builder.getCandles("5m"))
+
+	# The market history of bittrex comes from the newest trade to the oldest one, and the polls repeat the last trades
+	def testTradesAreAddedOnlyOnce(self):
+		trades = [makeTrade(2, 30, 12), makeTrade(1, 10, 10)]
+
+		self.assertEqual(self.builder.addTrades(trades), 2)
+		self.assertEqual(self.builder.addTrades([makeTrade(3, 50, 11)] + trades), 1)
+		self.assertEqual(self.builder.getCandles("1m"), [{"start": firstMinute, "open": 10, "high": 12, "low": 10, "close": 11, "volume": 3.0}])
+
+	# An interval without trades has no candle
+	def testEmptyInterval(self):
+		self.builder.addTrades([makeTrade(1, 10, 10), makeTrade(2, 190, 12)])
+
+		candles = self.builder.getCandles("1m")
+
+		self.assertEqual([candle["start"] for candle in candles], [firstMinute, firstMinute + 180])
+		self.assertEqual(self.builder.getCandles("1m", 2), candles[1:])
+
+	# A trade that arrives in a later poll updates the candle it belongs to, even if it is not the last one
+	def testLateTrade(self):
+		self.builder.addTrades([makeTrade(2, 30, 12), makeTrade(3, 70, 14)])
+		self.builder.addTrades([makeTrade(1, 5, 10, 3)])
+
+		self.assertEqual(self.builder.getCandles("1m")[0], {"start": firstMinute, "open": 10, "high": 12, "low": 10, "close": 12, "volume": 4.0})
+		self.assertEqual(self.builder.getCandles("1m")[1]["close"], 14)
+
+	# The candles are kept in ring buffers, so a trade older than the whole buffer is ignored
+	def testRingBufferKeepsTheLastCandles(self):
+		builder = CandleBuilder("BTC-LTC", {"1m": 60}, size=3)
+		builder.addTrades([makeTrade(tradeId, tradeId * 60, tradeId) for tradeId in range(10)])
+		builder.addTrades([makeTrade(10, 0, 100)])
+
+		self.assertEqual([candle["close"] for candle in builder.getCandles("1m")], [7, 8, 9])
+
+class CandlePollerTest(unittest.TestCase):
+	def testPollAddsOnlyTheNewTrades(self):
+		exchanger = FakeExchanger("Fake")
+		exchanger.trades["BTC-LTC"] = [makeTrade(1, 10, 10)]
+		candlePoller = CandlePoller(exchanger, ["BTC-LTC", "BTC-ETH"])
+
+		self.assertEqual(candlePoller.poll(), 1)
+		exchanger.trades["BTC-LTC"] = [makeTrade(2, 20, 11)] + exchanger.trades["BTC-LTC"]
+		self.assertEqual(candlePoller.pollMarket("BTC-LTC"), 1)
+
+		self.assertEqual(candlePoller.pollMarket("BTC-ETH"), None)
+		self.assertEqual(candlePoller.getCandles("BTC-LTC", "1m")[0]["close"], 11)
+		self.assertEqual(candlePoller.getCandles("BTC-XRP", "1m"), None)
@@ -0,0 +1,79 @@
+# Threading and time are needed to run the bot like a worker does and to check how long the commands take
+import threading
+import time
+import unittest
+
+from tests.fakes import FakeMarket, FakeExchanger, FakeUpdateSource, makeUpdate, useFakeBot, waitFor
+from CryptoBot import CryptoBot, RuntimeMode, WarmupMode
+
+class CryptoBotTest(unittest.TestCase):
+	def setUp(self):
+		self.market = FakeMarket(delay=0.5)
+		self.exchanger = FakeExchanger("Fake", 0, {"BTC-LTC": (0.010, 0.012)})
+		self.cryptoBot = CryptoBot("123:ABC", "1", exchangers=[self.exchanger], market=self.market, warmup=WarmupMode.LAZY, runtime=RuntimeMode.NONBLOCKING)
+		self.fakeBot = useFakeBot(self.cryptoBot)
+		self.updateId = 0
+
+		self.command(1, "/startBot")
+
+	def tearDown(self):
+		self.cryptoBot.stopBackgroundRefresh()
+		self.cryptoBot.stopScannerRefresh()
+		self.cryptoBot.stopCandlePolling()
+
+	def command(self, userId, text):
+		self.updateId += 1
+		self.cryptoBot.processUpdate(makeUpdate(self.updateId, userId, text))
+		return self.fakeBot.sent[-1][2]
+
+	# Only the default currency is loaded when the bot starts, the rest are downloaded the first time someone needs them
+	def testCommandsNeverWaitForTheMarket(self):
+		for userId in range(100, 200):
+			self.cryptoBot.setUserCurrency(str(userId), "EUR")
+
+		calls = self.market.countCalls("ticker")
+		startTime = time.time()
+		answers = [self.command(userId, "/coinInfo BTC") for userId in range(100, 200)]
+
+		self.assertLess(time.time() - startTime, 0.5)
+		self.assertIn("still getting the information in EUR", answers[0])
+		self.assertEqual(self.market.countCalls("ticker"), calls + 1)
+
+		self.assertTrue(waitFor(lambda: self.cryptoBot.getPriceInFiat("BTC", "EUR") != None))
+		self.assertIn("Price in EUR: 3.0", self.command(100, "/coinInfo BTC"))
+		self.assertEqual(self.market.countCalls("ticker"), calls + 1)
+
+	# The best prices are taken from the arbitrage scanner, that is refreshed in the background
+	def testBestPrice(self):
+		self.assertTrue(waitFor(lambda: self.cryptoBot.getBestPrices("BTC-LTC")["bid"] != None))
+		self.assertIn("Best bid: 0.01 (Fake)", self.command(100, "/bestPrice btc-ltc"))
+		self.assertIn("tell me the markets like: BTC-LTC", self.command(100, "/bestPrice BTC"))
+
+	# The market history is downloaded the first time a market is asked, then it is polled in the background
+	def testCandles(self):
+		self.exchanger.trades["BTC-LTC"] = [{"Id": 2, "TimeStamp": "2018-01-01T00:00:30", "Price": 0.012, "Quantity": 2.0},
+			{"Id": 1, "TimeStamp": "2018-01-01T00:00:10", "Price": 0.010, "Quantity": 1.0}]
+
+		self.assertIn("2018-01-01 00:00: 0.01, 0.012, 0.01, 0.012, 3.0", self.command(100, "/candles btc-ltc 1m"))
+		self.assertEqual(len(self.cryptoBot.getCandles("BTC-LTC", "1h")), 1)
+		self.assertIn("I can't get the candles of BTC-ETH 1h", self.command(100, "/candles BTC-ETH"))
+		self.assertIn("I can't get the candles of BTC-LTC 2m", self.command(100, "/candles BTC-LTC 2m"))
+		self.assertEqual(self.cryptoBot.getCandles("BTC"), None)
+
+	def testUpdatesFromAnotherProcess(self):
+		updateSource = FakeUpdateSource()
+		worker = threading.Thread(target=self.cryptoBot.processUpdates, args=(updateSource.queue,))
+		worker.start()
+
+		for userId in range(100, 110):
+			updateSource.send(userId, "/bestPrice BTC")
+
+		updateSource.send(2, "/startBot", answer=False)
+		updateSource.close()
+		worker.join(10)
+
+		self.assertFalse(worker.is_alive())
+		self.assertEqual(sorted(sent[1] for sent in self.fakeBot.sent[1:]), range(100, 110))
+
+if __name__ == "__main__":
+	unittest.main()
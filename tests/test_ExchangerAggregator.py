@@ -0,0 +1,68 @@
+# Time is needed to check the exchangers are queried at the same time
+import time
+import unittest
+
+from tests.fakes import FakeExchanger
+from cryptoExchanger.ExchangerAggregator import ExchangerAggregator
+
+class ExchangerAggregatorTest(unittest.TestCase):
+	def setUp(self):
+		self.first = FakeExchanger("First", 0.3, {"BTC-LTC": (0.010, 0.012), "BTC-ETH": (0.05, 0.06)})
+		self.second = FakeExchanger("Second", 0.3, {"BTC-LTC": (0.011, 0.013)})
+		self.aggregator = ExchangerAggregator([self.first, self.second], timeout=1)
+
+	def tearDown(self):
+		self.aggregator.close()
+
+	def testExchangersAreQueriedAtTheSameTime(self):
+		startTime = time.time()
+		tickers = self.aggregator.getTickers("BTC-LTC")
+
+		self.assertLess(time.time() - startTime, 0.5)
+		self.assertEqual(sorted(tickers), ["First", "Second"])
+
+	def testBestPrices(self):
+		bestPrices = self.aggregator.getBestPrices("BTC-LTC")
+
+		self.assertEqual(bestPrices["bid"], (0.011, "Second"))
+		self.assertEqual(bestPrices["ask"], (0.012, "First"))
+
+	def testMissingMarketsAreLeftOut(self):
+		bestPrices = self.aggregator.getBestPrices("BTC-ETH")
+
+		self.assertEqual(sorted(bestPrices["tickers"]), ["First"])
+		self.assertEqual(bestPrices["bid"], (0.05, "First"))
+
+	def testSlowExchangersGivePartialResults(self):
+		slow = FakeExchanger("Slow", 2, {"BTC-LTC": (1.0, 1.1)})
+		self.aggregator.addExchanger(slow)
+		self.aggregator.setTimeout(0.5)
+
+		startTime = time.time()
+		results, failures = self.aggregator.query("getTicker", "BTC-LTC")
+
+		self.assertLess(time.time() - startTime, 1)
+		self.assertEqual(sorted(results), ["First", "Second"])
+		self.assertEqual(failures, {"Slow": "timeout"})
+
+		# The query that timed out is still running, so the exchanger is not asked again until it finishes
+		results, failures = self.aggregator.query("getTicker", "BTC-LTC")
+		self.assertEqual(failures, {"Slow": "busy"})
+		self.assertEqual(slow.calls, 1)
+
+	def testErrorsAreFailures(self):
+		self.first.prices = None
+		results, failures = self.aggregator.query("getTicker", "BTC-LTC")
+
+		self.assertEqual(sorted(results), ["Second"])
+		self.assertEqual(sorted(failures), ["First"])
+
+	def testAddAndRemoveExchangers(self):
+		self.assertFalse(self.aggregator.addExchanger(FakeExchanger("First")))
+		self.assertTrue(self.aggregator.removeExchanger(self.first))
+		self.assertFalse(self.aggregator.removeExchanger(self.first))
+
+		self.assertEqual(sorted(self.aggregator.getTickers("BTC-LTC")), ["Second"])
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,84 @@
+# Time is needed to wait for the refresher
+import time
+import unittest
+
+from tests.fakes import FakeMarket, waitFor
+from cryptoCoin.MarketCache import MarketCache
+from cryptoCoin.MarketRefresher import MarketRefresher
+
+class MarketRefresherTest(unittest.TestCase):
+	def setUp(self):
+		self.market = FakeMarket()
+		self.cache = MarketCache(self.market, "USD", ["USD", "EUR"], updateInterval=1)
+		self.cache.setLazyRefresh(False)
+		self.refresher = None
+
+	def tearDown(self):
+		if(self.refresher != None):
+			self.refresher.stop()
+			self.refresher.join()
+
+	def startRefresher(self, margin):
+		self.refresher = MarketRefresher(self.cache, margin=margin, checkInterval=0.05)
+		self.refresher.start()
+
+	def testRefreshesBeforeExpiring(self):
+		self.assertEqual(self.cache.refreshCurrencies(["USD"]), ["USD"])
+		calls = self.market.countCalls()
+		self.startRefresher(margin=0.5)
+
+		self.assertTrue(waitFor(lambda: self.market.countCalls() > calls))
+		self.assertLess(self.cache.getTickersAge("USD"), 1)
+
+	def testReadsNeverCallTheMarket(self):
+		self.cache.refreshCurrencies(["USD"])
+		calls = self.market.countCalls()
+		time.sleep(1.1)
+
+		self.assertEqual(self.cache.getTicker("btc", "USD")["price_usd"], "1.5")
+		self.assertEqual(self.market.countCalls(), calls)
+
+	def testCurrenciesNeverReadAreNotRefreshed(self):
+		self.cache.refreshCurrencies(["USD"])
+		self.startRefresher(margin=0.9)
+
+		self.assertTrue(waitFor(lambda: self.market.countCalls() > 2))
+		self.assertEqual([call[1] for call in self.market.calls if call[1] != None], [])
+
+	def testKeepsTheLastGoodSnapshot(self):
+		self.cache.refreshCurrencies(["USD"])
+		tickers = self.cache.getTickers("USD")
+		self.market.failing = True
+
+		self.assertEqual(self.cache.refreshCurrencies(["USD"]), [])
+		self.assertIs(self.cache.getTickers("USD"), tickers)
+
+	def testSnapshotsAreSwappedAtOnce(self):
+		self.cache.refreshCurrencies(["USD"])
+		tickers = self.cache.getTickers("USD")
+		self.cache.refreshCurrencies(["USD"])
+
+		self.assertIsNot(self.cache.getTickers("USD"), tickers)
+		self.assertEqual(len(tickers), 50)
+
+	def testStaleness(self):
+		self.assertEqual(self.cache.getStaleness(), {"USD": None, "EUR": None})
+		self.cache.refreshCurrencies(["USD"])
+		time.sleep(0.1)
+
+		staleness = self.cache.getStaleness()
+		self.assertEqual(staleness["EUR"], None)
+		self.assertGreaterEqual(staleness["USD"], 0.1)
+		self.assertLess(staleness["USD"], 1)
+
+	def testListenersOnlyGetTheReplacedSnapshots(self):
+		replaced = []
+		self.cache.addListener(lambda kind, currency: replaced.append((kind, currency)))
+		self.cache.refreshCurrencies(["USD"])
+		self.market.failing = True
+		self.cache.refreshCurrencies(["USD"])
+
+		self.assertEqual(sorted(replaced), [("stats", "USD"), ("tickers", "USD")])
+
+if __name__ == "__main__":
+	unittest.main()
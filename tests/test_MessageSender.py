@@ -0,0 +1,122 @@
+# Time is needed to check when the messages were sent
+import time
+import unittest
+
+from telegram.error import RetryAfter, BadRequest, NetworkError
+
+from tests.fakes import FakeBot
+from chatBot.MessageSender import MessageSender
+
+class MessageSenderTest(unittest.TestCase):
+	def setUp(self):
+		self.bot = FakeBot()
+		self.sender = MessageSender(retryDelay=0.1)
+
+	def tearDown(self):
+		self.sender.stop(drain=False)
+		self.sender.join()
+
+	def send(self, chatId, text, priority=False):
+		self.sender.send(self.bot, chatId, text, priority)
+
+	def finish(self, timeout=10):
+		if(not self.sender.is_alive()):
+			self.sender.start()
+
+		self.sender.stop(timeout=timeout)
+		self.sender.join()
+
+	def testGlobalLimit(self):
+		for chatId in range(90):
+			self.send(chatId, "hello")
+
+		startTime = time.time()
+		self.finish()
+		times = self.bot.getTimes()
+
+		# A full bucket has 30 messages and it gets 30 more every second, so 90 messages take at least 2 seconds
+		self.assertEqual(len(times), 90)
+		self.assertGreaterEqual(times[-1] - startTime, 1.9)
+
+		for firstTime in times:
+			window = [sentTime for sentTime in times if firstTime <= sentTime < firstTime + 1]
+			self.assertLessEqual(len(window), 61)
+
+	def testChatLimit(self):
+		for number in range(3):
+			self.send(1, "message " + str(number))
+
+		self.send(2, "other chat")
+		self.finish()
+
+		times = self.bot.getTimes(1)
+		self.assertEqual([sent[2] for sent in self.bot.sent if sent[1] == 1], ["message 0", "message 1", "message 2"])
+		self.assertGreaterEqual(times[1] - times[0], 0.95)
+		self.assertGreaterEqual(times[2] - times[1], 0.95)
+		self.assertLess(self.bot.getTimes(2)[0], times[1])
+
+	def testPriorityLane(self):
+		for chatId in range(5):
+			self.send(chatId, "normal")
+
+		self.send(10, "admin", priority=True)
+		self.finish()
+
+		self.assertEqual(self.bot.sent[0][1:], (10, "admin"))
+		self.assertEqual(len(self.bot.sent), 6)
+
+	def testRetryAfterBackoff(self):
+		self.bot.failures[1] = [RetryAfter(0.5)]
+		self.send(1, "flooded")
+		self.send(2, "other chat")
+		startTime = time.time()
+		self.finish()
+
+		self.assertGreaterEqual(self.bot.getTimes(1)[0] - startTime, 0.5)
+		self.assertLess(self.bot.getTimes(2)[0] - startTime, 0.5)
+		self.assertEqual(self.sender.getStats()["sent"], 2)
+
+	def testNetworkErrorsAreRetriedThenDropped(self):
+		self.bot.failures[1] = [NetworkError("down")] * 4
+		self.bot.failures[2] = [NetworkError("down")]
+		self.send(1, "lost")
+		self.send(2, "retried")
+		self.finish()
+
+		self.assertEqual([sent[1] for sent in self.bot.sent], [2])
+		self.assertEqual(self.sender.getStats()["dropped"], 1)
+
+	def testBadRequestsAreNotRetried(self):
+		self.bot.failures[1] = [BadRequest("chat not found")]
+		self.send(1, "wrong")
+		self.finish()
+
+		self.assertEqual(self.bot.sent, [])
+		self.assertEqual(self.sender.getStats(), {"sent": 0, "dropped": 1, "pending": 0})
+
+	# The sender stops after the timeout even if telegram keeps asking it to wait, the pending messages are thrown away
+	def testStopTimeoutDropsPendingMessages(self):
+		self.bot.failures[1] = [RetryAfter(30)]
+		self.send(1, "flooded")
+		self.send(1, "also flooded")
+		self.sender.start()
+
+		startTime = time.time()
+		self.sender.stop(timeout=0.5)
+		self.sender.join(5)
+
+		self.assertLess(time.time() - startTime, 2)
+		self.assertFalse(self.sender.is_alive())
+		self.assertEqual(self.sender.getStats(), {"sent": 0, "dropped": 2, "pending": 0})
+
+	def testSendDoesNotWait(self):
+		self.sender.start()
+		startTime = time.time()
+
+		for number in range(100):
+			self.send(1, "message " + str(number))
+
+		self.assertLess(time.time() - startTime, 0.5)
+
+if __name__ == "__main__":
+	unittest.main()
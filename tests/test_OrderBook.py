@@ -0,0 +1,179 @@
+# Random is used to make the diffs, always with the same seed so the tests are repeatable
+import random
+import unittest
+
+from cryptoExchanger.OrderBook import OrderBook
+from cryptoExchanger.OrderBookEngine import OrderBookEngine
+from cryptoExchanger.OrderBookFeed import ReplayFeed, diffLevels
+from cryptoExchanger.OrderBookAnalytics import BookAnalytics
+
+# Returns batches of random diffs of a market, with the prices taken from a small grid so the levels are removed and added again
+def makeBatches(randomGenerator, batches=200, levelsPerDiff=10):
+	result = []
+
+	for batch in range(batches):
+		diff = {}
+
+		for sideName, lowestPrice in [("buy", 70), ("sell", 131)]:
+			diff[sideName] = []
+
+			for level in range(levelsPerDiff):
+				quantity = randomGenerator.choice([0, 0, randomGenerator.randint(1, 50) / 4.0])
+				diff[sideName].append({"Rate": lowestPrice + randomGenerator.randint(0, 30), "Quantity": quantity})
+
+		result.append([("BTC-LTC", diff)])
+
+	return result
+
+# The same book kept in sorted dicts, the way it would be done without the trees
+class BruteForceBook(object):
+	def __init__(self):
+		self.sides = {"buy": {}, "sell": {}}
+
+	def applyDiff(self, diff):
+		for sideName in self.sides:
+			for level in diff.get(sideName, []):
+				if(level["Quantity"] <= 0):
+					self.sides[sideName].pop(level["Rate"], None)
+				else:
+					self.sides[sideName][level["Rate"]] = level["Quantity"]
+
+	def getLevels(self, sideName):
+		return sorted(self.sides[sideName].items(), reverse=(sideName == "buy"))
+
+	def getDepth(self, sideName, price):
+		return sum(quantity for levelPrice, quantity in self.getLevels(sideName) if (levelPrice >= price if sideName == "buy" else levelPrice <= price))
+
+	def getVwap(self, sideName, quantity):
+		remaining = quantity
+		cost = 0.0
+
+		for price, levelQuantity in self.getLevels(sideName):
+			taken = min(remaining, levelQuantity)
+			cost += taken * price
+			remaining -= taken
+
+			if(remaining <= 0):
+				return cost / quantity
+
+		return None
+
+class OrderBookTest(unittest.TestCase):
+	def assertSameBook(self, book, bruteForce, randomGenerator):
+		for sideName in ["buy", "sell"]:
+			levels = bruteForce.getLevels(sideName)
+			self.assertEqual(book.getLevels(sideName), levels)
+
+			best = book.getBestBid() if sideName == "buy" else book.getBestAsk()
+			self.assertEqual(best, levels[0] if levels else None)
+
+			for price in [randomGenerator.randint(60, 170) for check in range(3)]:
+				self.assertAlmostEqual(book.getDepth(sideName, price), bruteForce.getDepth(sideName, price))
+
+			for quantity in [randomGenerator.randint(1, 200) / 2.0 for check in range(3)]:
+				vwap = book.getVwap(sideName, quantity)
+				expected = bruteForce.getVwap(sideName, quantity)
+
+				if(expected == None):
+					self.assertEqual(vwap, None)
+				else:
+					self.assertAlmostEqual(vwap, expected)
+
+	def testRandomDiffsMatchBruteForce(self):
+		randomGenerator = random.Random(7)
+		batches = makeBatches(randomGenerator)
+		engine = OrderBookEngine(ReplayFeed(batches))
+		bruteForce = BruteForceBook()
+
+		for batch in batches:
+			self.assertEqual(engine.update(), ["BTC-LTC"])
+			bruteForce.applyDiff(batch[0][1])
+			self.assertSameBook(engine.getBook("BTC-LTC"), bruteForce, randomGenerator)
+
+		self.assertEqual(engine.update(), [])
+		self.assertEqual(engine.getBook("BTC-LTC").getUpdatesCount(), len(batches))
+
+	def testRemovedLevelAddedAgain(self):
+		book = OrderBook("BTC-LTC")
+		book.applyDiff({"buy": [{"Rate": 10, "Quantity": 1}, {"Rate": 9, "Quantity": 2}, {"Rate": 8, "Quantity": 3}]})
+		self.assertEqual(book.getBestBid(), (10, 1))
+
+		book.applyDiff({"buy": [{"Rate": 10, "Quantity": 0}]})
+		self.assertEqual(book.getBestBid(), (9, 2))
+		self.assertEqual(book.getDepth("buy", 8), 5)
+
+		book.applyDiff({"buy": [{"Rate": 10, "Quantity": 4}]})
+		self.assertEqual(book.getBestBid(), (10, 4))
+		self.assertEqual(book.getDepth("buy", 8), 9)
+		self.assertAlmostEqual(book.getVwap("buy", 5), (4 * 10 + 9) / 5.0)
+
+	def testZeroSizeUpdates(self):
+		book = OrderBook("BTC-LTC")
+		book.applyDiff({"sell": [{"Rate": 10, "Quantity": 1}, {"Rate": 11, "Quantity": 2}]})
+		book.getBestAsk()
+
+		# A level the book doesn't have is ignored, and removing a level twice is the same as removing it once
+		book.applyDiff({"sell": [{"Rate": 12, "Quantity": 0}, {"Rate": 10, "Quantity": 0}, {"Rate": 10, "Quantity": 0}]})
+
+		self.assertEqual(book.getLevels("sell"), [(11, 2)])
+		self.assertEqual(book.getBestAsk(), (11, 2))
+		self.assertEqual(book.getDepth("sell", 20), 2)
+		self.assertEqual(book.getVwap("sell", 3), None)
+		self.assertEqual(book.getBestBid(), None)
+		self.assertEqual(book.getSpread(), None)
+
+	def testTreesAreRebuiltOnceMostLevelsAreRemoved(self):
+		book = OrderBook("BTC-LTC")
+		book.applyDiff({"reset": True, "buy": [{"Rate": price, "Quantity": 1} for price in range(1, 101)]})
+		side = book._OrderBook__sides["buy"]
+		book.getBestBid()
+
+		# The removed levels are kept in the trees until they are twice the live ones (plus a margin for the small books)
+		for price in range(100, 42, -1):
+			book.applyDiff({"buy": [{"Rate": price, "Quantity": 0}]})
+			self.assertEqual(book.getBestBid(), (price - 1, 1))
+			self.assertEqual(len(side._BookSide__keys), 100)
+
+		book.applyDiff({"buy": [{"Rate": 42, "Quantity": 0}]})
+		self.assertEqual(book.getBestBid(), (41, 1))
+		self.assertEqual(len(side._BookSide__keys), 41)
+		self.assertEqual(book.getDepth("buy", 1), 41)
+		self.assertAlmostEqual(book.getVwap("buy", 41), 21)
+
+	def testReplayFeedReplacesTheBookOnReset(self):
+		engine = OrderBookEngine(ReplayFeed([[("BTC-LTC", {"buy": [{"Rate": 1, "Quantity": 1}]})],
+			[("BTC-LTC", {"reset": True, "sell": [{"Rate": 2, "Quantity": 1}]})]]))
+
+		engine.update()
+		engine.update()
+
+		self.assertEqual(engine.getBook("BTC-LTC").toDict(), {"buy": [], "sell": [{"Rate": 2, "Quantity": 1}]})
+
+	def testDiffLevels(self):
+		diff = diffLevels({1: 1, 2: 2}, {2: 3, 4: 1})
+
+		self.assertEqual(sorted((level["Rate"], level["Quantity"]) for level in diff), [(1, 0), (2, 3), (4, 1)])
+
+class BookAnalyticsTest(unittest.TestCase):
+	def testAnalyticsMatchTheBook(self):
+		randomGenerator = random.Random(3)
+		book = OrderBook("BTC-LTC")
+
+		for batch in makeBatches(randomGenerator, 20):
+			book.applyDiff(batch[0][1])
+
+		analytics = BookAnalytics(book)
+		bookDict = BookAnalytics(book.toDict())
+
+		for sideName in ["buy", "sell"]:
+			quantities = [1, 10, 50, 100000]
+			expected = [book.getVwap(sideName, quantity) for quantity in quantities]
+
+			for vwaps in [analytics.getVwap(sideName, quantities), bookDict.getVwap(sideName, quantities)]:
+				for vwap, expectedVwap in zip(vwaps, expected):
+					if(expectedVwap == None):
+						self.assertNotEqual(vwap, vwap)
+					else:
+						self.assertAlmostEqual(vwap, expectedVwap)
+
+		self.assertAlmostEqual(analytics.getSpread(), book.getSpread())
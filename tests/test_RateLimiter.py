@@ -0,0 +1,86 @@
+import unittest
+
+from tests.fakes import FakeMarket, makeUpdate, useFakeBot
+from chatBot.RateLimiter import RateLimiter
+from CryptoBot import CryptoBot
+
+class RateLimiterTest(unittest.TestCase):
+	def setUp(self):
+		self.rateLimiter = RateLimiter(userRate=1, userBurst=5, chatRate=2, chatBurst=10, maxBuckets=3, banThreshold=3, banDuration=60)
+
+	def testBucketsAreRefilled(self):
+		for command in range(5):
+			self.assertEqual(self.rateLimiter.check("1", 1, now=0), None)
+
+		self.assertEqual(self.rateLimiter.check("1", 1, now=0), "limited")
+		self.assertEqual(self.rateLimiter.check("1", 1, now=0.5), "limited")
+		self.assertEqual(self.rateLimiter.check("1", 1, now=1), None)
+		self.assertEqual(self.rateLimiter.getStrikes("1"), 0)
+
+	# Every argument of a command costs a token, and a command that costs more than the burst is never allowed
+	def testCostIsChargedCompletely(self):
+		self.assertEqual(self.rateLimiter.check("1", 1, cost=4, now=0), None)
+		self.assertEqual(self.rateLimiter.check("1", 1, cost=2, now=0), "limited")
+		self.assertEqual(self.rateLimiter.check("1", 1, cost=1, now=0), None)
+
+		self.assertEqual(self.rateLimiter.getMaxCost(), 5)
+		self.assertEqual(self.rateLimiter.check("2", 2, cost=50, now=0), "toolarge")
+		self.assertEqual(self.rateLimiter.getStrikes("2"), 1)
+		self.assertEqual(self.rateLimiter.check("2", 2, cost=5, now=0), None)
+
+	def testSoftBans(self):
+		self.assertEqual(self.rateLimiter.check("1", 1, cost=5, now=0), None)
+		self.assertEqual(self.rateLimiter.check("1", 1, now=0), "limited")
+		self.assertEqual(self.rateLimiter.check("1", 1, now=0), "limited")
+		self.assertEqual(self.rateLimiter.check("1", 1, now=0), "banned")
+
+		self.assertEqual(self.rateLimiter.check("1", 1, now=59), "softbanned")
+		self.assertTrue(self.rateLimiter.isSoftBanned("1", now=59))
+		self.assertEqual(self.rateLimiter.check("1", 1, now=60), None)
+
+		self.assertEqual(self.rateLimiter.check("2", 2, cost=50, now=0), "toolarge")
+		self.assertEqual(self.rateLimiter.check("2", 2, cost=50, now=0), "toolarge")
+		self.assertEqual(self.rateLimiter.check("2", 2, cost=50, now=0), "banned")
+		self.assertTrue(self.rateLimiter.liftSoftBan("2"))
+		self.assertFalse(self.rateLimiter.liftSoftBan("2"))
+		self.assertEqual(self.rateLimiter.check("2", 2, now=0), None)
+
+	# A busy chat limits the users in it, but they don't get strikes for it
+	def testBusyChatDoesNotGiveStrikes(self):
+		for user in range(10):
+			self.assertEqual(self.rateLimiter.check(str(user % 2), 1, now=0), None)
+
+		self.assertEqual(self.rateLimiter.check("2", 1, now=0), "limited")
+		self.assertEqual(self.rateLimiter.getStrikes("2"), 0)
+		self.assertEqual(self.rateLimiter.check("2", 2, now=0), None)
+
+	# Only the last maxBuckets users and chats are kept, a user that was thrown away starts with a full bucket
+	def testOldestBucketsAreThrownAway(self):
+		self.assertEqual(self.rateLimiter.check("1", 1, cost=5, now=0), None)
+
+		for user in range(2, 102):
+			self.rateLimiter.check(str(user), user, now=0)
+
+		self.assertEqual(self.rateLimiter.getStats(), {"users": 3, "chats": 3, "softbanned": 0})
+		self.assertEqual(self.rateLimiter.check("1", 1, cost=5, now=0), None)
+
+class ChatBotRateLimitTest(unittest.TestCase):
+	def sendCommands(self, rateLimiter, count):
+		cryptoBot = CryptoBot("123:ABC", "1", market=FakeMarket(), rateLimiter=rateLimiter)
+		fakeBot = useFakeBot(cryptoBot)
+		cryptoBot.processUpdate(makeUpdate(0, 1, "/startBot"))
+
+		for updateId in range(1, count + 1):
+			cryptoBot.processUpdate(makeUpdate(updateId, 100, "/price btc"))
+
+		return [sent[2] for sent in fakeBot.sent if sent[1] == 100]
+
+	# The commands are not limited unless the bot is given a rate limiter
+	def testCommandsAreNotLimitedByDefault(self):
+		self.assertEqual(len(self.sendCommands(None, 20)), 20)
+
+	def testLimitedCommands(self):
+		answers = self.sendCommands(RateLimiter(), 20)
+
+		self.assertEqual(len(answers), 6)
+		self.assertIn("slow down", answers[5])
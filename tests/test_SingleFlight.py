@@ -0,0 +1,82 @@
+# Threading and time are needed to make the lookups at the same time
+import threading
+import time
+import unittest
+
+from tests.fakes import FakeMarket
+from cryptoCoin.MarketCache import MarketCache
+from cryptoCoin.SingleFlight import SingleFlight
+
+# Calls the function from count threads started at the same time, returns the results
+def runConcurrently(function, count=100):
+	startEvent = threading.Event()
+	results = [None] * count
+
+	def lookup(position):
+		startEvent.wait()
+		results[position] = function()
+
+	threads = [threading.Thread(target=lookup, args=(position,)) for position in range(count)]
+	for thread in threads:
+		thread.start()
+
+	startEvent.set()
+	for thread in threads:
+		thread.join()
+
+	return results
+
+class SingleFlightTest(unittest.TestCase):
+	def testConcurrentMissesCallTheMarketOnce(self):
+		market = FakeMarket(delay=0.2)
+		cache = MarketCache(market, "USD", ["USD"])
+
+		results = runConcurrently(lambda: cache.getTickers("USD"))
+
+		self.assertEqual(market.countCalls("ticker"), 1)
+		self.assertEqual(len(set(id(result) for result in results)), 1)
+		self.assertEqual(len(results[0]), 50)
+
+	def testConcurrentExpiredReadsCallTheMarketOnce(self):
+		market = FakeMarket()
+		cache = MarketCache(market, "USD", ["USD"], updateInterval=0.1)
+		cache.refreshCurrencies(["USD"])
+		oldTickers = cache.getTickers("USD")
+		time.sleep(0.2)
+		market.delay = 0.2
+
+		results = runConcurrently(lambda: cache.getTickers("USD"))
+
+		self.assertEqual(market.countCalls("ticker"), 2)
+		self.assertTrue(all(result is not None for result in results))
+		self.assertIsNot(cache.getTickers("USD"), oldTickers)
+
+	def testErrorsReachEveryCaller(self):
+		singleFlight = SingleFlight()
+		calls = []
+
+		def failingCall():
+			calls.append(1)
+			time.sleep(0.2)
+			raise IOError("down")
+
+		def call():
+			try:
+				return singleFlight.run("key", failingCall)
+			except IOError as error:
+				return error
+
+		results = runConcurrently(call, 20)
+
+		self.assertEqual(len(calls), 1)
+		self.assertTrue(all(isinstance(result, IOError) for result in results))
+		self.assertFalse(singleFlight.isRunning("key"))
+
+	def testDifferentKeysAreNotMerged(self):
+		singleFlight = SingleFlight()
+
+		self.assertEqual(singleFlight.run("a", lambda: 1), 1)
+		self.assertEqual(singleFlight.run("b", lambda: 2), 2)
+
+if __name__ == "__main__":
+	unittest.main()
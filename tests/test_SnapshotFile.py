@@ -0,0 +1,56 @@
+# Os and time are needed to read the file with another timezone, marshal to write a file of an old version
+import os
+import time
+import datetime
+import marshal
+import shutil
+import tempfile
+import unittest
+
+from tests.fakes import FakeMarket
+from cryptoCoin import SnapshotFile
+from cryptoCoin.MarketCache import MarketCache
+
+class SnapshotFileTest(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.path = os.path.join(self.directory, "snapshot")
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+		if(hasattr(time, "tzset")):
+			os.environ.pop("TZ", None)
+			time.tzset()
+
+	def testSnapshotsRoundTrip(self):
+		cache = MarketCache(FakeMarket(), "USD", ["USD", "EUR"], saveDelay=0)
+		cache.refreshCurrencies(["USD", "EUR"])
+		cache.saveSnapshot(self.path)
+
+		loaded = MarketCache(FakeMarket(), "USD", ["USD", "EUR"])
+
+		self.assertEqual(loaded.loadSnapshot(self.path), ["USD", "EUR"])
+		self.assertEqual(dict(loaded.getTicker("BTC", "EUR")), dict(cache.getTicker("BTC", "EUR")))
+		self.assertLess(loaded.getTickersAge("EUR"), 5)
+
+	def testTimesAreSavedInUtc(self):
+		moment = datetime.datetime.utcnow()
+		SnapshotFile.writeSnapshots(self.path, {"rates": {"EUR": (0.85, moment)}})
+
+		# The file is read by a process in another timezone
+		if(hasattr(time, "tzset")):
+			os.environ["TZ"] = "America/New_York"
+			time.tzset()
+
+		snapshots = SnapshotFile.readSnapshots(self.path)
+
+		self.assertEqual(snapshots["rates"]["EUR"], (0.85, moment))
+
+	# The files of older versions are ignored, the ticker stores they have don't keep the original texts
+	def testOtherVersionsAreIgnored(self):
+		with open(self.path, "wb") as snapshotFile:
+			marshal.dump({"version": 1, "snapshots": {"rates": {"EUR": (0.85, 0)}}}, snapshotFile, 2)
+
+		self.assertEqual(SnapshotFile.readSnapshots(self.path), None)
+		self.assertEqual(SnapshotFile.readSnapshots(os.path.join(self.directory, "missing")), None)
@@ -0,0 +1,78 @@
+import unittest
+
+from cryptoCoin import TickerStore as TickerStoreModule
+from cryptoCoin.TickerStore import TickerStore
+
+# Tickers with the texts coinmarketcap sends, including the values that can't be rebuilt from their number
+tickers = [
+	{"id": "bitcoin", "name": "Bitcoin", "symbol": "BTC", "rank": "1", "price_usd": "6500.5", "market_cap_usd": "110000000000.0", "24h_volume_usd": "4000000000.0", "percent_change_24h": "-1.5", "last_updated": "1530000000"},
+	{"id": "tiny", "name": "Tiny", "symbol": "TNY", "rank": "2", "price_usd": "1e-05", "market_cap_usd": "0", "24h_volume_usd": None, "percent_change_24h": None, "last_updated": None},
+	{"id": "ethereum", "name": "Ethereum", "symbol": "ETH", "rank": "3", "price_usd": "450.25", "market_cap_usd": "45000000000.0", "24h_volume_usd": "1500000000.0", "percent_change_24h": "2.75", "last_updated": "1530000100"},
+	{"id": "nothing", "name": "Nothing", "symbol": "NTH", "rank": None, "price_usd": "0.00012", "market_cap_usd": None, "24h_volume_usd": "0", "percent_change_24h": "0.0", "last_updated": "1530000050"},
+]
+
+class TickerStoreTest(unittest.TestCase):
+	def setUp(self):
+		self.store = TickerStore(tickers)
+
+	# Every row is shown with the same texts coinmarketcap sent, even "0", the scientific notation and the missing values
+	def testTextsRoundTrip(self):
+		self.assertEqual([dict(row) for row in self.store], tickers)
+
+		self.assertEqual(self.store.getTicker("tny")["price_usd"], "1e-05")
+		self.assertEqual(self.store.getTicker("Tiny")["market_cap_usd"], "0")
+		self.assertEqual(self.store.getTicker("tiny")["24h_volume_usd"], None)
+		self.assertEqual(self.store.getTicker("NTH")["rank"], None)
+
+		self.assertEqual(self.store.getTicker("TNY").getValue("price_usd"), 1e-05)
+		self.assertEqual(self.store.getTicker("NTH").getValue("rank"), None)
+		self.assertEqual(self.store.getTicker("DOGE"), None)
+
+	def testFormatNumber(self):
+		self.assertEqual(TickerStoreModule.formatNumber(1e-05), "0.00001")
+		self.assertEqual(TickerStoreModule.formatNumber(0.0), "0.0")
+		self.assertEqual(TickerStoreModule.formatNumber(12), "12")
+
+	# The coins without a value for the field are left out
+	def testTopByWithMissingValues(self):
+		self.assertEqual([row["symbol"] for row in self.store.topBy("24h_volume_usd", 2)], ["BTC", "ETH"])
+		self.assertEqual([row["symbol"] for row in self.store.topBy("24h_volume_usd", 10)], ["BTC", "ETH", "NTH"])
+		self.assertEqual([row["symbol"] for row in self.store.topBy("percent_change_24h", 2, ascending=True)], ["BTC", "NTH"])
+		self.assertEqual(self.store.topBy("rank", 0), [])
+
+	def testSortByWithMissingValues(self):
+		self.assertEqual([row["symbol"] for row in self.store.sortBy("rank")], ["BTC", "TNY", "ETH"])
+		self.assertEqual([row["symbol"] for row in self.store.sortBy("last_updated", ascending=False)], ["ETH", "NTH", "BTC"])
+		self.assertEqual([row["symbol"] for row in self.store.sortBy("market_cap_usd")], ["TNY", "ETH", "BTC"])
+		self.assertEqual([row["symbol"] for row in self.store.sortBy("name")], ["BTC", "ETH", "NTH", "TNY"])
+
+	# The converted store is kept while the rate doesn't change
+	def testConvertIsCachedUntilTheRateChanges(self):
+		converted = self.store.convert("USD", "EUR", 0.5)
+
+		self.assertIs(self.store.convert("USD", "EUR", 0.5), converted)
+		self.assertEqual(converted.getTicker("BTC")["price_eur"], "3250.25")
+		self.assertEqual(converted.getTicker("BTC")["market_cap_eur"], "55000000000.0")
+		self.assertEqual(converted.getTicker("TNY")["market_cap_eur"], "0.0")
+		self.assertEqual(converted.getTicker("TNY")["24h_volume_eur"], None)
+		self.assertEqual(converted.getTicker("TNY")["price_usd"], "1e-05")
+
+		changed = self.store.convert("USD", "EUR", 0.25)
+
+		self.assertIsNot(changed, converted)
+		self.assertEqual(changed.getTicker("BTC")["price_eur"], "1625.125")
+		self.assertIs(self.store.convert("USD", "EUR", 0.25), changed)
+		self.assertIsNot(self.store.convert("USD", "GBP", 0.25), changed)
+
+	def testDataRoundTrip(self):
+		loaded = TickerStoreModule.fromData(self.store.toData())
+
+		self.assertEqual([dict(row) for row in loaded], tickers)
+		self.assertEqual(loaded.getFields(), self.store.getFields())
+		self.assertEqual(loaded.getTicker("ethereum").getRow(), 2)
+		self.assertEqual([row["symbol"] for row in loaded.sortBy("rank")], ["BTC", "TNY", "ETH"])
+
+		converted = self.store.convert("USD", "EUR", 0.5)
+		loadedConverted = TickerStoreModule.fromData(converted.toData())
+
+		self.assertEqual([dict(row) for row in loadedConverted], [dict(row) for row in converted])